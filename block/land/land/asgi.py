@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'land.settings')
+# Serve the busiest pages with the native async views in myapp/async_views.py
+os.environ.setdefault('LAND_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
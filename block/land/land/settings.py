@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -82,6 +83,17 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'land-default',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -127,3 +139,43 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGIN_URL = '/adminlogin/'         # where to go if not logged in
 LOGIN_REDIRECT_URL = '/admindashboard/'  # after login
  
+
+# Land price dataset used by the predictor (loaded lazily on first use).
+# LAND_PRICES_CSV = BASE_DIR / 'myapp' / 'land_prices_with_correct_per_cent.csv'
+LAND_PRICES_PRELOAD = False   # set True to load it in MyappConfig.ready()
+# Binary snapshot built by `manage.py build_price_snapshot`; defaults to the CSV path with a .snapshot suffix.
+# LAND_PRICES_SNAPSHOT = BASE_DIR / 'myapp' / 'land_prices_with_correct_per_cent.snapshot'
+# Prediction result cache: in-process LRU size, and optionally a CACHES alias to share results across workers.
+LAND_PRICES_CACHE_SIZE = 2048
+LAND_PRICES_CACHE_ALIAS = None      # e.g. 'default' once CACHES points at Redis/Memcached
+LAND_PRICES_CACHE_TIMEOUT = 60 * 60
+# Hot reload of the price dataset: poll the CSV/snapshot every N seconds (None = off),
+# and/or reload when a worker receives this signal (e.g. 'SIGUSR2').
+LAND_PRICES_RELOAD_INTERVAL = None
+LAND_PRICES_RELOAD_SIGNAL = None
+# Valuation worker processes (0 = value in the request thread). Each loads the dataset once.
+# At most LAND_VALUATION_MAX_PENDING jobs queue; past that, or after LAND_VALUATION_TIMEOUT
+# seconds, predictions are computed in-process (or refused with 503 if fallback is off).
+LAND_VALUATION_WORKERS = 0          # e.g. os.cpu_count() in production
+LAND_VALUATION_MAX_PENDING = 256
+LAND_VALUATION_TIMEOUT = 5.0
+LAND_VALUATION_FALLBACK = True
+# Valuation model: localities with n listings are blended n/(n + SHRINKAGE) with their district;
+# the trimmed mean drops LAND_VALUATION_TRIM of each group's listings from either end.
+LAND_VALUATION_SHRINKAGE = 5.0
+LAND_VALUATION_TRIM = 0.1
+# Background valuation check of submitted requests: a declared value below LAND_VALUATION_FLAG_RATIO
+# of the predicted one is flagged for review. Checks run in batches of LAND_VALUATION_CHECK_BATCH_SIZE.
+LAND_VALUATION_FLAG_RATIO = 0.7
+LAND_VALUATION_CHECK_BATCH_SIZE = 200
+LAND_VALUATION_CHECK_THREAD = True  # False when a separate `manage.py check_valuations --watch` runs them
+
+# Ledger block batching: queued status transitions are sealed into one block once
+# LEDGER_BATCH_SIZE are waiting or the oldest has waited LEDGER_BATCH_MAX_DELAY_MS.
+LEDGER_BATCH_SIZE = 64
+LEDGER_BATCH_MAX_DELAY_MS = 250
+LEDGER_SEALER_THREAD = True     # False when a separate `manage.py seal_ledger --watch` does the sealing
+
+# Native async views for the prediction/request/dashboard pages; land/asgi.py turns this on.
+LAND_ASYNC_VIEWS = os.environ.get('LAND_ASYNC_VIEWS') == '1'
+LAND_VALUATION_THREADS = 4      # bounded pool for valuation work in the async views
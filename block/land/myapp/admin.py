@@ -1,6 +1,7 @@
 from django.contrib import admin
-from .models import Customer,SubRegistrar
+from .models import Customer,SubRegistrar,SubRegistrarOffice
 
 
 admin.site.register(Customer)
 admin.site.register(SubRegistrar)
+admin.site.register(SubRegistrarOffice)
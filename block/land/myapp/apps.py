@@ -1,6 +1,28 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class MyappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'myapp'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (connects the ledger receivers)
+
+        # Load the land price dataset at startup instead of on the first prediction
+        if getattr(settings, 'LAND_PRICES_PRELOAD', False):
+            from .utils import get_price_data
+            get_price_data()
+            from .valuation_service import get_valuation_service, in_worker
+            if getattr(settings, 'LAND_VALUATION_WORKERS', 0) and not in_worker():
+                get_valuation_service().start()
+
+        # Hot reload of the dataset without restarting workers
+        interval = getattr(settings, 'LAND_PRICES_RELOAD_INTERVAL', None)
+        reload_signal = getattr(settings, 'LAND_PRICES_RELOAD_SIGNAL', None)
+        if interval or reload_signal:
+            from . import price_reload
+            if interval:
+                price_reload.start_watcher(interval)
+            if reload_signal:
+                price_reload.install_reload_signal(reload_signal)
@@ -0,0 +1,123 @@
+"""
+Routing of submitted requests to sub-registrars.
+
+Unassigned SUBMITTED requests are claimed oldest-first in batches (through
+landreq_reviewer_queue_idx, with assigned_sub_registrar IS NULL). On
+databases that support it the batch is locked with SELECT ... FOR UPDATE
+SKIP LOCKED, so several workers take disjoint batches without waiting on
+each other. SQLite serializes writers instead; there the assigning UPDATE is
+conditional on the request still being unassigned, so a row is never given
+to two registrars either way.
+
+Each request goes to the registrar in its district with the fewest open
+requests, read from the SubRegistrar.open_requests counters (one indexed
+query per batch, no COUNT(*)). The counters go up here and down in
+LandOwnershipChangeRequest.transition() when a request is approved or
+rejected; recount_open_requests() rebuilds them if they ever drift.
+"""
+import heapq
+from collections import defaultdict, namedtuple
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+
+from .models import LandOwnershipChangeRequest, SubRegistrar, normalize_district
+
+DEFAULT_BATCH_SIZE = 200
+
+AssignResult = namedtuple("AssignResult", ["assigned", "unmatched"])
+
+
+def _unassigned(after=None):
+    queryset = LandOwnershipChangeRequest.objects.filter(
+        assigned_sub_registrar__isnull=True, status=LandOwnershipChangeRequest.Status.SUBMITTED,
+    ).order_by(F("submitted_at").asc(nulls_first=True), "request_id").only("request_id", "district", "submitted_at")
+    if after is not None:
+        submitted_at, request_id = after
+        if submitted_at is None:  # rows saved before submitted_at was stamped
+            position = Q(submitted_at__isnull=False) | Q(submitted_at__isnull=True, request_id__gt=request_id)
+        else:
+            position = Q(submitted_at__gt=submitted_at) | Q(submitted_at=submitted_at, request_id__gt=request_id)
+        queryset = queryset.filter(position)
+    if connection.features.has_select_for_update_skip_locked:
+        queryset = queryset.select_for_update(skip_locked=True)
+    return queryset
+
+
+def _registrar_heaps(districts):
+    """{district: heap of [open_requests, registrar_id]} for the given districts"""
+    heaps = defaultdict(list)
+    registrars = SubRegistrar.objects.filter(district__in=districts).values_list(
+        "district", "open_requests", "registrar_id"
+    )
+    for district, open_requests, registrar_id in registrars:
+        heaps[district].append([open_requests, registrar_id])
+    for heap in heaps.values():
+        heapq.heapify(heap)
+    return heaps
+
+
+def assign_batch(batch_size=DEFAULT_BATCH_SIZE, after=None):
+    """
+    Claim and route one batch. Returns (AssignResult, cursor of the last row
+    seen or None when there was nothing left).
+    """
+    with transaction.atomic():
+        batch = list(_unassigned(after)[:batch_size])
+        if not batch:
+            return AssignResult(0, 0), None
+
+        heaps = _registrar_heaps({normalize_district(r.district) for r in batch})
+        chosen = defaultdict(list)
+        unmatched = 0
+        for ownership_request in batch:
+            heap = heaps.get(normalize_district(ownership_request.district))
+            if not heap:
+                unmatched += 1
+                continue
+            load = heap[0]
+            chosen[load[1]].append(ownership_request.pk)
+            load[0] += 1
+            heapq.heapreplace(heap, load)
+
+        assigned = 0
+        for registrar_id, request_ids in chosen.items():
+            count = LandOwnershipChangeRequest.objects.filter(
+                pk__in=request_ids, assigned_sub_registrar__isnull=True,
+                status=LandOwnershipChangeRequest.Status.SUBMITTED,
+            ).update(assigned_sub_registrar_id=registrar_id)
+            if count:
+                SubRegistrar.objects.filter(pk=registrar_id).update(open_requests=F("open_requests") + count)
+            assigned += count
+
+    last = batch[-1]
+    return AssignResult(assigned, unmatched), (last.submitted_at, last.pk)
+
+
+def assign_pending(batch_size=DEFAULT_BATCH_SIZE):
+    """Route every unassigned submission; requests with no registrar in their district are left"""
+    assigned = unmatched = 0
+    after = None
+    while True:
+        result, after = assign_batch(batch_size, after)
+        if after is None:
+            return AssignResult(assigned, unmatched)
+        assigned += result.assigned
+        unmatched += result.unmatched
+
+
+def recount_open_requests():
+    """Rebuild every SubRegistrar.open_requests from the requests table"""
+    Status = LandOwnershipChangeRequest.Status
+    counts = dict(
+        LandOwnershipChangeRequest.objects
+        .filter(assigned_sub_registrar__isnull=False, status__in=[Status.SUBMITTED, Status.UNDER_REVIEW])
+        .values_list("assigned_sub_registrar")
+        .annotate(n=Count("request_id"))
+        .order_by()
+    )
+    with transaction.atomic():
+        SubRegistrar.objects.exclude(pk__in=counts).update(open_requests=0)
+        for registrar_id, count in counts.items():
+            SubRegistrar.objects.filter(pk=registrar_id).update(open_requests=count)
+    return counts
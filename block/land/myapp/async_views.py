@@ -0,0 +1,94 @@
+"""
+Native async versions of the busiest pages, used under ASGI.
+
+urls.py routes predict, my_requests, request_detail and the dashboard here
+when settings.LAND_ASYNC_VIEWS is on (land/asgi.py turns it on). Database
+access goes through Django's async ORM, and the CPU-bound valuation runs on
+a bounded thread pool so it never blocks the event loop. Query building,
+context and templates are shared with the sync views in views.py.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404
+from django.shortcuts import render
+
+from . import dashboard, views
+from .pagination import akeyset_page
+
+DEFAULT_VALUATION_THREADS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_valuation_executor():
+    """Shared pool for valuation work (settings.LAND_VALUATION_THREADS workers)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "LAND_VALUATION_THREADS", DEFAULT_VALUATION_THREADS),
+                    thread_name_prefix="valuation",
+                )
+    return _executor
+
+
+async def aload_user(request):
+    """Resolve the lazy request.user (a session/DB read) off the event loop"""
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
+
+
+def alogin_required(view):
+    """login_required for async views"""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await aload_user(request)
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def predict(request):
+    await aload_user(request)  # base.html reads it
+    loop = asyncio.get_running_loop()
+    context = await loop.run_in_executor(
+        get_valuation_executor(), views.predict_context, request.method, request.POST
+    )
+    return render(request, "predictor.html", context)
+
+
+@alogin_required
+async def resident_dashboard(request):
+    summary = await dashboard.aget_summary(request.user.pk)
+    return render(request, 'login_dashboard.html', views.dashboard_context(request.user, summary))
+
+
+@alogin_required
+async def my_requests(request):
+    requests, status = views.my_requests_queryset(request.user, request.GET.get('status'))
+    page, next_cursor = await akeyset_page(
+        requests, request.GET.get('cursor'), views.MY_REQUESTS_PAGE_SIZE, pk_field='request_id'
+    )
+    return render(request, 'my_request.html', views.my_requests_context(request, page, next_cursor, status))
+
+
+@alogin_required
+async def request_detail(request, request_id):
+    ownership_request = await views.request_detail_queryset().filter(
+        request_id=request_id, applicant=request.user
+    ).afirst()
+    if ownership_request is None:
+        raise Http404("No request found.")
+    return render(request, 'request_detail.html', {
+        'ownership_request': ownership_request,
+        'history': ownership_request.status_history.all(),
+    })
@@ -0,0 +1,80 @@
+"""
+Background thread shared by the database-backed work queues.
+
+ledger_queue.BlockScheduler and valuation_checks.ValuationChecker keep
+their queued work in tables, so the thread only decides when to look. It
+is started and woken by notify() once a transaction that queued work
+commits, and otherwise polls every IDLE_POLL_SECONDS for rows queued by
+other processes. The same loop runs in the foreground under the queues'
+`--watch` management commands.
+
+A subclass implements work(), which does whatever is due and returns the
+seconds until it wants to run again (None when idle), and record_error().
+thread_setting names the setting that turns the thread off when a
+management command does the work instead.
+"""
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+IDLE_POLL_SECONDS = 5  # picks up rows queued by other processes
+
+
+class BackgroundQueue:
+    """notify/start/stop and the worker loop around a subclass's work()"""
+
+    thread_name = "background-queue"
+    thread_setting = None
+
+    def __init__(self):
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def work(self):
+        raise NotImplementedError
+
+    def record_error(self, error):
+        raise NotImplementedError
+
+    @property
+    def retry_delay(self):
+        """Seconds to wait after work() raised"""
+        return 1
+
+    def notify(self):
+        """Called after queued work commits: wake (or start) the thread"""
+        if self.thread_setting is None or getattr(settings, self.thread_setting, True):
+            self.start()
+        self._wake.set()
+
+    def start(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self.run, name=self.thread_name, daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def thread_alive(self):
+        return bool(self._thread and self._thread.is_alive())
+
+    def run(self):
+        """Worker loop; runs until stop()"""
+        while not self._stop.is_set():
+            close_old_connections()
+            try:
+                wait = self.work()
+            except Exception as e:  # queued rows stay queued; retry shortly
+                self.record_error(e)
+                wait = self.retry_delay
+            self._wake.wait(IDLE_POLL_SECONDS if wait is None else max(wait, 0.001))
+            self._wake.clear()
+        close_old_connections()
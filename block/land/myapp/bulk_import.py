@@ -0,0 +1,226 @@
+"""
+Bulk import of land ownership change requests from CSV or JSON-lines.
+
+Rows are read as a stream and handled in chunks: every row is validated
+against the model fields (including the DeedType/Status choices), the
+applicants of the whole chunk are resolved in one query, and the valid
+requests plus their initial RequestStatusHistory rows are written with
+bulk_create inside one transaction per chunk. Requests imported as DRAFT
+have not changed status, so they get no history row. Invalid rows are
+reported with their line number and skipped; they never abort the chunk.
+"""
+import csv
+import io
+import json
+from collections import namedtuple
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import dashboard, ledger_queue
+from .models import LandOwnershipChangeRequest, RequestStatusHistory
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Columns copied straight onto the model, validated with the model's own fields
+REQUEST_FIELDS = (
+    "survey_number", "village", "district", "property_area_sqft", "property_value",
+    "deed_type", "previous_owner_name", "new_owner_name", "status",
+)
+REQUIRED_COLUMNS = ("applicant",) + tuple(f for f in REQUEST_FIELDS if f != "status")
+
+RowError = namedtuple("RowError", ["line", "message"])
+
+AMBIGUOUS = object()  # _resolve_applicants: an email shared by several users
+
+
+class ImportResult:
+    """Running totals for one import"""
+
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.errors = []
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+    def as_dict(self, max_errors=None):
+        errors = self.errors if max_errors is None else self.errors[:max_errors]
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "failed": self.failed,
+            "errors": [{"line": e.line, "message": e.message} for e in errors],
+        }
+
+
+def detect_format(filename, default="csv"):
+    name = (filename or "").lower()
+    if name.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    if name.endswith(".csv"):
+        return "csv"
+    return default
+
+
+def iter_rows(stream, fmt):
+    """Yield (line_number, row_dict_or_error_message) from a text stream"""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == "jsonl":
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_number, f"Invalid JSON: {e}"
+                continue
+            yield line_number, row if isinstance(row, dict) else "Expected a JSON object"
+    else:
+        raise ValueError(f"Unknown import format {fmt!r} (expected 'csv' or 'jsonl')")
+
+
+def text_stream(binary_file, encoding="utf-8-sig"):
+    """Wrap an uploaded/binary file so it can be read line by line as text"""
+    return io.TextIOWrapper(binary_file, encoding=encoding, newline="")
+
+
+def _chunks(rows, size):
+    chunk = []
+    for item in rows:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+_request_fields = {name: LandOwnershipChangeRequest._meta.get_field(name) for name in REQUEST_FIELDS}
+
+
+def _blank(value):
+    # Tested against None, not falsiness: a JSON 0 is a value
+    return value is None or not str(value).strip()
+
+
+def clean_row(row):
+    """Validate one row; returns (applicant_key, field_values) or raises ValidationError"""
+    missing = [c for c in REQUIRED_COLUMNS if _blank(row.get(c))]
+    if missing:
+        raise ValidationError(f"Missing {', '.join(missing)}")
+
+    values = {}
+    problems = []
+    for name, field in _request_fields.items():
+        raw = row.get(name)
+        if name == "status" and _blank(raw):
+            raw = LandOwnershipChangeRequest.Status.SUBMITTED
+        if isinstance(raw, str):
+            raw = raw.strip()
+        try:
+            values[name] = field.clean(raw, None)
+        except ValidationError as e:
+            problems.append(f"{name}: {' '.join(e.messages)}")
+    if problems:
+        raise ValidationError("; ".join(problems))
+    return str(row["applicant"]).strip(), values
+
+
+def _resolve_applicants(keys):
+    """
+    {username or email: User} for every key, in one query. Usernames win over
+    emails; an email that several users share maps to AMBIGUOUS.
+    """
+    users = User.objects.filter(Q(username__in=keys) | Q(email__in=keys)).only("id", "username", "email")
+    by_username, by_email = {}, {}
+    for user in users:
+        by_username[user.username] = user
+        if user.email:
+            by_email.setdefault(user.email, []).append(user)
+    found = {email: owners[0] if len(owners) == 1 else AMBIGUOUS for email, owners in by_email.items()}
+    found.update(by_username)
+    return found
+
+
+def _stamp_timestamps(ownership_request, now):
+    # bulk_create skips save(), which normally fills these in
+    # Anything past DRAFT has been submitted, which the reviewer queue orders by
+    Status = LandOwnershipChangeRequest.Status
+    if ownership_request.status != Status.DRAFT:
+        ownership_request.submitted_at = now
+    if ownership_request.status == Status.APPROVED:
+        ownership_request.approved_at = now
+
+
+def import_chunk(chunk, result, changed_by=None, source="bulk import"):
+    """Validate and insert one chunk of (line, row) pairs"""
+    cleaned = []
+    for line, row in chunk:
+        result.rows += 1
+        if isinstance(row, str):
+            result.errors.append(RowError(line, row))
+            continue
+        try:
+            cleaned.append((line, *clean_row(row)))
+        except ValidationError as e:
+            result.errors.append(RowError(line, " ".join(e.messages)))
+
+    applicants = _resolve_applicants({key for _, key, _ in cleaned})
+    now = timezone.now()
+    requests, history = [], []
+    for line, applicant_key, values in cleaned:
+        applicant = applicants.get(applicant_key)
+        if applicant is None:
+            result.errors.append(RowError(line, f"applicant: no user {applicant_key!r}"))
+            continue
+        if applicant is AMBIGUOUS:
+            result.errors.append(RowError(
+                line, f"applicant: ambiguous applicant {applicant_key!r} (several users have this email)"
+            ))
+            continue
+        ownership_request = LandOwnershipChangeRequest(applicant=applicant, **values)
+        _stamp_timestamps(ownership_request, now)
+        requests.append(ownership_request)
+        if ownership_request.status != LandOwnershipChangeRequest.Status.DRAFT:
+            # A DRAFT -> DRAFT row would read as a same-status reviewer note
+            history.append(RequestStatusHistory(
+                request=ownership_request,
+                old_status=LandOwnershipChangeRequest.Status.DRAFT,
+                new_status=ownership_request.status,
+                changed_by=changed_by or applicant,
+                comments=f"Imported from {source}.",
+            ))
+
+    if requests:
+        with transaction.atomic():
+            LandOwnershipChangeRequest.objects.bulk_create(requests, batch_size=500)
+            RequestStatusHistory.objects.bulk_create(history, batch_size=500)
+            # bulk_create sends no post_save, so queue the ledger entries here
+            ledger_queue.enqueue_history(history)
+            # bulk_create skips the receivers that drop cached dashboard summaries too
+            transaction.on_commit(lambda: dashboard.invalidate(*{r.applicant_id for r in requests}))
+        result.created += len(requests)
+    return result
+
+
+def import_requests(stream, fmt="csv", changed_by=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                    source="bulk import", on_chunk=None):
+    """
+    Import every row of a text stream. on_chunk(result) is called after each
+    chunk is committed, for progress reporting. Returns the ImportResult.
+    """
+    result = ImportResult()
+    for chunk in _chunks(iter_rows(stream, fmt), chunk_size):
+        import_chunk(chunk, result, changed_by=changed_by, source=source)
+        if on_chunk is not None:
+            on_chunk(result)
+    return result
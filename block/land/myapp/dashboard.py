@@ -0,0 +1,120 @@
+"""
+Per-resident dashboard summary.
+
+Request counts by status come from one aggregate query with conditional
+Count(filter=...); the latest activities are one indexed read of
+RequestStatusHistory. The result is cached per user in a Django cache and
+dropped by the signal receivers in signals.py whenever one of the user's
+requests or history rows is saved, so most dashboard hits run no queries.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Q
+
+from .models import LandOwnershipChangeRequest, RequestStatusHistory
+
+DEFAULT_TIMEOUT = 10 * 60
+DEFAULT_ACTIVITY_COUNT = 5
+ACTIVE_STATUSES = (LandOwnershipChangeRequest.Status.SUBMITTED, LandOwnershipChangeRequest.Status.UNDER_REVIEW)
+
+
+def _cache():
+    return caches[getattr(settings, "DASHBOARD_CACHE_ALIAS", "default")]
+
+
+def _key(user_id):
+    return f"dashboard:summary:{user_id}"
+
+
+def _status_label(value):
+    try:
+        return LandOwnershipChangeRequest.Status(value).label
+    except ValueError:
+        return str(value).replace("_", " ").title()
+
+
+def _counts_query(user_id):
+    Status = LandOwnershipChangeRequest.Status
+    return LandOwnershipChangeRequest.objects.filter(applicant_id=user_id), dict(
+        total=Count("pk"),
+        **{status: Count("pk", filter=Q(status=status)) for status in Status.values},
+    )
+
+
+def _history_query(user_id, activity_count):
+    return (RequestStatusHistory.objects
+            .status_changes()
+            .filter(request__applicant_id=user_id)
+            .order_by("-created_at")
+            .values("request_id", "old_status", "new_status", "comments", "created_at",
+                    "request__village", "request__survey_number")[:activity_count])
+
+
+def _build_summary(counts, history):
+    Status = LandOwnershipChangeRequest.Status
+    by_status = {status: counts[status] for status in Status.values}
+    activities = [
+        {
+            "action": f"Request {_status_label(h['new_status'])}",
+            "description": (
+                f"Survey {h['request__survey_number']}, {h['request__village']}: "
+                f"{_status_label(h['old_status'])} → {_status_label(h['new_status'])}"
+                + (f" ({h['comments']})" if h["comments"] else "")
+            ),
+            "request_id": str(h["request_id"]),
+            "timestamp": h["created_at"],
+        }
+        for h in history
+    ]
+    return {
+        "total": counts["total"],
+        "by_status": by_status,
+        "active": sum(by_status[s] for s in ACTIVE_STATUSES),
+        "approved": by_status[Status.APPROVED],
+        "activities": activities,
+    }
+
+
+def compute_summary(user_id, activity_count=DEFAULT_ACTIVITY_COUNT):
+    requests, aggregates = _counts_query(user_id)
+    return _build_summary(requests.aggregate(**aggregates), list(_history_query(user_id, activity_count)))
+
+
+async def acompute_summary(user_id, activity_count=DEFAULT_ACTIVITY_COUNT):
+    requests, aggregates = _counts_query(user_id)
+    counts = await requests.aaggregate(**aggregates)
+    return _build_summary(counts, [h async for h in _history_query(user_id, activity_count)])
+
+
+def _settings():
+    return (
+        getattr(settings, "DASHBOARD_ACTIVITY_COUNT", DEFAULT_ACTIVITY_COUNT),
+        getattr(settings, "DASHBOARD_CACHE_TIMEOUT", DEFAULT_TIMEOUT),
+    )
+
+
+def get_summary(user_id):
+    """Cached summary for one resident"""
+    cache = _cache()
+    summary = cache.get(_key(user_id))
+    if summary is None:
+        activity_count, timeout = _settings()
+        summary = compute_summary(user_id, activity_count)
+        cache.set(_key(user_id), summary, timeout)
+    return summary
+
+
+async def aget_summary(user_id):
+    cache = _cache()
+    summary = await cache.aget(_key(user_id))
+    if summary is None:
+        activity_count, timeout = _settings()
+        summary = await acompute_summary(user_id, activity_count)
+        await cache.aset(_key(user_id), summary, timeout)
+    return summary
+
+
+def invalidate(*user_ids):
+    keys = [_key(user_id) for user_id in user_ids if user_id is not None]
+    if keys:
+        _cache().delete_many(keys)
@@ -0,0 +1,280 @@
+"""
+Local append-only ledger of request status transitions.
+
+Each RequestStatusHistory row is copied into a LedgerEntry with its own
+SHA-256 hash; entries are sealed into LedgerBlocks that store the Merkle
+root of their entries and the hash of the previous block. Verification is
+incremental: it resumes from the last LedgerCheckpoint and only rehashes
+blocks appended since then.
+"""
+import hashlib
+import json
+from collections import namedtuple
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .merkle import build_levels, merkle_root, pack_levels
+from .models import LedgerBlock, LedgerCheckpoint, LedgerEntry, LedgerMerkleTree
+
+GENESIS_HASH = "0" * 64
+APPEND_RETRIES = 5
+VERIFY_CHUNK_SIZE = 500
+
+
+def _canonical(data):
+    return json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def entry_hash(entry):
+    """SHA-256 of an entry's recorded fields (not its block or position)"""
+    return hashlib.sha256(_canonical({
+        "request_id": str(entry.request_id),
+        "history_id": str(entry.history_id),
+        "old_status": entry.old_status,
+        "new_status": entry.new_status,
+        "changed_by_id": entry.changed_by_id,
+        "comments": entry.comments,
+        "recorded_at": entry.recorded_at.isoformat(),
+    })).hexdigest()
+
+
+def block_hash(height, prev_hash, root, entry_count, created_at):
+    return hashlib.sha256(_canonical({
+        "height": height,
+        "prev_hash": prev_hash,
+        "merkle_root": root,
+        "entry_count": entry_count,
+        "created_at": created_at.isoformat(),
+    })).hexdigest()
+
+
+def entry_from_history(history):
+    """Unsaved LedgerEntry copying a RequestStatusHistory row"""
+    entry = LedgerEntry(
+        request_id=history.request_id,
+        history_id=history.history_id,
+        old_status=history.old_status,
+        new_status=history.new_status,
+        changed_by_id=history.changed_by_id,
+        comments=history.comments,
+        recorded_at=history.created_at or timezone.now(),
+    )
+    entry.entry_hash = entry_hash(entry)
+    return entry
+
+
+def last_block():
+    return LedgerBlock.objects.order_by("-height").first()
+
+
+def append_block(entries):
+    """
+    Seal entries (unsaved LedgerEntry objects) into a new block on the tip of
+    the chain. Concurrent appenders race on the unique prev_hash; the loser
+    retries on the new tip.
+    """
+    entries = list(entries)
+    if not entries:
+        return None
+    levels = build_levels([e.entry_hash for e in entries])
+    root = levels[-1][0]
+
+    for attempt in range(APPEND_RETRIES):
+        tip = last_block()
+        height = tip.height + 1 if tip else 1
+        prev_hash = tip.block_hash if tip else GENESIS_HASH
+        created_at = timezone.now()
+        block = LedgerBlock(
+            height=height,
+            prev_hash=prev_hash,
+            merkle_root=root,
+            entry_count=len(entries),
+            created_at=created_at,
+            block_hash=block_hash(height, prev_hash, root, len(entries), created_at),
+        )
+        try:
+            with transaction.atomic():
+                block.save()
+                for position, entry in enumerate(entries):
+                    entry.block = block
+                    entry.position = position
+                LedgerEntry.objects.bulk_create(entries)
+                # Interior nodes are kept so inclusion proofs never rehash the block
+                LedgerMerkleTree.objects.create(block=block, leaf_count=len(entries), levels=pack_levels(levels))
+        except IntegrityError:
+            if attempt == APPEND_RETRIES - 1:
+                raise
+            continue
+        return block
+
+
+def record_history(history_rows):
+    """Append RequestStatusHistory rows to the ledger as one block"""
+    return append_block(entry_from_history(h) for h in history_rows)
+
+
+# ---------- Verification ----------
+VerificationResult = namedtuple(
+    "VerificationResult", ["ok", "start_height", "verified_height", "blocks_checked", "error"]
+)
+
+
+def verify_block(block, entries, expected_prev_hash):
+    """Return None if block is intact and follows expected_prev_hash, else a reason"""
+    if block.prev_hash != expected_prev_hash:
+        return f"block {block.height}: prev_hash does not match block {block.height - 1}"
+    if len(entries) != block.entry_count:
+        return f"block {block.height}: has {len(entries)} entries, header says {block.entry_count}"
+    for position, entry in enumerate(entries):
+        if entry.position != position:
+            return f"block {block.height}: entry positions are not contiguous"
+        if entry_hash(entry) != entry.entry_hash:
+            return f"block {block.height}: entry {position} content does not match its hash"
+    if merkle_root([e.entry_hash for e in entries]) != block.merkle_root:
+        return f"block {block.height}: merkle root mismatch"
+    expected = block_hash(block.height, block.prev_hash, block.merkle_root, block.entry_count, block.created_at)
+    if expected != block.block_hash:
+        return f"block {block.height}: header hash mismatch"
+    return None
+
+
+def iter_blocks_with_entries(start_height, end_height=None, chunk_size=VERIFY_CHUNK_SIZE):
+    """Yield (block, [entries]) for heights > start_height (<= end_height), in order"""
+    after = start_height
+    while True:
+        blocks = LedgerBlock.objects.filter(height__gt=after)
+        if end_height is not None:
+            blocks = blocks.filter(height__lte=end_height)
+        blocks = list(blocks.order_by("height")[:chunk_size])
+        if not blocks:
+            return
+        by_block = {b.height: [] for b in blocks}
+        entries = LedgerEntry.objects.filter(
+            block_id__gte=blocks[0].height, block_id__lte=blocks[-1].height
+        ).order_by("block_id", "position")
+        for entry in entries:
+            by_block[entry.block_id].append(entry)
+        for block in blocks:
+            yield block, by_block[block.height]
+        after = blocks[-1].height
+
+
+SegmentResult = namedtuple(
+    "SegmentResult",
+    ["after_height", "end_height", "first_prev_hash", "last_hash", "blocks_checked", "verified_height", "error"],
+)
+
+
+def verify_segment(after_height, end_height, chunk_size=VERIFY_CHUNK_SIZE):
+    """
+    Verify blocks in (after_height, end_height] on their own: entry hashes,
+    merkle roots, headers and the links between blocks inside the segment.
+    The link into the segment (first_prev_hash) is left to the caller, which
+    can run segments in any order or in parallel and then join them.
+    """
+    first_prev = last_hash = None
+    checked = 0
+    verified_height = after_height
+    for block, entries in iter_blocks_with_entries(after_height, end_height, chunk_size):
+        if block.height != verified_height + 1:
+            return SegmentResult(after_height, end_height, first_prev, last_hash, checked, verified_height,
+                                 f"block {verified_height + 1} is missing")
+        if first_prev is None:
+            first_prev = block.prev_hash
+        error = verify_block(block, entries, block.prev_hash if last_hash is None else last_hash)
+        if error:
+            return SegmentResult(after_height, end_height, first_prev, last_hash, checked, verified_height, error)
+        last_hash = block.block_hash
+        verified_height = block.height
+        checked += 1
+    error = None if verified_height == end_height else f"block {verified_height + 1} is missing"
+    return SegmentResult(after_height, end_height, first_prev, last_hash, checked, verified_height, error)
+
+
+def split_segments(after_height, end_height, segment_size):
+    """[(after, end), ...] covering (after_height, end_height] in order"""
+    return [
+        (start, min(start + segment_size, end_height))
+        for start in range(after_height, end_height, segment_size)
+    ]
+
+
+def join_segments(results, start_height, expected_prev):
+    """
+    Check segment results in height order, including each segment's link to
+    the one before it. Returns (verified_height, tip_hash, blocks_checked, error).
+    Segments skipped after a failure leave a gap; the failure is reported
+    instead of joining across it.
+    """
+    verified_height, checked = start_height, 0
+    ordered = sorted(results, key=lambda r: r.after_height)
+    for result in ordered:
+        if result.after_height != verified_height:
+            failed = next((r for r in ordered if r.error), None)
+            error = failed.error if failed else f"blocks after {verified_height} were not verified"
+            return verified_height, expected_prev, checked, error
+        if result.blocks_checked and result.first_prev_hash != expected_prev:
+            return verified_height, expected_prev, checked, (
+                f"block {result.after_height + 1}: prev_hash does not match block {result.after_height}"
+            )
+        checked += result.blocks_checked
+        if result.error:
+            return result.verified_height, result.last_hash or expected_prev, checked, result.error
+        expected_prev = result.last_hash or expected_prev
+        verified_height = result.verified_height
+    return verified_height, expected_prev, checked, None
+
+
+def verify_ledger(full=False, save_checkpoint=True, workers=1, segment_size=None, progress=None):
+    """
+    Verify blocks appended since the last checkpoint (or all blocks if full).
+    On success the new tip becomes the checkpoint.
+
+    The range is split into segments that are verified independently, in
+    parallel across `workers` processes when workers > 1 (see
+    ledger_parallel), and then joined with boundary checks.
+    progress(blocks_done, blocks_total) is called as segments finish.
+    """
+    checkpoint = None if full else LedgerCheckpoint.objects.first()
+    start_height, expected_prev = 0, GENESIS_HASH
+    if checkpoint is not None:
+        anchor = LedgerBlock.objects.filter(height=checkpoint.height).first()
+        if anchor is None or anchor.block_hash != checkpoint.block_hash:
+            return VerificationResult(
+                False, checkpoint.height, checkpoint.height, 0,
+                f"checkpoint block {checkpoint.height} was altered or removed",
+            )
+        start_height, expected_prev = checkpoint.height, checkpoint.block_hash
+
+    tip = last_block()
+    end_height = tip.height if tip else 0
+    if end_height <= start_height:
+        return VerificationResult(True, start_height, start_height, 0, None)
+
+    total = end_height - start_height
+    if segment_size is None:
+        # A few segments per worker keeps the pool busy when segments finish unevenly
+        segment_size = max(VERIFY_CHUNK_SIZE, -(-total // (workers * 4)))
+    segments = split_segments(start_height, end_height, segment_size)
+
+    if workers > 1 and len(segments) > 1:
+        from .ledger_parallel import verify_segments_parallel
+        results = verify_segments_parallel(segments, workers, progress)
+    else:
+        results, done = [], 0
+        for after, end in segments:
+            result = verify_segment(after, end)
+            results.append(result)
+            done += end - after
+            if progress is not None:
+                progress(done, total)
+            if result.error:
+                break
+
+    verified_height, tip_hash, checked, error = join_segments(results, start_height, expected_prev)
+    if error:
+        return VerificationResult(False, start_height, verified_height, checked, error)
+    if save_checkpoint:
+        LedgerCheckpoint.objects.create(height=verified_height, block_hash=tip_hash)
+    return VerificationResult(True, start_height, verified_height, checked, None)
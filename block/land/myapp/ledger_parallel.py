@@ -0,0 +1,73 @@
+"""
+Process-pool verification of ledger segments.
+
+Rehashing is CPU-bound, so threads would serialize on the GIL. Each worker
+process opens its own database connection, reads and verifies whole
+segments with ledger.verify_segment, and returns a small SegmentResult; the
+parent joins them with the cross-segment link checks. Once a segment fails,
+segments not yet started are cancelled. The pool takes segments in height
+order, so those all lie past the failure, and join_segments stops there.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.db import connections
+
+
+def _init_worker():
+    import django
+
+    django.setup()
+    # Never reuse a connection inherited from the parent process
+    for conn in connections.all():
+        conn.close()
+
+
+def _verify(segment):
+    from .ledger import verify_segment
+
+    return verify_segment(*segment)
+
+
+def _in_memory_database():
+    return any(conn.vendor == "sqlite" and conn.is_in_memory_db() for conn in connections.all())
+
+
+def verify_segments_parallel(segments, workers, progress=None):
+    """Verify (after, end) segments across `workers` processes; returns SegmentResults"""
+    total = segments[-1][1] - segments[0][0]
+    if _in_memory_database():
+        # Other processes cannot see an in-memory database (e.g. under tests)
+        return _verify_in_process(segments, total, progress)
+
+    # Close ours so forked children don't share the socket/file handle
+    connections.close_all()
+    results, done = [], 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {pool.submit(_verify, segment): segment for segment in segments}
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            result = future.result()
+            results.append(result)
+            done += result.end_height - result.after_height
+            if progress is not None:
+                progress(done, total)
+            if result.error:
+                for pending in futures:
+                    pending.cancel()
+    return results
+
+
+def _verify_in_process(segments, total, progress):
+    from .ledger import verify_segment
+
+    results, done = [], 0
+    for segment in segments:
+        result = verify_segment(*segment)
+        results.append(result)
+        done += result.end_height - result.after_height
+        if progress is not None:
+            progress(done, total)
+        if result.error:
+            break
+    return results
@@ -0,0 +1,232 @@
+"""
+Batched sealing of ledger blocks.
+
+Status transitions are not hashed into the chain while the request that
+made them waits. The post_save receiver only writes a LedgerQueueItem in
+the request's own transaction, so the transition is acknowledged as soon
+as it is durably queued. A BlockScheduler then seals queued rows into a
+block once settings.LEDGER_BATCH_SIZE of them are waiting or the oldest has
+waited settings.LEDGER_BATCH_MAX_DELAY_MS, writing the block, its entries
+and the removal of the queue rows in one transaction.
+
+Each web process runs the scheduler on a daemon thread, started on the
+first enqueue (settings.LEDGER_SEALER_THREAD). Alternatively run
+`manage.py seal_ledger --watch` as a dedicated sealer and turn the thread
+off. Rows left behind by a process that exits are sealed by the next one.
+"""
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from . import ledger
+from .background import BackgroundQueue
+from .models import LedgerEntry, LedgerQueueItem
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_MAX_DELAY_MS = 250
+METRIC_SAMPLES = 1024
+
+
+def enqueue_history(history_rows):
+    """Queue RequestStatusHistory rows for sealing (in the caller's transaction)"""
+    items = [
+        LedgerQueueItem(
+            history_id=h.history_id,
+            request_id=h.request_id,
+            old_status=h.old_status,
+            new_status=h.new_status,
+            changed_by_id=h.changed_by_id,
+            comments=h.comments,
+            recorded_at=h.created_at or timezone.now(),
+        )
+        for h in history_rows
+    ]
+    if items:
+        LedgerQueueItem.objects.bulk_create(items)
+        transaction.on_commit(get_scheduler().notify)
+    return len(items)
+
+
+def entry_from_item(item):
+    entry = LedgerEntry(
+        request_id=item.request_id,
+        history_id=item.history_id,
+        old_status=item.old_status,
+        new_status=item.new_status,
+        changed_by_id=item.changed_by_id,
+        comments=item.comments,
+        recorded_at=item.recorded_at,
+    )
+    entry.entry_hash = ledger.entry_hash(entry)
+    return entry
+
+
+class _Claimed(Exception):
+    """Another sealer took some of the rows first"""
+
+
+class SealerMetrics:
+    """Batch size, seal latency and throughput counters for one process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=METRIC_SAMPLES)  # (batch size, latency ms, duration ms)
+        self.blocks_sealed = 0
+        self.entries_sealed = 0
+        self.contended = 0
+        self.errors = 0
+        self.last_error = None
+
+    def record(self, size, latency_ms, duration_ms):
+        with self._lock:
+            self.blocks_sealed += 1
+            self.entries_sealed += size
+            self._samples.append((size, latency_ms, duration_ms))
+
+    def record_contended(self):
+        with self._lock:
+            self.contended += 1
+
+    def record_error(self, error):
+        with self._lock:
+            self.errors += 1
+            self.last_error = repr(error)
+
+    @staticmethod
+    def _summary(values):
+        if not values:
+            return {"mean": 0, "p50": 0, "p95": 0, "max": 0}
+        values = sorted(values)
+        return {
+            "mean": round(sum(values) / len(values), 2),
+            "p50": values[len(values) // 2],
+            "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+            "max": values[-1],
+        }
+
+    def stats(self):
+        with self._lock:
+            samples = list(self._samples)
+            counters = {
+                "blocks_sealed": self.blocks_sealed,
+                "entries_sealed": self.entries_sealed,
+                "contended": self.contended,
+                "errors": self.errors,
+                "last_error": self.last_error,
+            }
+        counters["batch_size"] = self._summary([s[0] for s in samples])
+        counters["seal_latency_ms"] = self._summary([s[1] for s in samples])
+        counters["seal_duration_ms"] = self._summary([s[2] for s in samples])
+        return counters
+
+
+class BlockScheduler(BackgroundQueue):
+    """Seals queued transitions into blocks by size or age"""
+
+    thread_name = "ledger-sealer"
+    thread_setting = "LEDGER_SEALER_THREAD"
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, max_delay_ms=DEFAULT_MAX_DELAY_MS):
+        super().__init__()
+        self.batch_size = max(1, int(batch_size))
+        self.max_delay = max(0, max_delay_ms) / 1000.0
+        self.metrics = SealerMetrics()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            batch_size=getattr(settings, "LEDGER_BATCH_SIZE", DEFAULT_BATCH_SIZE),
+            max_delay_ms=getattr(settings, "LEDGER_BATCH_MAX_DELAY_MS", DEFAULT_MAX_DELAY_MS),
+        )
+
+    # ---------- Sealing ----------
+    def seal_batch(self):
+        """Seal up to batch_size of the oldest queued rows; returns the block or None"""
+        started = time.monotonic()
+        try:
+            with transaction.atomic():
+                items = list(LedgerQueueItem.objects.order_by("id")[:self.batch_size])
+                if not items:
+                    return None
+                # Claim the rows first: a concurrent sealer that got any of them
+                # deletes fewer than we read, and this transaction backs out.
+                deleted, _ = LedgerQueueItem.objects.filter(pk__in=[i.pk for i in items]).delete()
+                if deleted != len(items):
+                    raise _Claimed()
+                block = ledger.append_block(entry_from_item(i) for i in items)
+        except _Claimed:
+            self.metrics.record_contended()
+            return None
+        duration_ms = (time.monotonic() - started) * 1000
+        latency_ms = (timezone.now() - items[0].enqueued_at).total_seconds() * 1000
+        self.metrics.record(len(items), round(latency_ms, 1), round(duration_ms, 1))
+        return block
+
+    def queue_state(self):
+        """(depth, enqueued_at of the oldest row or None)"""
+        state = LedgerQueueItem.objects.aggregate(depth=Count("id"), oldest=Min("enqueued_at"))
+        return state["depth"], state["oldest"]
+
+    def seal_due(self):
+        """
+        Seal every batch that is due. Returns seconds until the next row
+        becomes due, or None when the queue is empty.
+        """
+        while True:
+            depth, oldest = self.queue_state()
+            if not depth:
+                return None
+            waited = (timezone.now() - oldest).total_seconds()
+            if depth < self.batch_size and waited < self.max_delay:
+                return self.max_delay - waited
+            if self.seal_batch() is None:
+                return self.max_delay  # another sealer has these rows; look again shortly
+
+    def flush(self):
+        """Seal everything queued now, regardless of size or age; returns blocks sealed"""
+        sealed = 0
+        while LedgerQueueItem.objects.exists():
+            if self.seal_batch() is not None:
+                sealed += 1
+        return sealed
+
+    # ---------- Background thread ----------
+    def work(self):
+        return self.seal_due()
+
+    def record_error(self, error):
+        self.metrics.record_error(error)
+
+    @property
+    def retry_delay(self):
+        return self.max_delay or 1
+
+    def stats(self):
+        depth, oldest = self.queue_state()
+        stats = self.metrics.stats()
+        stats.update({
+            "queue_depth": depth,
+            "oldest_queued_ms": round((timezone.now() - oldest).total_seconds() * 1000, 1) if oldest else 0,
+            "batch_size_limit": self.batch_size,
+            "max_delay_ms": int(self.max_delay * 1000),
+            "thread_alive": self.thread_alive(),
+        })
+        return stats
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = BlockScheduler.from_settings()
+    return _scheduler
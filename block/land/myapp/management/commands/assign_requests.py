@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from myapp.assignment import DEFAULT_BATCH_SIZE, assign_pending, recount_open_requests
+
+
+class Command(BaseCommand):
+    help = "Route unassigned SUBMITTED requests to the least-loaded sub-registrar in their district"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--watch", type=float, metavar="SECONDS",
+                            help="Keep running, looking for new submissions every SECONDS")
+        parser.add_argument("--recount", action="store_true",
+                            help="Rebuild the per-registrar open request counters first")
+
+    def handle(self, *args, **options):
+        if options["recount"]:
+            counts = recount_open_requests()
+            self.stdout.write(f"Recounted open requests for {len(counts)} sub-registrar(s).")
+        while True:
+            result = assign_pending(options["batch_size"])
+            if result.assigned or result.unmatched or not options["watch"]:
+                self.stdout.write(
+                    f"Assigned {result.assigned} request(s); "
+                    f"{result.unmatched} have no sub-registrar in their district."
+                )
+            if not options["watch"]:
+                return
+            time.sleep(options["watch"])
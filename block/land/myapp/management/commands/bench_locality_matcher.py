@@ -0,0 +1,68 @@
+import random
+import time
+from difflib import get_close_matches
+
+from django.core.management.base import BaseCommand
+
+from myapp.matcher import LocalityMatcher
+from myapp.utils import get_price_data
+
+
+def misspell(name, rng):
+    """Drop, swap or replace one character"""
+    if len(name) < 3:
+        return name + "x"
+    i = rng.randrange(len(name) - 1)
+    edit = rng.choice(("drop", "swap", "replace"))
+    if edit == "drop":
+        return name[:i] + name[i + 1:]
+    if edit == "swap":
+        return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    return name[:i] + rng.choice("aeioukrtn") + name[i + 1:]
+
+
+class Command(BaseCommand):
+    help = "Benchmark LocalityMatcher against difflib.get_close_matches on the real locality set"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queries", type=int, default=2000, help="Number of lookups (default: 2000)")
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        district_localities = get_price_data().district_localities
+        districts = sorted(district_localities)
+
+        queries = []
+        for _ in range(options["queries"]):
+            district = rng.choice(districts)
+            name = rng.choice(district_localities[district])
+            # Mix of misspellings and names that should not match at all
+            word = misspell(name, rng) if rng.random() < 0.8 else "".join(rng.sample("bcdfghjklmnpqrstvwxyz", 8))
+            queries.append((district, word))
+
+        start = time.perf_counter()
+        matchers = {d: LocalityMatcher(names) for d, names in district_localities.items()}
+        build_time = time.perf_counter() - start
+
+        lowered = {d: {n.lower(): n for n in names} for d, names in district_localities.items()}
+        start = time.perf_counter()
+        expected = []
+        for district, word in queries:
+            found = get_close_matches(word.lower(), list(lowered[district]), n=1, cutoff=0.6)
+            expected.append(lowered[district][found[0]] if found else None)
+        difflib_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = [matchers[district].best_match(word) for district, word in queries]
+        matcher_time = time.perf_counter() - start
+
+        mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+        n = len(queries)
+        self.stdout.write(f"localities: {sum(len(v) for v in district_localities.values())} in {len(districts)} districts")
+        self.stdout.write(f"index build: {build_time * 1000:.1f} ms")
+        self.stdout.write(f"difflib:     {difflib_time * 1000:.1f} ms ({difflib_time / n * 1e6:.0f} us/query)")
+        self.stdout.write(f"matcher:     {matcher_time * 1000:.1f} ms ({matcher_time / n * 1e6:.0f} us/query)")
+        self.stdout.write(f"speedup:     {difflib_time / matcher_time:.1f}x")
+        style = self.style.SUCCESS if not mismatches else self.style.ERROR
+        self.stdout.write(style(f"mismatches:  {mismatches}/{n}"))
@@ -0,0 +1,27 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from myapp.snapshot import write_snapshot
+from myapp.utils import get_prices_csv_path, get_snapshot_path, read_price_csv
+
+
+class Command(BaseCommand):
+    help = "Compile the land price CSV into the memory-mapped binary snapshot used by the predictor"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--csv", help="Source CSV (default: settings.LAND_PRICES_CSV or the bundled file)")
+        parser.add_argument("--output", help="Snapshot path (default: settings.LAND_PRICES_SNAPSHOT or next to the CSV)")
+
+    def handle(self, *args, **options):
+        csv_path = Path(options["csv"] or get_prices_csv_path())
+        output = Path(options["output"] or get_snapshot_path(csv_path))
+
+        df = read_price_csv(csv_path)
+        header = write_snapshot(df, output, csv_path)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {header['rows']} rows "
+            f"({len(header['dictionaries']['district'])} districts, "
+            f"{len(header['dictionaries']['locality'])} localities) to {output}"
+        ))
@@ -0,0 +1,28 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from myapp.valuation_checks import get_checker
+
+
+class Command(BaseCommand):
+    help = "Run queued valuation checks on submitted requests (once, or continuously with --watch)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--watch", action="store_true",
+            help="Keep running as the checker, in batches of LAND_VALUATION_CHECK_BATCH_SIZE",
+        )
+
+    def handle(self, *args, **options):
+        checker = get_checker()
+        if options["watch"]:
+            self.stdout.write(f"Checking requests in batches of up to {checker.batch_size} (Ctrl+C to stop)")
+            try:
+                checker.run()
+            except KeyboardInterrupt:
+                pass
+        else:
+            checked = checker.process_all()
+            self.stdout.write(self.style.SUCCESS(f"Checked {checked} request(s)."))
+        self.stdout.write(json.dumps(checker.stats(), indent=2, default=str))
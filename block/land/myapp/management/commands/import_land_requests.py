@@ -0,0 +1,52 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.bulk_import import DEFAULT_CHUNK_SIZE, detect_format, import_requests
+
+
+class Command(BaseCommand):
+    help = "Bulk import land ownership change requests from a CSV or JSON-lines file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV (header row) or .jsonl file; one request per row")
+        parser.add_argument("--format", choices=("csv", "jsonl"), help="Default: from the file extension")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                            help=f"Rows per transaction (default: {DEFAULT_CHUNK_SIZE})")
+        parser.add_argument("--changed-by", help="Username recorded on the history rows (default: the applicant)")
+
+    def handle(self, *args, **options):
+        changed_by = None
+        if options["changed_by"]:
+            try:
+                changed_by = User.objects.get(username=options["changed_by"])
+            except User.DoesNotExist:
+                raise CommandError(f"No user {options['changed_by']!r}")
+
+        fmt = options["format"] or detect_format(options["path"])
+        started = time.monotonic()
+        reported = 0
+
+        def progress(result):
+            nonlocal reported
+            for error in result.errors[reported:]:
+                self.stderr.write(f"line {error.line}: {error.message}")
+            reported = len(result.errors)
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"{result.rows} rows, {result.created} created, {result.failed} failed "
+                f"({result.rows / elapsed if elapsed else 0:.0f} rows/s)"
+            )
+
+        try:
+            with open(options["path"], encoding="utf-8-sig", newline="") as stream:
+                result = import_requests(
+                    stream, fmt, changed_by=changed_by, chunk_size=options["chunk_size"],
+                    source=options["path"], on_chunk=progress,
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        style = self.style.SUCCESS if not result.failed else self.style.WARNING
+        self.stdout.write(style(f"Imported {result.created} of {result.rows} rows; {result.failed} failed."))
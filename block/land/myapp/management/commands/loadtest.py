@@ -0,0 +1,147 @@
+"""
+HTTP load test for comparing deployments, e.g. WSGI against ASGI:
+
+    gunicorn land.wsgi -w 4 --threads 8 -b 127.0.0.1:8000
+    uvicorn land.asgi:application --workers 4 --port 8001
+    python manage.py loadtest --target wsgi=http://127.0.0.1:8000 --target asgi=http://127.0.0.1:8001 \\
+        --get /prediction/ --post /prediction/ "district=Ernakulam&locality=Kakkanad" \\
+        --cookie sessionid=... --get /my-requests/ --get /dashboard/
+
+Every target gets the same request mix, one target at a time. Each client
+thread keeps one connection alive and cycles through the mix. POSTs fetch
+a CSRF token first. Reports requests/s and latency percentiles per target.
+Run it from a separate machine (or cores) so the client is not the bottleneck.
+"""
+import http.client
+import threading
+import time
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+class Client:
+    """One keep-alive connection with its own cookies"""
+
+    def __init__(self, base_url, cookies, timeout):
+        parts = urlsplit(base_url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.connection = connection_class(parts.netloc, timeout=timeout)
+        self.prefix = parts.path.rstrip("/")
+        self.cookies = dict(cookies)
+
+    def request(self, method, path, body=None):
+        headers = {"Cookie": "; ".join(f"{k}={v}" for k, v in self.cookies.items())}
+        if method == "POST":
+            if "csrftoken" not in self.cookies:
+                self.request("GET", path)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+            headers["X-CSRFToken"] = self.cookies.get("csrftoken", "")
+        try:
+            self.connection.request(method, self.prefix + path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            raise
+        for header in response.headers.get_all("Set-Cookie") or []:
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+        return response.status
+
+
+class Command(BaseCommand):
+    help = "Compare requests/s and latency percentiles of one or more running deployments"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--target", action="append", required=True, metavar="NAME=URL",
+                            help="Deployment to test, e.g. asgi=http://127.0.0.1:8001 (repeatable)")
+        parser.add_argument("--get", action="append", default=[], metavar="PATH", help="GET request in the mix")
+        parser.add_argument("--post", action="append", nargs=2, default=[], metavar=("PATH", "FORM"),
+                            help="POST request in the mix, with a urlencoded form body")
+        parser.add_argument("--cookie", action="append", default=[], metavar="NAME=VALUE",
+                            help="Cookie sent by every client, e.g. an authenticated sessionid")
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds per target")
+        parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds per target")
+        parser.add_argument("--timeout", type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        mix = [("GET", path, None) for path in options["get"]]
+        mix += [("POST", path, form.encode()) for path, form in options["post"]]
+        if not mix:
+            raise CommandError("Give at least one --get or --post request")
+        try:
+            targets = [t.split("=", 1) for t in options["target"]]
+            cookies = dict(c.split("=", 1) for c in options["cookie"])
+            for name, url in targets:
+                if not url.startswith(("http://", "https://")):
+                    raise ValueError(url)
+        except ValueError:
+            raise CommandError("--target must be NAME=http://host:port and --cookie NAME=VALUE")
+
+        rows = []
+        for name, url in targets:
+            self.stdout.write(f"{name}: {options['concurrency']} clients for {options['duration']}s against {url}")
+            rows.append((name, self.run_target(url, mix, cookies, options)))
+
+        self.stdout.write("")
+        self.stdout.write(f"{'target':<12}{'requests':>10}{'errors':>8}{'req/s':>10}"
+                          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for name, stats in rows:
+            self.stdout.write(
+                f"{name:<12}{stats['requests']:>10}{stats['errors']:>8}{stats['rps']:>10.1f}"
+                f"{stats['p50']:>10.1f}{stats['p95']:>10.1f}{stats['p99']:>10.1f}"
+            )
+
+    def run_target(self, url, mix, cookies, options):
+        latencies, errors = [], [0]
+        lock = threading.Lock()
+        started = time.monotonic()
+        measure_from = started + options["warmup"]
+        stop_at = measure_from + options["duration"]
+
+        def worker(offset):
+            client = Client(url, cookies, options["timeout"])
+            local, failed, i = [], 0, offset
+            while True:
+                method, path, body = mix[i % len(mix)]
+                i += 1
+                sent = time.monotonic()
+                if sent >= stop_at:
+                    break
+                try:
+                    ok = client.request(method, path, body) < 400
+                except (OSError, http.client.HTTPException):
+                    ok = False
+                if sent >= measure_from:
+                    if ok:
+                        local.append((time.monotonic() - sent) * 1000)
+                    else:
+                        failed += 1
+            with lock:
+                latencies.extend(local)
+                errors[0] += failed
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(options["concurrency"])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        latencies.sort()
+        return {
+            "requests": len(latencies) + errors[0],
+            "errors": errors[0],
+            "rps": len(latencies) / options["duration"],
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+        }
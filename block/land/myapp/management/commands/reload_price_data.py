@@ -0,0 +1,52 @@
+import os
+import signal
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.snapshot import write_snapshot
+from myapp.utils import dataset_version, get_prices_csv_path, get_snapshot_path, read_price_csv
+
+
+class Command(BaseCommand):
+    help = (
+        "Prepare a refreshed land price CSV for running workers: rebuild the snapshot "
+        "(if one is in use) and optionally signal workers to reload now"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pid", type=int, nargs="*", default=[],
+                            help="Worker PIDs to send settings.LAND_PRICES_RELOAD_SIGNAL to")
+        parser.add_argument("--no-snapshot", action="store_true",
+                            help="Do not rebuild an existing snapshot")
+
+    def handle(self, *args, **options):
+        csv_path = Path(get_prices_csv_path())
+        if not csv_path.exists():
+            raise CommandError(f"{csv_path} does not exist")
+
+        snapshot_path = get_snapshot_path(csv_path)
+        if snapshot_path.exists() and not options["no_snapshot"]:
+            write_snapshot(read_price_csv(csv_path), snapshot_path, csv_path)
+            self.stdout.write(f"Rebuilt snapshot {snapshot_path}")
+
+        version = dataset_version(csv_path)
+        self.stdout.write(f"Dataset version {version}")
+
+        if options["pid"]:
+            name = getattr(settings, "LAND_PRICES_RELOAD_SIGNAL", None)
+            if not name:
+                raise CommandError("LAND_PRICES_RELOAD_SIGNAL is not set; workers are not listening")
+            signum = getattr(signal, name)
+            for pid in options["pid"]:
+                try:
+                    os.kill(pid, signum)
+                except ProcessLookupError:
+                    self.stderr.write(f"No process {pid}")
+                    continue
+                self.stdout.write(f"Sent {name} to {pid}")
+        elif getattr(settings, "LAND_PRICES_RELOAD_INTERVAL", None):
+            self.stdout.write("Workers polling for changes will pick it up on their next check.")
+
+        self.stdout.write(self.style.SUCCESS("Done"))
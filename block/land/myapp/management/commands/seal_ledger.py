@@ -0,0 +1,31 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from myapp.ledger_queue import get_scheduler
+
+
+class Command(BaseCommand):
+    help = "Seal queued status transitions into ledger blocks (once, or continuously with --watch)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--watch", action="store_true",
+            help="Keep running as the sealer, by LEDGER_BATCH_SIZE / LEDGER_BATCH_MAX_DELAY_MS",
+        )
+
+    def handle(self, *args, **options):
+        scheduler = get_scheduler()
+        if options["watch"]:
+            self.stdout.write(
+                f"Sealing blocks of up to {scheduler.batch_size} entries "
+                f"every {int(scheduler.max_delay * 1000)} ms (Ctrl+C to stop)"
+            )
+            try:
+                scheduler.run()
+            except KeyboardInterrupt:
+                pass
+        else:
+            sealed = scheduler.flush()
+            self.stdout.write(self.style.SUCCESS(f"Sealed {sealed} block(s)."))
+        self.stdout.write(json.dumps(scheduler.stats(), indent=2, default=str))
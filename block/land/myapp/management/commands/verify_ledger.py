@@ -0,0 +1,46 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.ledger import verify_ledger
+
+
+class Command(BaseCommand):
+    help = "Verify the hash-chained ledger (blocks appended since the last checkpoint, or --full)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Rehash the whole chain from genesis")
+        parser.add_argument("--no-checkpoint", action="store_true", help="Do not record a new checkpoint")
+        parser.add_argument(
+            "--workers", type=int, default=1,
+            help=f"Verify segments in this many processes (this machine has {os.cpu_count()} CPUs)",
+        )
+        parser.add_argument("--segment-size", type=int, default=None, help="Blocks per segment")
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1:
+            raise CommandError("--workers must be at least 1")
+        if options["segment_size"] is not None and options["segment_size"] < 1:
+            raise CommandError("--segment-size must be at least 1")
+        started = time.monotonic()
+
+        def progress(done, total):
+            self.stdout.write(f"  {done}/{total} blocks ({done * 100 // total}%)")
+
+        result = verify_ledger(
+            full=options["full"],
+            save_checkpoint=not options["no_checkpoint"],
+            workers=options["workers"],
+            segment_size=options["segment_size"],
+            progress=progress if options["verbosity"] >= 1 else None,
+        )
+        if not result.ok:
+            raise CommandError(
+                f"Ledger verification failed after block {result.verified_height}: {result.error}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Verified {result.blocks_checked} block(s) "
+            f"({result.start_height + 1 if result.blocks_checked else result.start_height}"
+            f"..{result.verified_height}) in {time.monotonic() - started:.2f}s; ledger intact."
+        ))
@@ -0,0 +1,87 @@
+"""
+Fuzzy locality matching for the price predictor.
+
+LocalityMatcher gives the same answer as
+    difflib.get_close_matches(word, names, n=1, cutoff=0.6)
+on lowercased strings, but avoids running SequenceMatcher against every
+name. It keeps a character n-gram (unigram) count matrix per district and
+uses the two upper bounds difflib itself applies (length ratio and shared
+character count) to prune the list in one vectorized step. The survivors
+are scored best-bound-first and the search stops as soon as no remaining
+bound can beat the best exact ratio, so the 0.6 cutoff is honoured exactly.
+"""
+from difflib import SequenceMatcher
+
+import numpy as np
+
+DEFAULT_CUTOFF = 0.6
+
+
+class LocalityMatcher:
+    """Case-insensitive closest-name lookup over a fixed list of names"""
+
+    def __init__(self, names):
+        self.names = []
+        self._keys = []
+        seen = set()
+        for name in names:
+            key = str(name).lower()
+            if key not in seen:
+                seen.add(key)
+                self.names.append(name)
+                self._keys.append(key)
+
+        alphabet = sorted({ch for key in self._keys for ch in key})
+        self._alphabet = {ch: i for i, ch in enumerate(alphabet)}
+        self._counts = np.zeros((len(self._keys), len(alphabet)), dtype=np.int16)
+        for row, key in enumerate(self._keys):
+            for ch in key:
+                self._counts[row, self._alphabet[ch]] += 1
+        self._lengths = np.array([len(key) for key in self._keys], dtype=np.int32)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _upper_bounds(self, key):
+        """Per-name upper bound of SequenceMatcher.ratio() against key"""
+        query = np.zeros(len(self._alphabet), dtype=np.int16)
+        for ch in key:
+            index = self._alphabet.get(ch)
+            if index is not None:
+                query[index] += 1
+        shared = np.minimum(self._counts, query).sum(axis=1)
+        return 2.0 * shared / (self._lengths + len(key))
+
+    def best_match(self, word, cutoff=DEFAULT_CUTOFF):
+        """Closest name with ratio >= cutoff (original spelling), or None"""
+        if not self._keys:
+            return None
+        key = str(word).lower()
+        if not key:
+            return None
+
+        bounds = self._upper_bounds(key)
+        candidates = np.flatnonzero(bounds >= cutoff)
+        if not candidates.size:
+            return None
+        candidates = candidates[np.argsort(-bounds[candidates], kind="stable")]
+
+        matcher = SequenceMatcher()
+        matcher.set_seq2(key)
+        best = None  # (score, key, index); ties go to the larger key, as in difflib
+        for index in candidates:
+            if best is not None and bounds[index] < best[0]:
+                break
+            matcher.set_seq1(self._keys[index])
+            score = matcher.ratio()
+            if score < cutoff:
+                continue
+            candidate = (score, self._keys[index], index)
+            if best is None or candidate > best:
+                best = candidate
+        return self.names[best[2]] if best else None
+
+
+def build_matchers(district_localities):
+    """One LocalityMatcher per district, keyed like district_localities"""
+    return {district: LocalityMatcher(names) for district, names in district_localities.items()}
@@ -0,0 +1,125 @@
+"""
+SHA-256 Merkle trees over hex-encoded leaf hashes.
+
+Interior nodes are sha256(left || right) over the raw 32-byte digests. A
+level with an odd number of nodes carries its last node up unchanged, so
+no leaf is ever hashed twice. Because of that rule the shape of the tree,
+and so which side each sibling is on, follows from (index, leaf_count)
+alone: an inclusion proof is just those two numbers plus the sibling
+digests, one per level at most.
+"""
+import base64
+import hashlib
+import struct
+
+DIGEST_SIZE = 32
+EMPTY_ROOT = hashlib.sha256(b"").hexdigest()
+PROOF_VERSION = 1
+_PROOF_HEADER = struct.Struct(">BQII")  # version, block height, leaf index, leaf count
+
+
+def hash_pair(left, right):
+    return hashlib.sha256(bytes.fromhex(left) + bytes.fromhex(right)).hexdigest()
+
+
+def next_level(level):
+    parents = [hash_pair(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+    if len(level) % 2:
+        parents.append(level[-1])
+    return parents
+
+
+def build_levels(leaves):
+    """Every level of the tree, leaves first and the root last"""
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        levels.append(next_level(levels[-1]))
+    return levels
+
+
+def merkle_root(leaves):
+    """Root of the tree over leaves (hex digests); EMPTY_ROOT for no leaves"""
+    level = list(leaves)
+    if not level:
+        return EMPTY_ROOT
+    while len(level) > 1:
+        level = next_level(level)
+    return level[0]
+
+
+# ---------- Level storage ----------
+def pack_levels(levels):
+    """All levels as one blob of concatenated raw digests"""
+    return b"".join(bytes.fromhex(node) for level in levels for node in level)
+
+
+def unpack_levels(blob, leaf_count):
+    levels = []
+    offset, width = 0, leaf_count
+    while True:
+        level = [blob[i:i + DIGEST_SIZE].hex() for i in range(offset, offset + width * DIGEST_SIZE, DIGEST_SIZE)]
+        levels.append(level)
+        offset += width * DIGEST_SIZE
+        if width <= 1:
+            return levels
+        width = (width + 1) // 2
+
+
+# ---------- Inclusion proofs ----------
+def inclusion_proof(levels, index):
+    """Sibling digests from leaf index up to the root (O(log n))"""
+    siblings = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            siblings.append(level[sibling])
+        index //= 2
+    return siblings
+
+
+def root_from_proof(leaf, index, leaf_count, siblings):
+    """Recompute the root from a leaf and its proof; None if the proof is malformed"""
+    if not 0 <= index < leaf_count:
+        return None
+    node, width = leaf, leaf_count
+    siblings = list(siblings)
+    while width > 1:
+        if index % 2:
+            if not siblings:
+                return None
+            node = hash_pair(siblings.pop(0), node)
+        elif index + 1 < width:
+            if not siblings:
+                return None
+            node = hash_pair(node, siblings.pop(0))
+        # else: last node of an odd level is carried up unchanged
+        index //= 2
+        width = (width + 1) // 2
+    return None if siblings else node
+
+
+def verify_inclusion(leaf, index, leaf_count, siblings, root):
+    return root_from_proof(leaf, index, leaf_count, siblings) == root
+
+
+def encode_proof(height, index, leaf_count, leaf, siblings):
+    """Compact url-safe token (fits comfortably in a QR code)"""
+    raw = _PROOF_HEADER.pack(PROOF_VERSION, height, index, leaf_count)
+    raw += bytes.fromhex(leaf) + b"".join(bytes.fromhex(s) for s in siblings)
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_proof(token):
+    """Return (height, index, leaf_count, leaf, siblings) or raise ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except (TypeError, ValueError):
+        raise ValueError("Proof is not valid base64")
+    if len(raw) < _PROOF_HEADER.size + DIGEST_SIZE or (len(raw) - _PROOF_HEADER.size) % DIGEST_SIZE:
+        raise ValueError("Proof has the wrong length")
+    version, height, index, leaf_count = _PROOF_HEADER.unpack_from(raw)
+    if version != PROOF_VERSION:
+        raise ValueError(f"Unsupported proof version {version}")
+    digests = raw[_PROOF_HEADER.size:]
+    nodes = [digests[i:i + DIGEST_SIZE].hex() for i in range(0, len(digests), DIGEST_SIZE)]
+    return height, index, leaf_count, nodes[0], nodes[1:]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0006_remove_subregistrar_office_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='landownershipchangerequest',
+            index=models.Index(fields=['applicant', '-created_at', '-request_id'], name='landreq_applicant_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='landownershipchangerequest',
+            index=models.Index(fields=['applicant', 'status', '-created_at', '-request_id'], name='landreq_applicant_status_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0007_landownershipchangerequest_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='requeststatushistory',
+            index=models.Index(fields=['request', '-created_at'], name='reqhistory_request_created_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Index auth_user.date_joined for the admin dashboard's newest-first user
+    listing. auth.User belongs to django.contrib.auth, so the index is created
+    with SQL rather than a model Meta change.
+    """
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('myapp', '0008_requeststatushistory_request_created_idx'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS myapp_user_date_joined_idx ON auth_user (date_joined DESC, id DESC);',
+            reverse_sql='DROP INDEX IF EXISTS myapp_user_date_joined_idx;',
+        ),
+    ]
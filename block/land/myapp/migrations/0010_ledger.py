@@ -0,0 +1,63 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0009_user_date_joined_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerBlock',
+            fields=[
+                ('height', models.PositiveBigIntegerField(primary_key=True, serialize=False)),
+                ('prev_hash', models.CharField(max_length=64, unique=True)),
+                ('merkle_root', models.CharField(max_length=64)),
+                ('block_hash', models.CharField(max_length=64, unique=True)),
+                ('entry_count', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ['height'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LedgerCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('height', models.PositiveBigIntegerField()),
+                ('block_hash', models.CharField(max_length=64)),
+                ('verified_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-height'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('request_id', models.UUIDField(db_index=True)),
+                ('history_id', models.UUIDField(unique=True)),
+                ('old_status', models.CharField(max_length=25)),
+                ('new_status', models.CharField(max_length=25)),
+                ('changed_by_id', models.IntegerField(null=True)),
+                ('comments', models.TextField(blank=True)),
+                ('recorded_at', models.DateTimeField()),
+                ('entry_hash', models.CharField(max_length=64)),
+                ('block', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='entries', to='myapp.ledgerblock')),
+            ],
+            options={
+                'ordering': ['block_id', 'position'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='ledgerentry',
+            constraint=models.UniqueConstraint(fields=('block', 'position'), name='ledgerentry_block_position_uniq'),
+        ),
+    ]
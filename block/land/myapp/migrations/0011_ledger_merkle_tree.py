@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0010_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerMerkleTree',
+            fields=[
+                ('block', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='merkle_tree', serialize=False, to='myapp.ledgerblock')),
+                ('leaf_count', models.PositiveIntegerField()),
+                ('levels', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0011_ledger_merkle_tree'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerQueueItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('history_id', models.UUIDField(unique=True)),
+                ('request_id', models.UUIDField()),
+                ('old_status', models.CharField(max_length=25)),
+                ('new_status', models.CharField(max_length=25)),
+                ('changed_by_id', models.IntegerField(null=True)),
+                ('comments', models.TextField(blank=True)),
+                ('recorded_at', models.DateTimeField()),
+                ('enqueued_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0012_ledger_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='landownershipchangerequest',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
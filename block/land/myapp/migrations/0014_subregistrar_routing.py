@@ -0,0 +1,66 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def link_offices_and_count_open_requests(apps, schema_editor):
+    """Match free-text office_location to an office, then seed the load counters"""
+    SubRegistrar = apps.get_model('myapp', 'SubRegistrar')
+    SubRegistrarOffice = apps.get_model('myapp', 'SubRegistrarOffice')
+    LandOwnershipChangeRequest = apps.get_model('myapp', 'LandOwnershipChangeRequest')
+
+    def normalize(name):
+        return " ".join(str(name or "").split()).lower()
+
+    offices = {}
+    for office in SubRegistrarOffice.objects.all():
+        offices.setdefault(normalize(office.office_name), office)
+        offices.setdefault(normalize(office.district), office)
+
+    open_counts = dict(
+        LandOwnershipChangeRequest.objects
+        .filter(assigned_sub_registrar__isnull=False, status__in=['submitted', 'under_review'])
+        .values_list('assigned_sub_registrar')
+        .annotate(n=models.Count('request_id'))
+    )
+    for registrar in SubRegistrar.objects.all():
+        office = offices.get(normalize(registrar.office_location))
+        registrar.office = office
+        registrar.district = normalize(office.district if office else registrar.office_location)
+        registrar.open_requests = open_counts.get(registrar.registrar_id, 0)
+        registrar.save(update_fields=['office', 'district', 'open_requests'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0013_landownershipchangerequest_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subregistrar',
+            name='district',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='subregistrar',
+            name='office',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sub_registrars', to='myapp.subregistraroffice'),
+        ),
+        migrations.AddField(
+            model_name='subregistrar',
+            name='open_requests',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='landownershipchangerequest',
+            index=models.Index(fields=['assigned_sub_registrar', 'status', 'submitted_at', 'request_id'], name='landreq_reviewer_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subregistrar',
+            index=models.Index(fields=['district', 'open_requests'], name='subreg_district_load_idx'),
+        ),
+        migrations.RunPython(link_offices_and_count_open_requests, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0014_subregistrar_routing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='landownershipchangerequest',
+            name='predicted_value',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True),
+        ),
+        migrations.AddField(
+            model_name='landownershipchangerequest',
+            name='valuation_checked_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='landownershipchangerequest',
+            name='valuation_flag',
+            field=models.CharField(blank=True, choices=[('pending', 'Check Pending'), ('ok', 'In Market Range'), ('under_valued', 'Under-valued'), ('unpriced', 'No Market Data')], default='', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='ValuationCheckTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('enqueued_at', models.DateTimeField(auto_now_add=True)),
+                ('request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='myapp.landownershipchangerequest')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0015_valuation_check'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='valuationchecktask',
+            name='claimed_by',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='valuationchecktask',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,13 +1,35 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.contrib.auth.models import User, Group
 import uuid
 from django.utils import timezone
 
 
+# Group ids are looked up once per process; groups are created, never renamed.
+_group_ids = {}
+
+
+def get_group_id(group_name):
+    """Primary key of the named group, created on first use and cached"""
+    group_id = _group_ids.get(group_name)
+    if group_id is None:
+        group, created = Group.objects.get_or_create(name=group_name)
+        group_id = _group_ids[group_name] = group.pk
+    return group_id
+
+
+def clear_group_id_cache():
+    _group_ids.clear()
+
+
 def assign_group(user, group_name):
     """Assign a user to a Django group (Resident or Office)"""
-    group, created = Group.objects.get_or_create(name=group_name)
-    user.groups.add(group)
+    user.groups.add(get_group_id(group_name))
+
+
+def add_new_user_to_group(user, group_name):
+    """Single INSERT into the membership table; only for users with no groups yet"""
+    User.groups.through.objects.create(user_id=user.pk, group_id=get_group_id(group_name))
 
 
 class Customer(models.Model):
@@ -41,16 +63,57 @@ class SubRegistrarOffice(models.Model):
     def __str__(self):
         return f"{self.office_name} - {self.district}"
 
+def normalize_district(name):
+    """Routing key for a district name: requests and registrars match on this"""
+    return " ".join(str(name or "").split()).lower()
+
+
 class SubRegistrar(models.Model):
     """Represents a sub-registrar linked to a user and office"""
     registrar_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     office_location = models.CharField(max_length=255) 
+    office = models.ForeignKey(
+        SubRegistrarOffice, on_delete=models.SET_NULL, null=True, blank=True, related_name='sub_registrars'
+    )
+    # Normalized district requests are routed by: the office's, else office_location
+    district = models.CharField(max_length=100, blank=True, editable=False)
+    # Assigned requests not yet approved/rejected; kept by assignment.py and transition()
+    open_requests = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # Least-loaded registrar in a district
+            models.Index(fields=['district', 'open_requests'], name='subreg_district_load_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.district = normalize_district(self.office.district if self.office_id else self.office_location)
+        super().save(*args, **kwargs)
     
     def __str__(self):
         return f"{self.user.username} - {self.office_location}"
 
 
+class InvalidTransition(ValueError):
+    """The status graph does not allow this change"""
+
+
+class TransitionConflict(Exception):
+    """The request changed (status or version) since it was read"""
+
+    def __init__(self, request_id, expected_status, expected_version, current_status=None, current_version=None):
+        self.request_id = request_id
+        self.expected_status = expected_status
+        self.expected_version = expected_version
+        self.current_status = current_status
+        self.current_version = current_version
+        super().__init__(
+            f"Request {request_id} is now {current_status or 'gone'} (version {current_version}), "
+            f"expected {expected_status} (version {expected_version})"
+        )
+
+
 class LandOwnershipChangeRequest(models.Model):
     """Main request for land ownership change"""
 
@@ -67,6 +130,12 @@ class LandOwnershipChangeRequest(models.Model):
         APPROVED = 'approved', 'Approved'
         REJECTED = 'rejected', 'Rejected'
 
+    class ValuationFlag(models.TextChoices):
+        PENDING = 'pending', 'Check Pending'
+        OK = 'ok', 'In Market Range'
+        UNDER_VALUED = 'under_valued', 'Under-valued'
+        UNPRICED = 'unpriced', 'No Market Data'
+
     request_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     applicant = models.ForeignKey(User, on_delete=models.CASCADE, related_name='land_requests')
 
@@ -96,6 +165,27 @@ class LandOwnershipChangeRequest(models.Model):
     approved_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Bumped by every transition(); the optimistic-concurrency token
+    version = models.PositiveIntegerField(default=0, editable=False)
+
+    # Automatic valuation check against the price model (valuation_checks.py)
+    valuation_flag = models.CharField(max_length=20, choices=ValuationFlag.choices, blank=True, default='')
+    predicted_value = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    valuation_checked_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # my_requests: newest first per applicant, keyset on (created_at, request_id)
+            models.Index(fields=['applicant', '-created_at', '-request_id'], name='landreq_applicant_created_idx'),
+            # my_requests?status=...
+            models.Index(fields=['applicant', 'status', '-created_at', '-request_id'], name='landreq_applicant_status_idx'),
+            # reviewer_queue (and finding unassigned submissions): oldest submission first
+            models.Index(
+                fields=['assigned_sub_registrar', 'status', 'submitted_at', 'request_id'],
+                name='landreq_reviewer_queue_idx',
+            ),
+        ]
+
     def save(self, *args, **kwargs):
         if self.status == self.Status.SUBMITTED and not self.submitted_at:
             self.submitted_at = timezone.now()
@@ -103,10 +193,72 @@ class LandOwnershipChangeRequest(models.Model):
             self.approved_at = timezone.now()
         super().save(*args, **kwargs)
 
+    # Allowed status changes; APPROVED and REJECTED are final
+    TRANSITIONS = {
+        Status.DRAFT: {Status.SUBMITTED},
+        Status.SUBMITTED: {Status.UNDER_REVIEW, Status.REJECTED},
+        Status.UNDER_REVIEW: {Status.APPROVED, Status.REJECTED},
+    }
+
+    # Statuses that count towards a sub-registrar's open_requests
+    OPEN_STATUSES = {Status.SUBMITTED, Status.UNDER_REVIEW}
+
+    def can_transition(self, to):
+        return to in self.TRANSITIONS.get(self.status, ())
+
+    def transition(self, to, by=None, comment=""):
+        """
+        Move to status `to` and record it in the history, in one transaction.
+
+        The row is changed with a single conditional UPDATE on the status and
+        version this instance was read with, so no row lock is taken: if
+        another reviewer got there first nothing is written and
+        TransitionConflict is raised. Returns the RequestStatusHistory row.
+        """
+        to = self.Status(to)
+        if not self.can_transition(to):
+            raise InvalidTransition(f"Cannot move a request from {self.status} to {to}")
+
+        now = timezone.now()
+        changes = {'status': to, 'version': F('version') + 1}
+        if to == self.Status.SUBMITTED and not self.submitted_at:
+            changes['submitted_at'] = now
+        elif to == self.Status.APPROVED and not self.approved_at:
+            changes['approved_at'] = now
+
+        requests = type(self).objects.filter(pk=self.pk)
+        with transaction.atomic():
+            updated = requests.filter(status=self.status, version=self.version).update(**changes)
+            if not updated:
+                current = requests.values('status', 'version').first() or {}
+                raise TransitionConflict(
+                    self.pk, self.status, self.version, current.get('status'), current.get('version')
+                )
+            history = RequestStatusHistory.objects.create(
+                request=self, old_status=self.status, new_status=to, changed_by=by, comments=comment or ""
+            )
+            if self.assigned_sub_registrar_id and self.status in self.OPEN_STATUSES \
+                    and to not in self.OPEN_STATUSES:
+                SubRegistrar.objects.filter(pk=self.assigned_sub_registrar_id, open_requests__gt=0).update(
+                    open_requests=F('open_requests') - 1
+                )
+
+        for field, value in changes.items():
+            if field != 'version':
+                setattr(self, field, value)
+        self.version += 1
+        return history
+
     def __str__(self):
         return f"Request {str(self.request_id)[:8]} - {self.deed_type} - {self.village}"
 
 
+class StatusHistoryQuerySet(models.QuerySet):
+    def status_changes(self):
+        """Rows that changed the status; same-status rows are reviewer notes (valuation checks)"""
+        return self.exclude(old_status=F('new_status'))
+
+
 class RequestStatusHistory(models.Model):
     """Audit trail for request status changes"""
     history_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -121,8 +273,151 @@ class RequestStatusHistory(models.Model):
     comments = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = StatusHistoryQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Matches Meta.ordering for request.status_history lookups
+            models.Index(fields=['request', '-created_at'], name='reqhistory_request_created_idx'),
+        ]
 
     def __str__(self):
         return f"History {self.request} {self.old_status} → {self.new_status}"
+
+
+class AppendOnlyQuerySet(models.QuerySet):
+    """Ledger rows are written once; bulk updates and deletes are refused"""
+
+    def update(self, **kwargs):
+        raise PermissionError("Ledger records are append-only")
+
+    def delete(self):
+        raise PermissionError("Ledger records are append-only")
+
+
+class AppendOnlyModel(models.Model):
+    objects = AppendOnlyQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise PermissionError("Ledger records are append-only")
+        kwargs['force_insert'] = True
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise PermissionError("Ledger records are append-only")
+
+
+class LedgerBlock(AppendOnlyModel):
+    """A sealed batch of ledger entries, chained to its predecessor by SHA-256"""
+    height = models.PositiveBigIntegerField(primary_key=True)
+    prev_hash = models.CharField(max_length=64, unique=True)
+    merkle_root = models.CharField(max_length=64)
+    block_hash = models.CharField(max_length=64, unique=True)
+    entry_count = models.PositiveIntegerField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['height']
+
+    def __str__(self):
+        return f"Block {self.height} {self.block_hash[:12]}"
+
+
+class LedgerEntry(AppendOnlyModel):
+    """
+    Immutable copy of one status transition. It keeps plain ids rather than
+    foreign keys so the ledger never changes when requests or users do.
+    """
+    block = models.ForeignKey(LedgerBlock, on_delete=models.PROTECT, related_name='entries')
+    position = models.PositiveIntegerField()
+    request_id = models.UUIDField(db_index=True)
+    history_id = models.UUIDField(unique=True)
+    old_status = models.CharField(max_length=25)
+    new_status = models.CharField(max_length=25)
+    changed_by_id = models.IntegerField(null=True)
+    comments = models.TextField(blank=True)
+    recorded_at = models.DateTimeField()
+    entry_hash = models.CharField(max_length=64)
+
+    class Meta:
+        ordering = ['block_id', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=['block', 'position'], name='ledgerentry_block_position_uniq'),
+        ]
+
+    def __str__(self):
+        return f"Entry {self.block_id}:{self.position} {self.old_status} → {self.new_status}"
+
+
+class LedgerMerkleTree(models.Model):
+    """
+    Cached levels of one block's Merkle tree (raw digests, leaves first), so
+    inclusion proofs are read rather than rehashed. Derived data: it can be
+    rebuilt from the block's entries at any time.
+    """
+    block = models.OneToOneField(LedgerBlock, on_delete=models.CASCADE, primary_key=True, related_name='merkle_tree')
+    leaf_count = models.PositiveIntegerField()
+    levels = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Merkle tree of block {self.block_id} ({self.leaf_count} leaves)"
+
+
+class LedgerQueueItem(models.Model):
+    """
+    A status transition waiting to be sealed into a block. Writing this row is
+    what acknowledges the transition; the block scheduler hashes and seals
+    queued rows in batches and deletes them in the same transaction.
+    """
+    history_id = models.UUIDField(unique=True)
+    request_id = models.UUIDField()
+    old_status = models.CharField(max_length=25)
+    new_status = models.CharField(max_length=25)
+    changed_by_id = models.IntegerField(null=True)
+    comments = models.TextField(blank=True)
+    recorded_at = models.DateTimeField()
+    enqueued_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"Queued {self.old_status} → {self.new_status} for {str(self.request_id)[:8]}"
+
+
+class ValuationCheckTask(models.Model):
+    """
+    A submitted request waiting for its valuation check. A checker leases a
+    batch of rows (claimed_by/claimed_until), prices them outside any
+    transaction, and deletes them in the transaction that stores the
+    results. Rows whose lease ran out are picked up again.
+    """
+    request = models.ForeignKey(LandOwnershipChangeRequest, on_delete=models.CASCADE, related_name='+')
+    enqueued_at = models.DateTimeField(auto_now_add=True)
+    claimed_by = models.UUIDField(null=True, blank=True)
+    claimed_until = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"Valuation check for {str(self.request_id)[:8]}"
+
+
+class LedgerCheckpoint(models.Model):
+    """Highest block verified so far; verification resumes after it"""
+    height = models.PositiveBigIntegerField()
+    block_hash = models.CharField(max_length=64)
+    verified_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-height']
+
+    def __str__(self):
+        return f"Checkpoint {self.height} {self.block_hash[:12]}"
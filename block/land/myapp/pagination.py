@@ -0,0 +1,97 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are fetched with `WHERE (created_at, pk) < (cursor)` (or another
+datetime sort field, either direction) on an index that matches the
+ordering, so the cost of a page does not depend on how deep it is. Cursors
+are opaque url-safe tokens of the last row's sort key.
+
+A NULL sort value (e.g. submitted_at on rows saved before it was stamped)
+counts as the oldest: such rows come first in ascending order and last in
+descending order, as in assignment._unassigned.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(created_at, pk):
+    raw = json.dumps([created_at.isoformat() if created_at is not None else None, str(pk)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Return (created_at, pk) or None for a missing/garbled cursor (created_at may be None)"""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        created_at, pk = json.loads(raw)
+        if created_at is not None:
+            created_at = parse_datetime(created_at)
+            if created_at is None:
+                return None
+    except (ValueError, TypeError):
+        return None
+    return created_at, pk
+
+
+def _after(sort_field, pk_field, sort_value, pk, descending):
+    """Rows after (sort_value, pk) in the page order, with NULL sort values oldest"""
+    after = "lt" if descending else "gt"
+    next_pk = Q(**{f"{pk_field}__{after}": pk})
+    if sort_value is None:
+        if descending:  # NULLs are last; only later NULL rows follow
+            return Q(**{f"{sort_field}__isnull": True}) & next_pk
+        return Q(**{f"{sort_field}__isnull": False}) | (Q(**{f"{sort_field}__isnull": True}) & next_pk)
+    position = Q(**{f"{sort_field}__{after}": sort_value}) | (Q(**{sort_field: sort_value}) & next_pk)
+    if descending:
+        position |= Q(**{f"{sort_field}__isnull": True})
+    return position
+
+
+def _keyset_queryset(queryset, cursor, page_size, pk_field, sort_field, descending):
+    if descending:
+        queryset = queryset.order_by(F(sort_field).desc(nulls_last=True), "-" + pk_field)
+    else:
+        queryset = queryset.order_by(F(sort_field).asc(nulls_first=True), pk_field)
+    position = decode_cursor(cursor)
+    if position is not None:
+        sort_value, pk = position
+        opts = queryset.model._meta
+        field = opts.pk if pk_field == "pk" else opts.get_field(pk_field)
+        try:
+            pk = field.to_python(pk)
+        except ValidationError:
+            position = None
+    if position is not None:
+        queryset = queryset.filter(_after(sort_field, pk_field, sort_value, pk, descending))
+    return queryset[:page_size + 1]
+
+
+def _split_page(rows, page_size, pk_field, sort_field):
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_field), getattr(last, pk_field))
+    return rows, next_cursor
+
+
+def keyset_page(queryset, cursor=None, page_size=25, pk_field="pk", sort_field="created_at", descending=True):
+    """
+    Page of queryset ordered by (sort_field, pk), newest first by default.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    rows = list(_keyset_queryset(queryset, cursor, page_size, pk_field, sort_field, descending))
+    return _split_page(rows, page_size, pk_field, sort_field)
+
+
+async def akeyset_page(queryset, cursor=None, page_size=25, pk_field="pk", sort_field="created_at",
+                       descending=True):
+    """keyset_page for async views"""
+    rows = [row async for row in _keyset_queryset(queryset, cursor, page_size, pk_field, sort_field, descending)]
+    return _split_page(rows, page_size, pk_field, sort_field)
@@ -0,0 +1,127 @@
+"""
+Bounded result cache in front of get_price_estimate.
+
+Entries are keyed by normalized (district, locality) and tagged with the
+dataset version they were computed from. A lookup under a new version
+drops the whole in-process LRU, so a reloaded or changed dataset never
+serves old prices. When settings.LAND_PRICES_CACHE_ALIAS names a Django
+cache, results are also shared through it, with the dataset version in
+the key.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+DEFAULT_MAXSIZE = 2048
+DEFAULT_TIMEOUT = 60 * 60
+
+
+class PredictionCache:
+    """Thread-safe LRU with hit/miss/eviction counters"""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, backend_alias=None, timeout=DEFAULT_TIMEOUT):
+        self.maxsize = maxsize
+        self.backend_alias = backend_alias
+        self.timeout = timeout
+        self.version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            maxsize=getattr(settings, "LAND_PRICES_CACHE_SIZE", DEFAULT_MAXSIZE),
+            backend_alias=getattr(settings, "LAND_PRICES_CACHE_ALIAS", None),
+            timeout=getattr(settings, "LAND_PRICES_CACHE_TIMEOUT", DEFAULT_TIMEOUT),
+        )
+
+    def _backend(self):
+        return caches[self.backend_alias] if self.backend_alias else None
+
+    @staticmethod
+    def _backend_key(key, version):
+        # District/locality are user input: hash them so the key is short and
+        # memcached-safe (no spaces or control characters, under 250 bytes)
+        digest = hashlib.sha1("\0".join(key).encode("utf-8")).hexdigest()
+        return "landprice:%s:%s" % (version, digest)
+
+    def _check_version(self, version):
+        # Caller holds the lock
+        if version != self.version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.version = version
+
+    def get(self, key, version):
+        """Cached value for key under dataset version, or None"""
+        with self._lock:
+            self._check_version(version)
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        backend = self._backend()
+        if backend is not None:
+            value = backend.get(self._backend_key(key, version))
+            if value is not None:
+                with self._lock:
+                    self.shared_hits += 1
+                self._store(key, value, version)
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, value, version):
+        self._store(key, value, version)
+        backend = self._backend()
+        if backend is not None:
+            backend.set(self._backend_key(key, version), value, self.timeout)
+
+    def _store(self, key, value, version):
+        with self._lock:
+            if self.version is None:
+                self.version = version
+            elif version != self.version:
+                # Computed from a dataset generation that has since been replaced
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Drop every in-process entry (shared entries age out by version)"""
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.version = None
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "version": self.version,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round((self.hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,81 @@
+"""
+Triggers for hot-reloading the land price dataset in a running worker.
+
+- PriceFileWatcher polls the CSV and snapshot mtimes and reloads on change.
+- install_reload_signal() reloads when the process receives a signal
+  (e.g. `kill -USR2 <worker pid>`, or `manage.py reload_price_data --pid`).
+
+Both only schedule utils.reload_price_data_async(); the build happens off the
+request path and is swapped in with one reference assignment.
+"""
+import logging
+import os
+import signal
+import threading
+
+from .utils import get_prices_csv_path, get_snapshot_path, reload_price_data_async
+
+logger = logging.getLogger(__name__)
+
+
+def _mtimes(paths):
+    stamps = []
+    for path in paths:
+        try:
+            stamps.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            stamps.append(None)
+    return tuple(stamps)
+
+
+class PriceFileWatcher(threading.Thread):
+    """Daemon thread that reloads the dataset when its files change"""
+
+    def __init__(self, interval):
+        super().__init__(name="price-data-watcher", daemon=True)
+        self.interval = interval
+        self.paths = (get_prices_csv_path(), get_snapshot_path())
+        self._stop_event = threading.Event()
+
+    def run(self):
+        last = _mtimes(self.paths)
+        while not self._stop_event.wait(self.interval):
+            current = _mtimes(self.paths)
+            if current != last:
+                logger.info("Land price data changed on disk, reloading")
+                last = current
+                reload_price_data_async()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_watcher = None
+
+
+def start_watcher(interval):
+    """Start the (single, per-process) file watcher"""
+    global _watcher
+    if _watcher is None:
+        _watcher = PriceFileWatcher(interval)
+        _watcher.start()
+    return _watcher
+
+
+def _handle_reload_signal(signum, frame):
+    # Keep the handler tiny: the reload runs in its own thread
+    reload_price_data_async(force=True)
+
+
+def install_reload_signal(name):
+    """Reload the dataset on the named signal, e.g. "SIGUSR2". Returns True if installed."""
+    signum = getattr(signal, name, None)
+    if signum is None:
+        logger.warning("Unknown reload signal %r; price data signal reload disabled", name)
+        return False
+    try:
+        signal.signal(signum, _handle_reload_signal)
+    except ValueError:
+        # Not in the main thread (e.g. some dev servers); polling still works
+        return False
+    return True
@@ -0,0 +1,98 @@
+"""
+Inclusion proofs for approved ownership requests.
+
+The ledger already seals every status transition into a block whose header
+carries the Merkle root of its entries. An approved request is proven by
+the entry that moved it to APPROVED: its leaf hash, its position in the
+block and the sibling digests up to the block's root. Interior nodes come
+from LedgerMerkleTree, so building a proof is a couple of indexed reads and
+checking one is O(log n) hashes against the published block root.
+"""
+from django.db import IntegrityError, transaction
+
+from . import ledger, merkle
+from .models import LandOwnershipChangeRequest, LedgerBlock, LedgerEntry, LedgerMerkleTree
+
+
+def approved_entry(request_id):
+    """Latest ledger entry that approved request_id, or None"""
+    return (LedgerEntry.objects
+            .filter(request_id=request_id, new_status=LandOwnershipChangeRequest.Status.APPROVED)
+            .select_related("block")
+            .order_by("-block_id", "-position")
+            .first())
+
+
+def tree_levels(block):
+    """Levels of block's Merkle tree, from the cache or rebuilt (and cached)"""
+    cached = LedgerMerkleTree.objects.filter(block=block).first()
+    if cached is not None:
+        return merkle.unpack_levels(bytes(cached.levels), cached.leaf_count)
+
+    # Blocks sealed before the cache existed
+    leaves = list(block.entries.order_by("position").values_list("entry_hash", flat=True))
+    levels = merkle.build_levels(leaves)
+    if not leaves or levels[-1][0] != block.merkle_root:
+        raise ValueError(f"block {block.height}: entries do not match the merkle root")
+    try:
+        with transaction.atomic():
+            LedgerMerkleTree.objects.create(block=block, leaf_count=len(leaves), levels=merkle.pack_levels(levels))
+    except IntegrityError:
+        pass  # another request cached it first
+    return levels
+
+
+def build_proof(request_id):
+    """Inclusion proof for an approved request as a dict, or None if not approved"""
+    entry = approved_entry(request_id)
+    if entry is None:
+        return None
+    block = entry.block
+    levels = tree_levels(block)
+    siblings = merkle.inclusion_proof(levels, entry.position)
+    return {
+        "request_id": str(entry.request_id),
+        "block_height": block.height,
+        "block_hash": block.block_hash,
+        "merkle_root": block.merkle_root,
+        "leaf": entry.entry_hash,
+        "index": entry.position,
+        "leaf_count": block.entry_count,
+        "siblings": siblings,
+        "proof": merkle.encode_proof(block.height, entry.position, block.entry_count, entry.entry_hash, siblings),
+    }
+
+
+def verify_proof(token):
+    """
+    Check a compact proof against the root published in its block header.
+    Returns a dict with "valid" and, when valid, what the proof attests.
+    """
+    try:
+        height, index, leaf_count, leaf, siblings = merkle.decode_proof(token)
+    except ValueError as e:
+        return {"valid": False, "error": str(e)}
+
+    block = LedgerBlock.objects.filter(height=height).first()
+    if block is None:
+        return {"valid": False, "error": f"No ledger block {height}"}
+    if leaf_count != block.entry_count:
+        return {"valid": False, "error": "Leaf count does not match the block"}
+    if not merkle.verify_inclusion(leaf, index, leaf_count, siblings, block.merkle_root):
+        return {"valid": False, "error": "Proof does not lead to the block's merkle root"}
+
+    entry = LedgerEntry.objects.filter(block=block, position=index).first()
+    if entry is None or entry.entry_hash != leaf:
+        return {"valid": False, "error": "Ledger entry does not match the proof"}
+    # The stored hash proves nothing if the row's fields were edited under it
+    if ledger.entry_hash(entry) != leaf:
+        return {"valid": False, "error": "Ledger entry has been altered since it was sealed"}
+    return {
+        "valid": True,
+        "request_id": str(entry.request_id),
+        "status": entry.new_status,
+        "recorded_at": entry.recorded_at.isoformat(),
+        "block_height": block.height,
+        "block_hash": block.block_hash,
+        "merkle_root": block.merkle_root,
+    }
@@ -0,0 +1,29 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import dashboard, ledger_queue
+from .models import LandOwnershipChangeRequest, RequestStatusHistory
+
+
+@receiver(post_save, sender=RequestStatusHistory, dispatch_uid="myapp.ledger_record_history")
+def record_status_change(sender, instance, created, raw=False, **kwargs):
+    """Every new status history row is queued for the ledger in the same transaction"""
+    if created and not raw:
+        ledger_queue.enqueue_history([instance])
+
+
+# ---------- Dashboard cache ----------
+# Dropped after commit, so a concurrent dashboard hit cannot re-cache the old numbers
+@receiver(post_save, sender=LandOwnershipChangeRequest, dispatch_uid="myapp.dashboard_request_saved")
+@receiver(post_delete, sender=LandOwnershipChangeRequest, dispatch_uid="myapp.dashboard_request_deleted")
+def invalidate_dashboard_for_request(sender, instance, **kwargs):
+    transaction.on_commit(partial(dashboard.invalidate, instance.applicant_id))
+
+
+@receiver(post_save, sender=RequestStatusHistory, dispatch_uid="myapp.dashboard_history_saved")
+def invalidate_dashboard_for_history(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(partial(dashboard.invalidate, instance.request.applicant_id))
@@ -0,0 +1,155 @@
+"""
+Columnar binary snapshot of the cleaned land price dataset.
+
+Layout (little endian):
+    MAGIC | uint32 header length | JSON header | padding | column data ...
+
+Numeric columns are stored as fixed-width arrays at 8-byte aligned offsets
+and read back with numpy.memmap, so every worker maps the same page-cache
+copy. District and locality are dictionary encoded: the header holds the
+distinct names and the data section holds integer codes.
+
+The header records the size, mtime and sha256 of the CSV it was built from;
+read_snapshot() returns None when the snapshot is missing, corrupt
+(foreign, garbled header, truncated data) or stale so the caller can fall
+back to parsing the CSV.
+"""
+import hashlib
+import json
+import os
+import struct
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"LANDPX01"
+FORMAT_VERSION = 1
+ALIGN = 8
+
+CODE_COLUMNS = ["district", "locality"]
+NUMERIC_COLUMNS = ["price_num", "area_sqft", "cents", "price_per_cent_calc"]
+
+
+def file_sha256(path):
+    """Hex sha256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_fingerprint(csv_path):
+    """Identify the CSV a snapshot was built from"""
+    stat = os.stat(csv_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_sha256(csv_path)}
+
+
+def is_fresh(header, csv_path):
+    """True if the snapshot header still matches the CSV on disk"""
+    source = header.get("source", {})
+    try:
+        stat = os.stat(csv_path)
+    except OSError:
+        # No CSV to compare against: the snapshot is the only copy we have
+        return True
+    if stat.st_size != source.get("size"):
+        return False
+    if stat.st_mtime_ns == source.get("mtime_ns"):
+        return True
+    # Touched (e.g. git checkout) but maybe not changed: compare contents
+    return file_sha256(csv_path) == source.get("sha256")
+
+
+def write_snapshot(df, snapshot_path, csv_path):
+    """Write the cleaned frame as a snapshot; the file is replaced atomically"""
+    snapshot_path = Path(snapshot_path)
+    header = {
+        "version": FORMAT_VERSION,
+        "rows": len(df),
+        "source": source_fingerprint(csv_path),
+        "dictionaries": {},
+        "columns": [],
+    }
+    arrays = []
+    for name in CODE_COLUMNS:
+        codes, uniques = df[name].factorize()
+        header["dictionaries"][name] = [str(value) for value in uniques]
+        arrays.append((name, np.ascontiguousarray(codes, dtype="<i4")))
+    for name in NUMERIC_COLUMNS:
+        values = df[name].to_numpy()
+        dtype = "<i8" if np.issubdtype(values.dtype, np.integer) else "<f8"
+        arrays.append((name, np.ascontiguousarray(values, dtype=dtype)))
+
+    # Column offsets are relative to the (aligned) start of the data section
+    offset = 0
+    for name, array in arrays:
+        header["columns"].append({"name": name, "dtype": array.dtype.str, "offset": offset})
+        offset += -(-array.nbytes // ALIGN) * ALIGN
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    data_start = -(-(len(MAGIC) + 4 + len(header_bytes)) // ALIGN) * ALIGN
+
+    tmp_path = snapshot_path.with_name(snapshot_path.name + ".tmp")
+    with open(tmp_path, "wb") as fh:
+        fh.write(MAGIC)
+        fh.write(struct.pack("<I", len(header_bytes)))
+        fh.write(header_bytes)
+        fh.write(b"\0" * (data_start - fh.tell()))
+        for column, (name, array) in zip(header["columns"], arrays):
+            fh.write(b"\0" * (data_start + column["offset"] - fh.tell()))
+            fh.write(array.tobytes())
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_path, snapshot_path)
+    return header
+
+
+def read_header(snapshot_path):
+    """Return (header, data_start) or raise ValueError on a foreign file"""
+    with open(snapshot_path, "rb") as fh:
+        if fh.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{snapshot_path} is not a land price snapshot")
+        try:
+            (length,) = struct.unpack("<I", fh.read(4))
+        except struct.error:
+            raise ValueError(f"{snapshot_path} is truncated")
+        header = json.loads(fh.read(length).decode("utf-8"))
+    if not isinstance(header, dict) or header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"{snapshot_path} has unsupported version {header.get('version')}")
+    data_start = -(-(len(MAGIC) + 4 + length) // ALIGN) * ALIGN
+    return header, data_start
+
+
+def read_snapshot(snapshot_path, csv_path):
+    """
+    Memory-map a snapshot into a DataFrame.
+    Returns None if the snapshot does not exist, is unreadable, or is stale.
+    """
+    import pandas as pd
+
+    try:
+        header, data_start = read_header(snapshot_path)
+        rows = header["rows"]
+        end = max(
+            (data_start + c["offset"] + rows * np.dtype(c["dtype"]).itemsize for c in header["columns"]),
+            default=data_start,
+        )
+        if os.path.getsize(snapshot_path) < end:
+            return None  # truncated, e.g. copied while being written
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if not is_fresh(header, csv_path):
+        return None
+
+    buffer = np.memmap(snapshot_path, dtype=np.uint8, mode="r")
+    columns = {}
+    for column in header["columns"]:
+        name = column["name"]
+        values = np.frombuffer(
+            buffer, dtype=np.dtype(column["dtype"]), count=rows,
+            offset=data_start + column["offset"],
+        )
+        if name in header["dictionaries"]:
+            values = pd.Categorical.from_codes(values, categories=header["dictionaries"][name])
+        columns[name] = values
+    return pd.DataFrame(columns, copy=False)
@@ -1,3 +1,1242 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection
+from django.http import Http404
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import AnonymousUser, User
+from django.urls import reverse
+from django.utils import timezone
 
-# Create your tests here.
+import csv
+import hashlib
+import io
+import json
+import os
+import threading
+import uuid
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from . import (
+    assignment, async_views, bulk_import, dashboard, ledger, ledger_queue, merkle, pagination, proofs, snapshot, utils,
+    valuation_checks, valuation_model, views,
+)
+from .valuation_service import ValuationService, ValuationUnavailable
+from .models import (
+    Customer, InvalidTransition, SubRegistrarOffice, LandOwnershipChangeRequest, LedgerBlock, LedgerEntry, LedgerQueueItem, RequestStatusHistory, SubRegistrar, TransitionConflict, ValuationCheckTask,
+    clear_group_id_cache, get_group_id,
+)
+
+
+def make_request(applicant, **extra):
+    fields = dict(
+        applicant=applicant,
+        survey_number="101/2",
+        village="Kattanam",
+        district="alappuzha",
+        property_area_sqft="5662.00",
+        property_value="3900000.00",
+        deed_type=LandOwnershipChangeRequest.DeedType.SALE,
+        previous_owner_name="Previous Owner",
+        new_owner_name="New Owner",
+        status=LandOwnershipChangeRequest.Status.SUBMITTED,
+    )
+    fields.update(extra)
+    return LandOwnershipChangeRequest.objects.create(**fields)
+
+
+class RequestDetailQueryTests(TestCase):
+    def setUp(self):
+        self.applicant = User.objects.create_user("resident@example.com", "resident@example.com", "password123")
+        officer = User.objects.create_user("officer", "officer@example.com", "password123")
+        registrar = SubRegistrar.objects.create(user=officer, office_location="Alappuzha")
+        self.ownership_request = make_request(self.applicant, assigned_sub_registrar=registrar)
+        self.reviewers = [officer] + [
+            User.objects.create_user(f"reviewer{i}", f"reviewer{i}@example.com", "password123") for i in range(3)
+        ]
+        self.client.force_login(self.applicant)
+        self.url = reverse("request_detail", args=[self.ownership_request.request_id])
+
+    def add_history(self, count):
+        for i in range(count):
+            RequestStatusHistory.objects.create(
+                request=self.ownership_request,
+                old_status="submitted",
+                new_status="under_review",
+                changed_by=self.reviewers[i % len(self.reviewers)],
+                comments=f"Review step {i}",
+            )
+
+    def test_query_count_does_not_grow_with_history(self):
+        # session + user, request (joined applicant/sub-registrar), history (joined changed_by)
+        self.add_history(1)
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+        self.add_history(20)
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        self.assertContains(response, "Review step 19")
+        self.assertContains(response, "reviewer2")
+
+    def test_history_str_uses_prefetched_request(self):
+        self.add_history(3)
+        response = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            [str(h) for h in response.context["history"]]
+
+    def test_other_users_request_is_not_found(self):
+        other = User.objects.create_user("other@example.com", "other@example.com", "password123")
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class CustomerRegisterTests(TestCase):
+    def setUp(self):
+        clear_group_id_cache()
+        self.url = reverse("customer_register")
+        self.form = {
+            "full_name": "Anu Thomas",
+            "email": "anu@example.com",
+            "password": "password123",
+            "confirm_password": "password123",
+            "aadhar_number": "123412341234",
+            "phone": "9847012345",
+            "date_of_birth": "1990-01-01",
+            "pan_number": "abcde1234f",
+            "address": "Main Road",
+            "city": "Alappuzha",
+            "state": "Kerala",
+            "pincode": "688001",
+        }
+
+    def post(self, **changes):
+        return self.client.post(self.url, {**self.form, **changes})
+
+    def test_registration_is_an_email_check_and_three_inserts(self):
+        get_group_id("Resident")  # warm the per-process group id cache
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.post()
+        self.assertRedirects(response, reverse("customer_login"), fetch_redirect_response=False)
+        statements = [q["sql"] for q in ctx.captured_queries if "SAVEPOINT" not in q["sql"]]
+        self.assertEqual(len(statements), 4, statements)
+
+        customer = Customer.objects.select_related("user").get()
+        self.assertEqual(customer.pan_number, "ABCDE1234F")
+        self.assertTrue(customer.user.groups.filter(name="Resident").exists())
+        self.assertTrue(customer.user.check_password("password123"))
+
+    def test_duplicates_map_to_field_messages(self):
+        self.post()
+        cases = [
+            ({"aadhar_number": "999999999999", "phone": "9000000000", "pan_number": "ZZZZZ9999Z"},
+             "An account with this email already exists."),
+            ({"email": "new@example.com", "phone": "9000000000", "pan_number": "ZZZZZ9999Z"},
+             "This Aadhar number is already registered."),
+            ({"email": "new@example.com", "aadhar_number": "999999999999", "pan_number": "ZZZZZ9999Z"},
+             "This phone number is already registered."),
+        ]
+        for changes, message in cases:
+            with self.subTest(message=message):
+                response = self.post(**changes)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn(message, [str(m) for m in response.context["messages"]])
+        self.assertEqual(User.objects.count(), 1)
+        self.assertEqual(Customer.objects.count(), 1)
+
+    def test_email_of_a_user_without_customer_is_taken(self):
+        User.objects.create_user("registrar", "Anu@Example.com", "password123")  # e.g. created in admin
+        response = self.post()
+        self.assertIn("An account with this email already exists.", [str(m) for m in response.context["messages"]])
+        self.assertFalse(Customer.objects.exists())
+
+    def test_unexpected_integrity_error_is_logged(self):
+        with mock.patch("myapp.views.find_registration_conflict", return_value=None), \
+                mock.patch("myapp.views.add_new_user_to_group", side_effect=IntegrityError("stale group")), \
+                self.assertLogs("myapp.views", "ERROR") as logs:
+            response = self.post()
+        self.assertIn("An error occurred while creating your account.", [str(m) for m in response.context["messages"]])
+        self.assertIn("Registration failed for anu@example.com", logs.output[0])
+        self.assertFalse(User.objects.exists())
+
+
+class AdminUserListTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        User.objects.bulk_create([
+            User(username=f"user{i:02d}", email=f"user{i:02d}@{'kerala.gov' if i % 10 == 0 else 'example.com'}",
+                 date_joined=now - timedelta(days=i))
+            for i in range(60)
+        ])
+        self.admin = User.objects.create_superuser("root", "root@example.com", "password123")
+        self.staff = User.objects.create_user("clerk", "clerk@example.com", "password123", is_staff=True)
+        self.url = reverse("admin_dashboard")
+
+    def usernames(self, response):
+        return [u.username for u in response.context["users"]]
+
+    def test_pages_newest_first(self):
+        self.client.force_login(self.admin)
+        with mock.patch("myapp.views.ADMIN_USERS_PAGE_SIZE", 25):
+            first = self.client.get(self.url)
+            last = self.client.get(self.url, {"page": 3})
+            beyond = self.client.get(self.url, {"page": 99})
+        self.assertEqual(self.usernames(first)[:4], ["clerk", "root", "user00", "user01"])
+        self.assertEqual(len(self.usernames(first)), 25)
+        self.assertEqual(first.context["users"].paginator.num_pages, 3)
+        self.assertEqual(self.usernames(last), [f"user{i:02d}" for i in range(48, 60)])
+        self.assertEqual(self.usernames(beyond), self.usernames(last))
+
+    def test_search_matches_username_or_email(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url, {"q": " KERALA.gov "})
+        self.assertEqual(self.usernames(response), [f"user{i:02d}" for i in range(0, 60, 10)])
+        self.assertEqual(response.context["query"], "KERALA.gov")
+        self.assertEqual(self.usernames(self.client.get(self.url, {"q": "clerk"})), ["clerk"])
+
+    def test_csv_export_is_superuser_only(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(self.url, {"export": "csv"})
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url, {"export": "csv", "q": "kerala.gov"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual(tuple(rows[0]), views.USER_EXPORT_COLUMNS)
+        self.assertEqual([row[1] for row in rows[1:]], [f"user{i:02d}" for i in range(0, 60, 10)])
+
+
+class LedgerTests(TestCase):
+    def setUp(self):
+        self.applicant = User.objects.create_user("ledger@example.com", "ledger@example.com", "password123")
+
+    def add_transitions(self, count):
+        ownership_request = make_request(self.applicant)
+        for i in range(count):
+            RequestStatusHistory.objects.create(
+                request=ownership_request, old_status="submitted", new_status="under_review",
+                changed_by=self.applicant, comments=f"step {i}",
+            )
+            ledger_queue.get_scheduler().flush()
+        return ownership_request
+
+    def test_history_rows_are_chained(self):
+        self.add_transitions(3)
+        blocks = list(LedgerBlock.objects.all())
+        self.assertEqual([b.height for b in blocks], [1, 2, 3])
+        self.assertEqual(blocks[0].prev_hash, ledger.GENESIS_HASH)
+        for prev, block in zip(blocks, blocks[1:]):
+            self.assertEqual(block.prev_hash, prev.block_hash)
+        self.assertTrue(ledger.verify_ledger().ok)
+
+    def test_verification_is_incremental(self):
+        self.add_transitions(4)
+        self.assertEqual(ledger.verify_ledger().blocks_checked, 4)
+        self.add_transitions(2)
+        result = ledger.verify_ledger()
+        self.assertEqual((result.start_height, result.blocks_checked, result.verified_height), (4, 2, 6))
+        self.assertEqual(ledger.verify_ledger().blocks_checked, 0)
+
+    def test_tampering_is_detected(self):
+        self.add_transitions(3)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE myapp_ledgerentry SET new_status = %s WHERE block_id = %s", ["approved", 2]
+            )
+        result = ledger.verify_ledger(full=True)
+        self.assertFalse(result.ok)
+        self.assertEqual(result.verified_height, 1)
+        self.assertIn("block 2", result.error)
+
+    def test_segments_are_joined_with_boundary_checks(self):
+        self.add_transitions(7)
+        result = ledger.verify_ledger(segment_size=2, save_checkpoint=False)
+        self.assertEqual((result.ok, result.blocks_checked, result.verified_height), (True, 7, 7))
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE myapp_ledgerblock SET prev_hash = %s WHERE height = %s", ["f" * 64, 5]
+            )
+        result = ledger.verify_ledger(segment_size=2, save_checkpoint=False)
+        self.assertFalse(result.ok)
+        self.assertEqual(result.verified_height, 4)
+
+    def test_ledger_rows_are_append_only(self):
+        self.add_transitions(1)
+        block = LedgerBlock.objects.get()
+        with self.assertRaises(PermissionError):
+            block.save()
+        with self.assertRaises(PermissionError):
+            LedgerEntry.objects.update(new_status="approved")
+        with self.assertRaises(PermissionError):
+            LedgerBlock.objects.all().delete()
+
+
+class ParallelLedgerVerificationTests(TransactionTestCase):
+    def test_first_corrupt_segment_is_reported(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        from . import ledger_parallel
+
+        applicant = User.objects.create_user("parallel@example.com", "parallel@example.com", "password123")
+        ownership_request = make_request(applicant)
+        for i in range(12):
+            RequestStatusHistory.objects.create(
+                request=ownership_request, old_status="submitted", new_status="under_review",
+                changed_by=applicant, comments=f"step {i}",
+            )
+            ledger_queue.get_scheduler().flush()
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE myapp_ledgerentry SET new_status = %s WHERE block_id = %s", ["approved", 3])
+
+        # Threads stand in for the worker processes, which cannot see the in-memory test database
+        with mock.patch.object(ledger_parallel, "ProcessPoolExecutor", ThreadPoolExecutor), \
+                mock.patch.object(ledger_parallel, "_in_memory_database", return_value=False), \
+                mock.patch.object(ledger_parallel, "_init_worker"):
+            result = ledger.verify_ledger(full=True, save_checkpoint=False, workers=2, segment_size=1)
+        self.assertFalse(result.ok)
+        self.assertEqual(result.verified_height, 2)
+        self.assertIn("block 3", result.error)
+        self.assertNotIn("prev_hash", result.error)
+
+    def test_join_stops_at_a_gap(self):
+        ok = ledger.SegmentResult(0, 1, ledger.GENESIS_HASH, "a" * 64, 1, 1, None)
+        failed = ledger.SegmentResult(2, 3, "b" * 64, None, 0, 2, "block 3: merkle root mismatch")
+        self.assertEqual(ledger.join_segments([failed, ok], 0, ledger.GENESIS_HASH),
+                         (1, "a" * 64, 1, "block 3: merkle root mismatch"))
+
+    def test_command_rejects_empty_segments(self):
+        with self.assertRaisesMessage(CommandError, "--segment-size must be at least 1"):
+            call_command("verify_ledger", "--segment-size", "0", stdout=io.StringIO())
+
+
+class MerkleProofTests(TestCase):
+    def test_every_leaf_proves_against_the_root(self):
+        for count in range(1, 34):
+            leaves = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(count)]
+            levels = merkle.build_levels(leaves)
+            self.assertEqual(levels[-1][0], merkle.merkle_root(leaves))
+            self.assertEqual(merkle.unpack_levels(merkle.pack_levels(levels), count), levels)
+            for index, leaf in enumerate(leaves):
+                siblings = merkle.inclusion_proof(levels, index)
+                self.assertLessEqual(len(siblings), max(count - 1, 0).bit_length())
+                self.assertTrue(merkle.verify_inclusion(leaf, index, count, siblings, levels[-1][0]))
+                if count > 1:
+                    wrong_index = (index + 1) % count
+                    self.assertFalse(merkle.verify_inclusion(leaf, wrong_index, count, siblings, levels[-1][0]))
+
+    def test_proof_api_for_approved_request(self):
+        applicant = User.objects.create_user("proof@example.com", "proof@example.com", "password123")
+        approved = [make_request(applicant) for _ in range(5)]
+        # One multi-entry block, as the bulk importer writes
+        ledger.record_history(
+            RequestStatusHistory(request=r, old_status="under_review", new_status="approved", changed_by=applicant)
+            for r in approved
+        )
+        self.client.force_login(applicant)
+        response = self.client.get(reverse("ledger_proof", args=[approved[2].request_id]))
+        self.assertEqual(response.status_code, 200)
+        proof = response.json()
+        self.assertEqual(proof["leaf_count"], 5)
+        self.assertEqual(len(proof["siblings"]), 3)
+        self.assertLess(len(proof["proof"]), 200)
+
+        result = self.client.get(reverse("verify_ledger_proof"), {"proof": proof["proof"]}).json()
+        self.assertTrue(result["valid"])
+        self.assertEqual(result["request_id"], str(approved[2].request_id))
+
+        _, index, leaf_count, leaf, siblings = merkle.decode_proof(proof["proof"])
+        forged = merkle.encode_proof(proof["block_height"], index, leaf_count, "0" * 64, siblings)
+        self.assertFalse(proofs.verify_proof(forged)["valid"])
+        self.assertFalse(proofs.verify_proof("not-a-proof")["valid"])
+
+    def test_tampered_entry_fails_verification(self):
+        applicant = User.objects.create_user("tamper@example.com", "tamper@example.com", "password123")
+        approved = make_request(applicant)
+        ledger.record_history([
+            RequestStatusHistory(request=approved, old_status="under_review", new_status="approved", changed_by=applicant)
+        ])
+        token = proofs.build_proof(approved.request_id)["proof"]
+        self.assertTrue(proofs.verify_proof(token)["valid"])
+
+        # Bypass the append-only manager, as someone with database access could
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {LedgerEntry._meta.db_table} SET comments = %s WHERE request_id = %s",
+                ["Backdated approval", approved.request_id.hex],
+            )
+            self.assertEqual(cursor.rowcount, 1)
+        result = proofs.verify_proof(token)
+        self.assertFalse(result["valid"])
+        self.assertNotIn("status", result)
+
+    def test_proof_requires_approval_and_ownership(self):
+        applicant = User.objects.create_user("owner@example.com", "owner@example.com", "password123")
+        other = User.objects.create_user("other@example.com", "other@example.com", "password123")
+        submitted = make_request(applicant)
+        self.client.force_login(applicant)
+        self.assertEqual(self.client.get(reverse("ledger_proof", args=[submitted.request_id])).status_code, 404)
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(reverse("ledger_proof", args=[submitted.request_id])).status_code, 404)
+
+
+class BlockSchedulerTests(TestCase):
+    def setUp(self):
+        self.applicant = User.objects.create_user("batch@example.com", "batch@example.com", "password123")
+        self.scheduler = ledger_queue.BlockScheduler(batch_size=4, max_delay_ms=60 * 1000)
+
+    def transition(self, count):
+        ownership_request = make_request(self.applicant)
+        for i in range(count):
+            RequestStatusHistory.objects.create(
+                request=ownership_request, old_status="submitted", new_status="under_review",
+                changed_by=self.applicant, comments=f"step {i}",
+            )
+
+    def test_transitions_are_queued_not_sealed(self):
+        self.transition(3)
+        self.assertEqual(LedgerQueueItem.objects.count(), 3)
+        self.assertFalse(LedgerBlock.objects.exists())
+        # Neither 4 entries nor 60 s yet
+        self.assertIsNotNone(self.scheduler.seal_due())
+        self.assertFalse(LedgerBlock.objects.exists())
+
+    def test_seals_full_batches_then_waits_for_the_rest(self):
+        self.transition(10)
+        self.scheduler.seal_due()
+        self.assertEqual([b.entry_count for b in LedgerBlock.objects.all()], [4, 4])
+        self.assertEqual(LedgerQueueItem.objects.count(), 2)
+
+        self.scheduler.max_delay = 0
+        self.assertIsNone(self.scheduler.seal_due())
+        self.assertEqual([b.entry_count for b in LedgerBlock.objects.all()], [4, 4, 2])
+        self.assertTrue(ledger.verify_ledger(full=True).ok)
+
+        stats = self.scheduler.stats()
+        self.assertEqual((stats["blocks_sealed"], stats["entries_sealed"], stats["queue_depth"]), (3, 10, 0))
+        self.assertEqual(stats["batch_size"]["max"], 4)
+
+
+class BulkImportTests(TestCase):
+    def setUp(self):
+        self.applicant = User.objects.create_user("importer", "importer@example.com", "password123")
+
+    def row(self, **extra):
+        row = dict(
+            applicant="importer", survey_number="12/1", village="Kattanam", district="alappuzha",
+            property_area_sqft="5662", property_value="3900000", deed_type="sale",
+            previous_owner_name="Previous Owner", new_owner_name="New Owner",
+        )
+        row.update(extra)
+        return row
+
+    def csv_stream(self, rows):
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=list(self.row()) + ["status"])
+        writer.writeheader()
+        writer.writerows(rows)
+        return io.StringIO(out.getvalue())
+
+    def test_csv_chunks_and_reports_bad_rows(self):
+        rows = [
+            self.row(),
+            self.row(deed_type="mortgage"),
+            self.row(status="pending"),
+            self.row(applicant="nobody"),
+            self.row(survey_number=""),
+            self.row(status="under_review"),
+            self.row(applicant="importer@example.com", status="approved"),
+        ]
+        progress = []
+        result = bulk_import.import_requests(
+            self.csv_stream(rows), "csv", chunk_size=3, on_chunk=lambda r: progress.append((r.rows, r.created)),
+        )
+
+        self.assertEqual(progress, [(3, 1), (6, 2), (7, 3)])
+        self.assertEqual((result.rows, result.created, result.failed), (7, 3, 4))
+        errors = {e.line: e.message for e in result.errors}  # the header is line 1
+        self.assertEqual(sorted(errors), [3, 4, 5, 6])
+        self.assertIn("deed_type", errors[3])
+        self.assertIn("status", errors[4])
+        self.assertEqual(errors[5], "applicant: no user 'nobody'")
+        self.assertEqual(errors[6], "Missing survey_number")
+
+        imported = LandOwnershipChangeRequest.objects.filter(applicant=self.applicant)
+        self.assertEqual(sorted(imported.values_list("status", flat=True)), ["approved", "submitted", "under_review"])
+        self.assertFalse(imported.filter(submitted_at__isnull=True).exists())
+        self.assertEqual(imported.get(status="approved").approved_at, imported.get(status="approved").submitted_at)
+        # One history row each, queued for the ledger rather than sealed inline
+        self.assertEqual(RequestStatusHistory.objects.filter(request__in=imported).count(), 3)
+        self.assertEqual(LedgerQueueItem.objects.count(), 3)
+        self.assertFalse(LedgerBlock.objects.exists())
+
+    def test_json_lines(self):
+        lines = [
+            json.dumps(self.row(survey_number=0, property_area_sqft=5662, property_value=3900000)),
+            "",
+            "{not json",
+            json.dumps(["not", "an", "object"]),
+            json.dumps(self.row(previous_owner_name=None)),
+        ]
+        result = bulk_import.import_requests(io.StringIO("\n".join(lines) + "\n"), "jsonl")
+
+        self.assertEqual((result.rows, result.created, result.failed), (4, 1, 3))
+        errors = {e.line: e.message for e in result.errors}
+        self.assertTrue(errors[3].startswith("Invalid JSON"))
+        self.assertEqual(errors[4], "Expected a JSON object")
+        self.assertEqual(errors[5], "Missing previous_owner_name")
+        imported = LandOwnershipChangeRequest.objects.get(applicant=self.applicant)
+        self.assertEqual(imported.survey_number, "0")  # a JSON 0 is a value, not a missing column
+        self.assertEqual(imported.status, "submitted")
+
+    def test_drafts_get_no_history_and_shared_emails_are_ambiguous(self):
+        User.objects.create_user("twin-a", "twin@example.com", "password123")
+        User.objects.create_user("twin-b", "twin@example.com", "password123")
+        rows = [
+            self.row(status="draft"),
+            self.row(applicant="twin@example.com"),
+            self.row(applicant="twin-b"),
+        ]
+        result = bulk_import.import_requests(self.csv_stream(rows), "csv")
+
+        self.assertEqual((result.created, result.failed), (2, 1))
+        self.assertEqual(result.errors[0].line, 3)
+        self.assertIn("ambiguous applicant 'twin@example.com'", result.errors[0].message)
+        draft = LandOwnershipChangeRequest.objects.get(status="draft")
+        self.assertEqual((draft.applicant, draft.submitted_at), (self.applicant, None))
+        self.assertFalse(draft.status_history.exists())
+        self.assertEqual(LandOwnershipChangeRequest.objects.get(status="submitted").applicant.username, "twin-b")
+        self.assertEqual(LedgerQueueItem.objects.count(), 1)
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            list(bulk_import.iter_rows(io.StringIO(""), "xml"))
+
+
+class TransitionTests(TestCase):
+    def setUp(self):
+        self.applicant = User.objects.create_user("state@example.com", "state@example.com", "password123")
+        self.officer = User.objects.create_user("reviewer", "reviewer@example.com", "password123")
+        SubRegistrar.objects.create(user=self.officer, office_location="Alappuzha")
+        self.ownership_request = make_request(self.applicant)
+
+    def test_transition_updates_row_and_history(self):
+        Status = LandOwnershipChangeRequest.Status
+        self.ownership_request.transition(Status.UNDER_REVIEW, by=self.officer)
+        history = self.ownership_request.transition(Status.APPROVED, by=self.officer, comment="ok")
+        stored = LandOwnershipChangeRequest.objects.get(pk=self.ownership_request.pk)
+        self.assertEqual((stored.status, stored.version), (Status.APPROVED, 2))
+        self.assertIsNotNone(stored.approved_at)
+        self.assertEqual((history.old_status, history.new_status, history.comments),
+                         (Status.UNDER_REVIEW, Status.APPROVED, "ok"))
+        with self.assertRaises(InvalidTransition):
+            self.ownership_request.transition(Status.SUBMITTED, by=self.officer)
+
+    def test_stale_reviewer_gets_a_conflict(self):
+        Status = LandOwnershipChangeRequest.Status
+        first = LandOwnershipChangeRequest.objects.get(pk=self.ownership_request.pk)
+        second = LandOwnershipChangeRequest.objects.get(pk=self.ownership_request.pk)
+        first.transition(Status.UNDER_REVIEW, by=self.officer)
+        with self.assertRaises(TransitionConflict) as raised:
+            second.transition(Status.REJECTED, by=self.officer)
+        self.assertEqual((raised.exception.current_status, raised.exception.current_version),
+                         (Status.UNDER_REVIEW, 1))
+        self.assertEqual(self.ownership_request.status_history.count(), 1)
+
+    def test_transition_view(self):
+        url = reverse("transition_request", args=[self.ownership_request.request_id])
+        self.client.force_login(self.officer)
+        response = self.client.post(url, {"status": "under_review", "version": 0})
+        self.assertEqual(response.json(), {"status": "under_review", "version": 1})
+        response = self.client.post(url, {"status": "approved", "version": 0})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.client.post(url, {"status": "draft"}).status_code, 400)
+        self.client.force_login(self.applicant)
+        self.assertEqual(self.client.post(url, {"status": "approved"}).status_code, 403)
+
+
+class AssignmentTests(TestCase):
+    def setUp(self):
+        self.applicant = User.objects.create_user("route@example.com", "route@example.com", "password123")
+        office = SubRegistrarOffice.objects.create(office_name="Cherthala SRO", district="Alappuzha", taluk="Cherthala")
+        self.registrars = [
+            SubRegistrar.objects.create(
+                user=User.objects.create_user(f"sro{i}", f"sro{i}@example.com", "password123"),
+                office_location="Cherthala", office=office,
+            )
+            for i in range(2)
+        ]
+        self.kollam = SubRegistrar.objects.create(
+            user=User.objects.create_user("kollam", "kollam@example.com", "password123"), office_location=" Kollam ",
+        )
+
+    def open_counts(self):
+        return [SubRegistrar.objects.get(pk=r.pk).open_requests for r in self.registrars]
+
+    def test_routes_to_least_loaded_registrar_in_district(self):
+        for _ in range(5):
+            make_request(self.applicant, district="ALAPPUZHA")
+        make_request(self.applicant, district="Kollam")
+        make_request(self.applicant, district="Idukki")
+        result = assignment.assign_pending(batch_size=3)
+        self.assertEqual((result.assigned, result.unmatched), (6, 1))
+        self.assertEqual(sorted(self.open_counts()), [2, 3])
+        self.assertEqual(SubRegistrar.objects.get(pk=self.kollam.pk).open_requests, 1)
+
+        # Closing a request frees capacity; the next one goes to that registrar
+        busiest = max(self.registrars, key=lambda r: SubRegistrar.objects.get(pk=r.pk).open_requests)
+        closed = LandOwnershipChangeRequest.objects.filter(assigned_sub_registrar=busiest).first()
+        closed.transition(LandOwnershipChangeRequest.Status.REJECTED, by=busiest.user)
+        self.assertEqual(self.open_counts(), [2, 2])
+        self.assertEqual(assignment.assign_pending().assigned, 0)
+
+    def test_recount_and_reviewer_queue(self):
+        for _ in range(3):
+            make_request(self.applicant, district="alappuzha")
+        assignment.assign_pending()
+        SubRegistrar.objects.update(open_requests=0)
+        assignment.recount_open_requests()
+        self.assertEqual(sum(self.open_counts()), 3)
+
+        registrar = self.registrars[0]
+        self.client.force_login(registrar.user)
+        response = self.client.get(reverse("reviewer_queue"))
+        self.assertEqual(response.status_code, 200)
+        expected = LandOwnershipChangeRequest.objects.filter(assigned_sub_registrar=registrar).count()
+        self.assertEqual(len(response.context["requests"]), expected)
+        self.client.force_login(self.applicant)
+        self.assertEqual(self.client.get(reverse("reviewer_queue")).status_code, 403)
+
+    def test_reviewer_queue_pages_through_unstamped_submissions(self):
+        registrar = self.registrars[0]
+        stamped = [make_request(self.applicant, assigned_sub_registrar=registrar) for _ in range(3)]
+        unstamped = [make_request(self.applicant, assigned_sub_registrar=registrar) for _ in range(3)]
+        LandOwnershipChangeRequest.objects.filter(pk__in=[r.pk for r in unstamped]).update(submitted_at=None)
+
+        self.client.force_login(registrar.user)
+        seen, cursor = [], None
+        with mock.patch("myapp.views.REVIEWER_QUEUE_PAGE_SIZE", 2):
+            while True:
+                response = self.client.get(reverse("reviewer_queue"), {"cursor": cursor} if cursor else {})
+                self.assertEqual(response.status_code, 200)
+                seen += [r.pk for r in response.context["requests"]]
+                cursor = response.context["next_cursor"]
+                if not cursor:
+                    break
+        # Unstamped rows first, as the oldest; nothing skipped or repeated
+        self.assertEqual(seen[:3], sorted(r.pk for r in unstamped))
+        self.assertEqual(seen[3:], [r.pk for r in stamped])
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.applicant = User.objects.create_user("pager", "pager@example.com", "password123")
+        statuses = ["submitted", "approved", "submitted", "rejected", "submitted", "approved", "submitted"]
+        self.requests = [make_request(self.applicant, status=status) for status in statuses]
+        # Ties on created_at: only request_id orders rows within a timestamp
+        now = timezone.now()
+        for i, ownership_request in enumerate(self.requests):
+            LandOwnershipChangeRequest.objects.filter(pk=ownership_request.pk).update(
+                created_at=now - timedelta(minutes=i // 3)
+            )
+        self.client.force_login(self.applicant)
+
+    def expected(self, **filters):
+        return list(LandOwnershipChangeRequest.objects.filter(applicant=self.applicant, **filters)
+                    .order_by("-created_at", "-request_id").values_list("request_id", flat=True))
+
+    @mock.patch("myapp.views.MY_REQUESTS_PAGE_SIZE", 2)
+    def walk(self, **params):
+        seen, pages, cursor = [], 0, None
+        while True:
+            query = dict(params, **({"cursor": cursor} if cursor else {}))
+            response = self.client.get(reverse("my_requests"), query)
+            self.assertEqual(response.status_code, 200)
+            page = [r.request_id for r in response.context["requests"]]
+            self.assertLessEqual(len(page), 2)
+            seen += page
+            pages += 1
+            cursor = response.context["next_cursor"]
+            if cursor is None:
+                return seen, pages
+
+    def test_cursor_pages_through_ties_once_each(self):
+        seen, pages = self.walk()
+        self.assertEqual(seen, self.expected())
+        self.assertEqual(pages, 4)
+
+    def test_status_filter_is_kept_across_pages(self):
+        seen, pages = self.walk(status="submitted")
+        self.assertEqual(seen, self.expected(status="submitted"))
+        self.assertEqual(pages, 2)
+        # An unknown status is ignored rather than matching nothing
+        seen, _ = self.walk(status="bogus")
+        self.assertEqual(seen, self.expected())
+
+    def test_malformed_cursor_starts_from_the_first_page(self):
+        first = self.expected()[:25]
+        for cursor in ["not-a-cursor", "!!", pagination.encode_cursor(timezone.now(), "not-a-uuid")]:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(reverse("my_requests"), {"cursor": cursor})
+                self.assertEqual([r.request_id for r in response.context["requests"]], first)
+        self.assertIsNone(pagination.decode_cursor("not-a-cursor"))
+
+    def test_null_sort_values_are_oldest(self):
+        LandOwnershipChangeRequest.objects.filter(pk__in=[r.pk for r in self.requests[:3]]).update(submitted_at=None)
+        queryset = LandOwnershipChangeRequest.objects.filter(applicant=self.applicant)
+        for descending in (True, False):
+            with self.subTest(descending=descending):
+                seen, cursor = [], None
+                while True:
+                    page, cursor = pagination.keyset_page(
+                        queryset, cursor, 2, pk_field="request_id", sort_field="submitted_at", descending=descending,
+                    )
+                    seen += page
+                    if cursor is None:
+                        break
+                unstamped = [r.submitted_at is None for r in seen]
+                self.assertEqual(len(set(r.pk for r in seen)), len(self.requests))
+                self.assertEqual(unstamped, sorted(unstamped, reverse=not descending))
+
+
+class DashboardSummaryTests(TestCase):
+    def setUp(self):
+        cache.clear()  # user ids repeat across tests
+        self.applicant = User.objects.create_user("home@example.com", "home@example.com", "password123")
+        self.officer = User.objects.create_user("desk", "desk@example.com", "password123")
+        Status = LandOwnershipChangeRequest.Status
+        self.requests = [make_request(self.applicant) for _ in range(3)]
+        make_request(self.applicant, status=Status.DRAFT)
+        self.requests[0].transition(Status.UNDER_REVIEW, by=self.officer)
+        self.requests[0].transition(Status.APPROVED, by=self.officer, comment="Deed registered")
+
+    def test_summary_is_one_aggregate_plus_activities(self):
+        with self.assertNumQueries(2):
+            summary = dashboard.compute_summary(self.applicant.pk)
+        self.assertEqual((summary["total"], summary["active"], summary["approved"]), (4, 2, 1))
+        self.assertEqual(summary["by_status"]["draft"], 1)
+        self.assertEqual(summary["activities"][0]["action"], "Request Approved")
+        self.assertIn("Deed registered", summary["activities"][0]["description"])
+
+    def test_dashboard_is_cached_until_a_change_commits(self):
+        self.client.force_login(self.applicant)
+        url = reverse("dashboard")
+        self.client.get(url)
+        with self.assertNumQueries(2):  # session + user only
+            response = self.client.get(url)
+        self.assertEqual(response.context["active_transactions_count"], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.requests[1].transition(LandOwnershipChangeRequest.Status.REJECTED, by=self.officer)
+        self.assertEqual(self.client.get(url).context["active_transactions_count"], 1)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.applicant = User.objects.create_user("async@example.com", "async@example.com", "password123")
+        self.ownership_request = make_request(self.applicant, village="Kuttanad")
+        self.factory = AsyncRequestFactory()
+
+    def get(self, path, user):
+        request = self.factory.get(path)
+        request.user = user
+        return request
+
+    async def test_async_pages_render_from_async_orm(self):
+        response = await async_views.my_requests(self.get("/my-requests/", self.applicant))
+        self.assertContains(response, "Kuttanad")
+
+        request_id = self.ownership_request.request_id
+        response = await async_views.request_detail(self.get("/", self.applicant), request_id)
+        self.assertContains(response, "Kuttanad")
+        other = await User.objects.acreate(username="someone-else")
+        with self.assertRaises(Http404):
+            await async_views.request_detail(self.get("/", other), request_id)
+
+        response = await async_views.resident_dashboard(self.get("/dashboard/", self.applicant))
+        self.assertEqual(response.status_code, 200)
+
+    async def test_async_login_required(self):
+        response = await async_views.my_requests(self.get("/my-requests/", AnonymousUser()))
+        self.assertEqual(response.status_code, 302)
+
+
+class BatchValuationViewTests(TestCase):
+    def setUp(self):
+        self.url = reverse("batch_valuation")
+
+    def post(self, body):
+        return self.client.post(self.url, body if isinstance(body, str) else json.dumps(body),
+                                content_type="application/json")
+
+    def test_prices_every_item_in_order(self):
+        items = [
+            {"district": "alappuzha", "locality": "Kattanam", "area_sqft": 5662},
+            {"district": "Alappuzha", "locality": "Katanam"},
+            {"district": "Atlantis", "locality": "Nowhere", "area_sqft": "1200"},
+        ]
+        response = self.post({"items": items})
+        self.assertEqual(response.status_code, 200)
+        expected = utils.get_price_info_batch(
+            [(i["district"], i["locality"]) for i in items], [5662.0, None, 1200.0],
+        )
+        self.assertEqual(response.json()["results"], json.loads(json.dumps(expected)))
+        self.assertEqual(self.post({"items": []}).json(), {"results": []})
+
+    def test_malformed_requests_are_rejected(self):
+        cases = {
+            "invalid JSON": "{items: [",
+            "no items": {"rows": []},
+            "items not a list of objects": {"items": ["alappuzha"]},
+            "missing locality": {"items": [{"district": "alappuzha"}]},
+            "empty district": {"items": [{"district": "", "locality": "Kattanam"}]},
+            "infinite area": '{"items": [{"district": "alappuzha", "locality": "Kattanam", "area_sqft": Infinity}]}',
+            "NaN area": '{"items": [{"district": "alappuzha", "locality": "Kattanam", "area_sqft": NaN}]}',
+            "negative area": {"items": [{"district": "alappuzha", "locality": "Kattanam", "area_sqft": -5}]},
+        }
+        for label, body in cases.items():
+            with self.subTest(label):
+                response = self.post(body)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json())
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+    def test_item_limit(self):
+        item = {"district": "alappuzha", "locality": "Kattanam"}
+        with mock.patch("myapp.views.BATCH_VALUATION_MAX_ITEMS", 2):
+            self.assertEqual(self.post({"items": [item] * 2}).status_code, 200)
+            response = self.post({"items": [item] * 3})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "At most 2 items per request.")
+
+
+class ValuationServiceTests(TestCase):
+    def test_pool_matches_in_process_and_falls_back(self):
+        data = utils.get_price_data()
+        pairs = [(district, localities[0][:-1] + "x") for district, localities in data.locality_catalog[:6]]
+        expected = utils.get_price_info_batch(pairs)
+
+        service = ValuationService(workers=1, timeout=60).start()
+        self.addCleanup(service.shutdown)
+        self.assertEqual(service.price_info_batch(pairs), expected)
+        self.assertEqual(service.price_estimate(*pairs[0]), utils.get_price_estimate(*pairs[0]))
+
+        service.timeout = 0  # nothing finishes in time
+        self.assertEqual(service.price_estimate(*pairs[1]), utils.get_price_estimate(*pairs[1]))
+        self.assertEqual(service.stats()["fallbacks"], 1)
+        service.fallback = False
+        with self.assertRaises(ValuationUnavailable):
+            service.price_estimate(*pairs[2])
+
+    def test_workers_refuse_other_versions_and_are_recycled(self):
+        data = utils.get_price_data()
+        district, localities = data.locality_catalog[0]
+        args = (district, localities[0], 2000.0)
+        expected = utils.get_price_estimate(*args)
+
+        service = ValuationService(workers=1, timeout=60).start()
+        self.addCleanup(service.shutdown)
+        old_pool = service._get_pool()
+        with mock.patch.object(utils, "get_price_data_version", return_value="another-version"):
+            self.assertEqual(service.price_estimate(*args), expected)  # computed in-process
+        self.assertEqual(service.stats()["stale"], 1)
+
+        service.recycle(data)
+        self.assertIsNot(service._get_pool(), old_pool)
+        self.assertEqual(service.price_estimate(*args), expected)
+        self.assertEqual((service.stats()["recycles"], service.stats()["fallbacks"]), (1, 1))
+
+    def test_pool_that_cannot_start_falls_back(self):
+        args = (utils.get_price_data().locality_catalog[0][0], "anywhere", None)
+        service = ValuationService(workers=1, timeout=60)
+        with mock.patch.object(service, "_get_pool", side_effect=RuntimeError("cannot start")):
+            self.assertEqual(service.price_estimate(*args), utils.get_price_estimate(*args))
+        self.assertEqual((service.stats()["failures"], service.stats()["fallbacks"]), (1, 1))
+
+
+class PriceDataLoadingTests(TestCase):
+    def test_importing_the_views_loads_no_price_data(self):
+        import subprocess
+        import sys
+
+        from django.conf import settings
+
+        code = (
+            "import os, sys, django\n"
+            "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'land.settings')\n"
+            "django.setup()\n"
+            "import land.urls, myapp.views, myapp.async_views\n"
+            "from myapp import utils\n"
+            "print(sorted(m for m in ('numpy', 'pandas') if m in sys.modules), utils._price_data is None)\n"
+        )
+        env = {k: v for k, v in os.environ.items() if k != "DJANGO_SETTINGS_MODULE"}
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=settings.BASE_DIR, env=env,
+            capture_output=True, text=True, check=True,
+        ).stdout
+        self.assertEqual(output.strip(), "[] True")
+
+    def test_preload_setting_loads_in_ready(self):
+        from django.apps import apps
+
+        live = utils._price_data
+        self.addCleanup(setattr, utils, "_price_data", live)
+        config = apps.get_app_config("myapp")
+
+        utils._price_data = None
+        with self.settings(LAND_PRICES_PRELOAD=False):
+            config.ready()
+        self.assertIsNone(utils._price_data)
+        with self.settings(LAND_PRICES_PRELOAD=True, LAND_VALUATION_WORKERS=0):
+            config.ready()
+        self.assertIsNotNone(utils._price_data)
+        self.assertEqual(utils._price_data.version, utils.dataset_version())
+
+
+class PriceSnapshotTests(TestCase):
+    def setUp(self):
+        import shutil
+        import tempfile
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.csv_path = Path(directory.name) / "prices.csv"
+        shutil.copyfile(utils.DEFAULT_PRICES_CSV, self.csv_path)
+        self.snapshot_path = utils.get_snapshot_path(self.csv_path)
+        self.frame = utils.read_price_csv(self.csv_path)
+        snapshot.write_snapshot(self.frame, self.snapshot_path, self.csv_path)
+
+    def test_round_trip_matches_the_csv(self):
+        import numpy as np
+        import pandas as pd
+
+        mapped = utils.load_price_frame(self.csv_path)
+        self.assertIsInstance(mapped["district"].dtype, pd.CategoricalDtype)  # came from the snapshot
+        for name in snapshot.CODE_COLUMNS:
+            self.assertEqual(mapped[name].astype(str).tolist(), self.frame[name].astype(str).tolist())
+        for name in snapshot.NUMERIC_COLUMNS:
+            np.testing.assert_array_equal(mapped[name].to_numpy(), self.frame[name].to_numpy())
+
+        from_csv, from_snapshot = utils.PriceData(self.frame), utils.PriceData(mapped)
+        self.assertEqual(from_snapshot.locality_catalog, from_csv.locality_catalog)
+        pd.testing.assert_frame_equal(from_snapshot.model.locality_table, from_csv.model.locality_table)
+        np.testing.assert_array_equal(from_snapshot.model.area_coefficients, from_csv.model.area_coefficients)
+
+    def test_touched_csv_keeps_the_snapshot(self):
+        os.utime(self.csv_path, ns=(0, 0))
+        self.assertIsNotNone(snapshot.read_snapshot(self.snapshot_path, self.csv_path))
+
+    def test_stale_snapshot_falls_back_to_the_csv(self):
+        import pandas as pd
+
+        with open(self.csv_path, "a", encoding="utf-8") as fh:
+            fh.write("kottayam,Newplace,₹5 Lac,500000,2178 sqft,2178,,,,\n")
+        self.assertIsNone(snapshot.read_snapshot(self.snapshot_path, self.csv_path))
+        frame = utils.load_price_frame(self.csv_path)
+        self.assertEqual(len(frame), len(self.frame) + 1)
+        self.assertNotIsInstance(frame["district"].dtype, pd.CategoricalDtype)
+
+    def test_corrupt_snapshot_falls_back_to_the_csv(self):
+        good = self.snapshot_path.read_bytes()
+        corruptions = {
+            "foreign": b"PK\x03\x04" + good[4:],
+            "empty": b"",
+            "short header": good[:10],
+            "garbled header": good[:12] + b"{" * 40 + good[52:],
+            "truncated data": good[:len(good) // 2],
+        }
+        for label, content in corruptions.items():
+            with self.subTest(label):
+                self.snapshot_path.write_bytes(content)
+                self.assertIsNone(snapshot.read_snapshot(self.snapshot_path, self.csv_path))
+                self.assertEqual(len(utils.load_price_frame(self.csv_path)), len(self.frame))
+
+
+class PriceReloadTests(TestCase):
+    def setUp(self):
+        import shutil
+        import tempfile
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.csv_path = Path(directory.name) / "prices.csv"
+        shutil.copyfile(utils.DEFAULT_PRICES_CSV, self.csv_path)
+
+        live = utils._price_data
+        self.addCleanup(setattr, utils, "_price_data", live)
+        self.addCleanup(utils._get_prediction_cache().invalidate)
+        listeners = mock.patch.object(utils, "_reload_listeners", [])
+        listeners.start()
+        self.addCleanup(listeners.stop)
+
+    def add_listing(self):
+        with open(self.csv_path, "a", encoding="utf-8") as fh:
+            fh.write("kottayam,Zzyzxville,₹5 Lac,500000,2178 sqft,2178,,,,\n")
+
+    def test_reload_swaps_in_a_new_version_and_invalidates_the_cache(self):
+        reloads = []
+        utils.add_reload_listener(lambda data, path: reloads.append((data, path)))
+        old = utils.reload_price_data(self.csv_path, force=True)
+        self.assertIs(utils.get_price_data(), old)
+        self.assertEqual(old.version, utils.dataset_version(self.csv_path))
+
+        estimate, fallback, _ = utils.get_price_estimate("Kottayam", "Zzyzxville")
+        self.assertTrue(fallback)  # not in the data yet: district estimate
+        cache = utils._get_prediction_cache()
+        invalidations = cache.stats()["invalidations"]
+        self.assertIsNone(utils.reload_price_data(self.csv_path))  # unchanged content: nothing to do
+
+        self.add_listing()
+        new = utils.reload_price_data(self.csv_path)
+        self.assertIsNotNone(new)
+        self.assertNotEqual(new.version, old.version)
+        self.assertIs(utils.get_price_data(), new)
+        self.assertEqual(reloads, [(old, self.csv_path), (new, self.csv_path)])
+        self.assertEqual(cache.stats()["invalidations"], invalidations + 1)
+        self.assertEqual(cache.stats()["size"], 0)
+        self.assertEqual(len(new.df), len(old.df) + 1)  # the old generation is left as it was
+
+        estimate, fallback, matched = utils.get_price_estimate("Kottayam", "Zzyzxville")
+        self.assertEqual((fallback, matched), (False, "Zzyzxville"))
+        self.assertEqual(estimate.count, 1)
+
+    def test_readers_keep_the_old_generation_until_the_swap(self):
+        old = utils.reload_price_data(self.csv_path, force=True)
+        self.add_listing()
+        building, release = threading.Event(), threading.Event()
+        load = utils.PriceData.load
+
+        def slow_load(path=None):
+            building.set()
+            release.wait(10)
+            return load(path)
+
+        with mock.patch.object(utils.PriceData, "load", side_effect=slow_load):
+            thread = utils.reload_price_data_async(self.csv_path)
+            self.assertTrue(building.wait(10))
+            self.assertIs(utils.get_price_data(), old)
+            self.assertIsNone(utils.reload_price_data_async(self.csv_path))  # one build at a time
+            release.set()
+            thread.join(10)
+        self.assertEqual(utils.get_price_data().version, utils.dataset_version(self.csv_path))
+        self.assertNotEqual(utils.get_price_data().version, old.version)
+
+
+class LocalityMatcherTests(TestCase):
+    def test_agrees_with_difflib(self):
+        import random
+        from difflib import get_close_matches
+
+        from .management.commands.bench_locality_matcher import misspell
+        from .matcher import LocalityMatcher
+
+        rng = random.Random(11)
+        for district, names in utils.get_price_data().district_localities.items():
+            matcher = LocalityMatcher(names)
+            lowered = {}
+            for name in names:
+                lowered.setdefault(name.lower(), name)
+            queries = [name.upper() for name in names[:5]] + [misspell(name, rng) for name in names]
+            queries += ["".join(rng.sample("bcdfghjklmnpqrstvwxyz", 8)) for _ in range(5)] + ["x", ""]
+            for word in queries:
+                found = get_close_matches(word.lower(), list(lowered), n=1, cutoff=0.6)
+                self.assertEqual(matcher.best_match(word), lowered[found[0]] if found else None, (district, word))
+
+
+class ValuationModelTests(TestCase):
+    def test_robust_estimates_shrink_small_localities(self):
+        import pandas as pd
+
+        rows = [("d", "busy", 100.0), ("d", "busy", 110.0), ("d", "busy", 120.0), ("d", "busy", 100000.0),
+                ("d", "lone", 400.0)]
+        frame = pd.DataFrame(rows, columns=["district", "locality", "price_per_cent_calc"])
+        frame["cents"] = 10.0
+        frame["price_num"] = frame["price_per_cent_calc"] * frame["cents"]
+        model = valuation_model.fit_model(frame, *utils.price_keys(frame), strength=1.0, trim=0.25)
+
+        busy = model.locality_fit.loc[("d", "busy"), "per_cent"]
+        self.assertEqual((busy["median"], busy["trimmed_mean"]), (115.0, 115.0))  # the outlier barely moves them
+        self.assertGreater(100000.0, busy["upper_fence"])
+
+        district, lone = model.district("d"), model.locality("d", "lone")
+        self.assertEqual((district.per_cent, district.count), (120.0, 5))
+        self.assertEqual((lone.weight, lone.per_cent), (0.5, 260.0))  # halfway to the district median
+        self.assertLessEqual(lone.per_cent_low, lone.per_cent)
+        self.assertLessEqual(lone.per_cent, lone.per_cent_high)
+
+    def test_area_regression_recovers_a_power_law(self):
+        import numpy as np
+        import pandas as pd
+
+        cents = np.array([2.0, 5.0, 10.0, 40.0, 3.0, 3.0])
+        frame = pd.DataFrame({"district": ["a"] * 4 + ["b"] * 2, "locality": "x", "cents": cents})
+        frame["price_num"] = np.where(frame["district"] == "a", 1000 * cents ** 0.8, 500 * cents)
+        frame["price_per_cent_calc"] = frame["price_num"] / frame["cents"]
+        coefficients, sigma = valuation_model.fit_area_regression(frame, frame["district"], ["a", "b"])
+        np.testing.assert_allclose(coefficients[0], [np.log(1000), 0.8])
+        self.assertAlmostEqual(coefficients[1][1], 1.0)  # one parcel size only: proportional to area
+        self.assertLess(sigma[0], 1e-6)
+
+    def test_batch_area_scoring_matches_single_parcels(self):
+        district, localities = utils.get_locality_catalog()[0]
+        pairs = [(district, localities[0]), (district, localities[0] + "zz"), (district, "nowhere-at-all")]
+        areas = [1200, None, 43560]
+        results = utils.get_price_info_batch(pairs, areas)
+        for pair, area, result in zip(pairs, areas, results):
+            self.assertEqual(result["total_price"], utils.get_price_info_fuzzy(*pair, area)[1])
+        small, large = (utils.get_price_estimate(district, localities[0], area)[0] for area in (1200, 43560))
+        self.assertLess(small.total_low, small.total)
+        self.assertLess(small.total, small.total_high)
+        self.assertLess(small.total, large.total)
+
+    def test_predictor_shows_the_band(self):
+        district, localities = utils.get_locality_catalog()[0]
+        estimate, fallback, _ = utils.get_price_estimate(district, localities[0])
+        self.assertFalse(fallback)
+        response = self.client.post(reverse("prediction"), {"district": district, "locality": localities[0]})
+        self.assertContains(response, f"₹{estimate.total_low:,.0f} – ₹{estimate.total_high:,.0f}")
+        self.assertEqual(utils.get_price_info_batch([(district, localities[0])])[0]["per_cent"], estimate.per_cent)
+
+
+class ValuationCheckTests(TestCase):
+    def test_queued_checks_flag_under_valued_requests(self):
+        applicant = User.objects.create_user("seller@example.com", "seller@example.com", "password123")
+        estimate, _, _ = utils.get_price_estimate("alappuzha", "Kattanam", 5662)
+        fair = make_request(applicant, property_value=f"{estimate.total:.2f}")
+        cheap = make_request(applicant, property_value=f"{estimate.total * 0.3:.2f}")
+        unknown = make_request(applicant, district="Atlantis")
+        with self.captureOnCommitCallbacks():  # not executed: no checker thread in tests
+            valuation_checks.enqueue([fair, cheap, unknown])
+
+        checker = valuation_checks.ValuationChecker(batch_size=2, ratio=0.7)
+        with self.captureOnCommitCallbacks():
+            self.assertEqual(checker.process_all(), 3)
+        self.assertEqual(checker.stats()["batches"], 2)
+        self.assertEqual(checker.stats()["queue_depth"], 0)
+
+        Flag = LandOwnershipChangeRequest.ValuationFlag
+        for ownership_request, flag in ((fair, Flag.OK), (cheap, Flag.UNDER_VALUED), (unknown, Flag.UNPRICED)):
+            ownership_request.refresh_from_db()
+            self.assertEqual(ownership_request.valuation_flag, flag)
+            self.assertIsNotNone(ownership_request.valuation_checked_at)
+        self.assertAlmostEqual(float(cheap.predicted_value), estimate.total, places=2)
+        self.assertIsNone(unknown.predicted_value)
+
+        note = cheap.status_history.get()
+        self.assertEqual((note.old_status, note.new_status), ("submitted", "submitted"))
+        self.assertIn("flagged for review", note.comments)
+        self.assertTrue(LedgerQueueItem.objects.filter(history_id=note.history_id).exists())
+
+        # A reviewer note, not an event in the applicant's own views
+        self.client.force_login(applicant)
+        response = self.client.get(reverse("request_detail", args=[cheap.request_id]))
+        self.assertNotContains(response, "Valuation check")
+        self.assertEqual(dashboard.compute_summary(applicant.pk)["activities"], [])
+
+    def test_submitting_through_the_view_queues_a_check(self):
+        applicant = User.objects.create_user("form@example.com", "form@example.com", "password123")
+        self.client.force_login(applicant)
+        form = {
+            "survey_number": "101/2", "village": "Kattanam", "district": "alappuzha",
+            "property_area_sqft": "5662", "property_value": "3900000", "deed_type": "sale",
+            "previous_owner_name": "Previous Owner", "new_owner_name": "New Owner",
+        }
+        with self.captureOnCommitCallbacks():  # not executed: no checker thread in tests
+            response = self.client.post(reverse("register_land_ownership_change"), form)
+        self.assertRedirects(response, reverse("my_requests"))
+
+        ownership_request = LandOwnershipChangeRequest.objects.get(applicant=applicant)
+        self.assertEqual(ownership_request.status, "submitted")
+        self.assertEqual(ownership_request.valuation_flag, LandOwnershipChangeRequest.ValuationFlag.PENDING)
+        self.assertTrue(ValuationCheckTask.objects.filter(request=ownership_request).exists())
+        self.assertRedirects(self.client.get(reverse("register_land_ownership_change")), reverse("my_requests"))
+
+    def test_zero_predictions_are_unpriced(self):
+        Flag = LandOwnershipChangeRequest.ValuationFlag
+        self.assertEqual(valuation_checks.assess(100, 0, 0.7), Flag.UNPRICED)
+        self.assertEqual(valuation_checks.assess(100, -5.0, 0.7), Flag.UNPRICED)
+
+        applicant = User.objects.create_user("zero@example.com", "zero@example.com", "password123")
+        ownership_request = make_request(applicant)
+        checker = valuation_checks.ValuationChecker()
+        zero = {"total_price": 0.0}
+        with self.captureOnCommitCallbacks():
+            self.assertEqual(checker.record([ownership_request], [zero]), (1, 0))
+        ownership_request.refresh_from_db()
+        self.assertEqual(ownership_request.valuation_flag, Flag.UNPRICED)
+        self.assertIsNone(ownership_request.predicted_value)
+
+    def test_only_requests_actually_checked_are_counted(self):
+        applicant = User.objects.create_user("gone@example.com", "gone@example.com", "password123")
+        kept, deleted = make_request(applicant), make_request(applicant)
+        with self.captureOnCommitCallbacks():
+            valuation_checks.enqueue([kept, kept, deleted])
+
+        checker = valuation_checks.ValuationChecker()
+        claim = checker.claim
+
+        def claim_then_delete():
+            leased = claim()
+            LandOwnershipChangeRequest.objects.filter(pk=deleted.pk).delete()  # withdrawn after being leased
+            return leased
+
+        with mock.patch.object(checker, "claim", side_effect=claim_then_delete), self.captureOnCommitCallbacks():
+            self.assertEqual(checker.process_all(), 1)
+        self.assertEqual(checker.stats()["checked"], 1)
+        self.assertEqual(checker.stats()["queue_depth"], 0)
+
+    def test_pricing_runs_outside_the_transaction_and_leases_expire(self):
+        applicant = User.objects.create_user("lease@example.com", "lease@example.com", "password123")
+        first, second = make_request(applicant), make_request(applicant)
+        with self.captureOnCommitCallbacks():
+            valuation_checks.enqueue([first, second])
+        # Another checker holds the first row; its lease has not run out yet
+        ValuationCheckTask.objects.filter(request=first).update(
+            claimed_by=uuid.uuid4(), claimed_until=timezone.now() + timedelta(minutes=1)
+        )
+
+        depth = len(connection.atomic_blocks)  # the test case's own transaction
+        service = valuation_checks.get_valuation_service()
+        price_info_batch = service.price_info_batch
+
+        def priced_outside_transaction(pairs, areas):
+            self.assertEqual(len(connection.atomic_blocks), depth)
+            return price_info_batch(pairs, areas)
+
+        checker = valuation_checks.ValuationChecker()
+        with mock.patch.object(service, "price_info_batch", priced_outside_transaction):
+            with self.captureOnCommitCallbacks():
+                self.assertEqual(checker.process_all(), 1)
+            self.assertEqual(list(ValuationCheckTask.objects.values_list("request_id", flat=True)), [first.pk])
+
+            ValuationCheckTask.objects.update(claimed_until=timezone.now() - timedelta(seconds=1))
+            with self.captureOnCommitCallbacks():
+                self.assertEqual(checker.process_all(), 1)
+        self.assertFalse(ValuationCheckTask.objects.exists())
+
+
+class PredictionCacheTests(TestCase):
+    def test_shared_keys_are_memcached_safe(self):
+        from django.core.cache.backends.base import memcache_key_warnings
+
+        from .prediction_cache import PredictionCache
+
+        shared = PredictionCache(backend_alias="default")
+        key = ("ernakulam", "kakkanad west\n" + "x" * 300)
+        backend_key = shared._backend_key(key, "0123456789abcdef")
+        self.assertEqual(list(memcache_key_warnings(backend_key)), [])
+        self.assertNotEqual(backend_key, shared._backend_key(("ernakulam", "kakkanad"), "0123456789abcdef"))
+
+        cache.clear()
+        shared.set(key, (1.0, 2.0, False, None), "v1")
+        other_process = PredictionCache(backend_alias="default")
+        self.assertEqual(other_process.get(key, "v1"), (1.0, 2.0, False, None))
+        self.assertEqual(other_process.stats()["shared_hits"], 1)
+        self.assertIsNone(other_process.get(key, "v2"))
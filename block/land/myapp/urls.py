@@ -1,12 +1,16 @@
 from django.contrib import admin
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, async_views
+
+# Under ASGI (settings.LAND_ASYNC_VIEWS) these pages are served by native async views
+pages = async_views if settings.LAND_ASYNC_VIEWS else views
 
 urlpatterns = [
     path('', views.index, name='index'),
     path('register/', views.customer_register, name='customer_register'),
     path('login/', views.customer_login, name='customer_login'),
-    path('dashboard/', views.resident_dashboard, name='dashboard'),
+    path('dashboard/', pages.resident_dashboard, name='dashboard'),
     path('logout/', views.customer_logout, name='customer_logout'),
     path('properties/', views.view_properties, name='view_properties'),
     path('transaction/start/', views.start_transaction, name='start_transaction'),
@@ -18,11 +22,20 @@ urlpatterns = [
     path('help/', views.help_center, name='help_center'),
     path("adminlogin/", views.admin_login, name="admin_login"),
     path("admindashboard/", views.admin_dashboard, name="admin_dashboard"),
-    path("prediction/", views.predict, name="prediction"),
+    path("prediction/", pages.predict, name="prediction"),
+    path("api/valuation/batch/", views.batch_valuation, name="batch_valuation"),
+    path("api/valuation/cache-stats/", views.prediction_cache_stats, name="prediction_cache_stats"),
     path('properties/', views.view_properties, name='view_properties'),
-    path("register/", views.register_land_ownership_change, name="register_land_ownership_change"),
-    path("my-requests/", views.my_requests, name="my_requests"),
-    path("my-requests/<uuid:request_id>/", views.request_detail, name="request_detail"),
+    path("requests/new/", views.register_land_ownership_change, name="register_land_ownership_change"),
+    path("my-requests/", pages.my_requests, name="my_requests"),
+    path("requests/import/", views.import_land_requests, name="import_land_requests"),
+    path("my-requests/<uuid:request_id>/", pages.request_detail, name="request_detail"),
+    path("reviewer/queue/", views.reviewer_queue, name="reviewer_queue"),
+    path("requests/<uuid:request_id>/transition/", views.transition_request, name="transition_request"),
+    path("api/ledger/proof/<uuid:request_id>/", views.ledger_proof, name="ledger_proof"),
+    path("api/ledger/verify/", views.verify_ledger_proof, name="verify_ledger_proof"),
+    path("api/ledger/batcher-stats/", views.ledger_batcher_stats, name="ledger_batcher_stats"),
+    path("api/valuation/check-stats/", views.valuation_check_stats, name="valuation_check_stats"),
     
 
 
@@ -1,57 +1,375 @@
-import pandas as pd
-from difflib import get_close_matches
+import itertools
+import threading
+from pathlib import Path
+from types import MappingProxyType
+
+from django.conf import settings
+
+DEFAULT_PRICES_CSV = Path(__file__).resolve().parent / "land_prices_with_correct_per_cent.csv"
+
 
 # ---------- Load Cleaned Data ----------
-df = pd.read_csv("myapp/land_prices_with_correct_per_cent.csv")
+def get_prices_csv_path():
+    """Dataset location: settings.LAND_PRICES_CSV, else the CSV shipped with the app"""
+    return Path(getattr(settings, "LAND_PRICES_CSV", None) or DEFAULT_PRICES_CSV)
+
+
+def get_snapshot_path(csv_path=None):
+    """Snapshot location: settings.LAND_PRICES_SNAPSHOT, else next to the CSV"""
+    configured = getattr(settings, "LAND_PRICES_SNAPSHOT", None)
+    if configured:
+        return Path(configured)
+    return Path(csv_path or get_prices_csv_path()).with_suffix(".snapshot")
+
+
+def read_price_csv(path=None):
+    """Parse the price CSV and add the derived cents / price_per_cent_calc columns"""
+    import pandas as pd
+
+    df = pd.read_csv(path or get_prices_csv_path())
+
+    # Keep only valid rows
+    df = df.dropna(subset=["district", "locality", "area_sqft", "price_num"])
+    df = df[df["area_sqft"] > 0].copy()
+
+    # Compute cents and per cent price
+    df["cents"] = df["area_sqft"] / 435.6
+    df["price_per_cent_calc"] = df["price_num"] / df["cents"]
+    return df
+
+
+def load_price_frame(path=None):
+    """
+    Load the cleaned dataset, memory-mapping the binary snapshot built by
+    `manage.py build_price_snapshot` when it is up to date with the CSV.
+    """
+    from .snapshot import read_snapshot
+
+    csv_path = Path(path or get_prices_csv_path())
+    df = read_snapshot(get_snapshot_path(csv_path), csv_path)
+    if df is None:
+        df = read_price_csv(csv_path)
+    return df
+
+
+# ---------- Index Keys and Catalogs ----------
+def normalize(value):
+    """Normalize a district/locality name for index lookups"""
+    return str(value).lower()
+
+
+def price_keys(frame):
+    """Normalized district and locality Series used as index keys"""
+    return frame["district"].str.lower().rename("district_key"), frame["locality"].str.lower().rename("locality_key")
+
+
+def build_catalogs(frame, district_key):
+    """
+    Catalogs of the districts and localities in the frame, in one groupby pass.
+    Returns: district_names, district_localities
+      district_names      {district: display name}  (first spelling seen)
+      district_localities {district: (original locality names, ...)}
+    """
+    district_names = {}
+    district_localities = {}
+    for district, group in frame[["district", "locality"]].groupby(district_key, sort=False):
+        district_names[district] = str(group["district"].iloc[0])
+        district_localities[district] = tuple(group["locality"].drop_duplicates().tolist())
+    return district_names, district_localities
+
+
+_local_versions = itertools.count(1)
+
+
+class PriceData:
+    """Cleaned price dataset together with the indexes built from it"""
+
+    def __init__(self, df, version=None):
+        from .matcher import build_matchers
+        from .valuation_model import fit_model
+
+        self.df = df
+        # Identifies this generation of the data, e.g. for cache invalidation
+        self.version = version or "local-%d" % next(_local_versions)
+        keys = price_keys(df)
+        district_names, district_localities = build_catalogs(df, keys[0])
+
+        # Immutable catalogs, safe to share between threads and requests
+        self.district_localities = MappingProxyType(district_localities)
+        self.districts = tuple(sorted(district_names.values()))
+        self.locality_catalog = tuple(sorted(
+            (district_names[key], tuple(sorted(names, key=str.lower)))
+            for key, names in district_localities.items()
+        ))
+        self.matchers = build_matchers(self.district_localities)
+        # Robust estimators, fitted once per generation; predictions are served from these
+        self.model = fit_model(df, *keys)
+
+    @classmethod
+    def load(cls, path=None):
+        csv_path = Path(path or get_prices_csv_path())
+        return cls(load_price_frame(csv_path), version=dataset_version(csv_path))
+
+
+def dataset_version(path=None):
+    """Content version of the price CSV (sha256 prefix), or None if it is missing"""
+    from .snapshot import file_sha256
+
+    csv_path = Path(path or get_prices_csv_path())
+    return file_sha256(csv_path)[:16] if csv_path.exists() else None
+
+
+# ---------- Lazy Provider ----------
+_price_data = None
+_price_data_lock = threading.Lock()
+
+
+def get_price_data():
+    """Return the shared PriceData, loading it on first use (thread-safe)"""
+    global _price_data
+    data = _price_data
+    if data is None:
+        with _price_data_lock:
+            if _price_data is None:
+                _price_data = PriceData.load()
+            data = _price_data
+    return data
+
+
+def __getattr__(name):
+    # Keep `utils.df` / `utils.district_localities` working without import-time loading
+    if name in ("df", "district_localities"):
+        return getattr(get_price_data(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ---------- Prediction Cache ----------
+_prediction_cache = None
+
+
+def _get_prediction_cache():
+    global _prediction_cache
+    if _prediction_cache is None:
+        from .prediction_cache import PredictionCache
 
-# Keep only valid rows
-df = df.dropna(subset=["district", "locality", "area_sqft", "price_num"])
-df = df[df["area_sqft"] > 0]
+        with _price_data_lock:
+            if _prediction_cache is None:
+                _prediction_cache = PredictionCache.from_settings()
+    return _prediction_cache
 
-# Compute cents and per cent price
-df["cents"] = df["area_sqft"] / 435.6
-df["price_per_cent_calc"] = df["price_num"] / df["cents"]
 
-# ---------- Districts and Localities Mapping ----------
-district_localities = {
-    district: df[df["district"] == district]["locality"].unique().tolist()
-    for district in df["district"].unique()
-}
+def get_prediction_cache_stats():
+    """Hit/miss/eviction counters of the prediction cache, for monitoring"""
+    return _get_prediction_cache().stats()
+
+
+# ---------- Hot Reload ----------
+# Held for the whole build, so at most one new generation exists next to the
+# live one. Readers never take it: they keep using the old generation until
+# the single assignment to _price_data below.
+_reload_lock = threading.Lock()
+_reload_listeners = []
+
+
+def add_reload_listener(callback):
+    """Call callback(data, path) after each reload swaps in a new generation"""
+    if callback not in _reload_listeners:
+        _reload_listeners.append(callback)
+
+
+def reload_price_data(path=None, force=False):
+    """
+    Rebuild the dataset, indexes and fuzzy matchers, then swap them in.
+    Returns the new PriceData, or None if the CSV content is unchanged.
+    """
+    global _price_data
+    with _reload_lock:
+        current = _price_data
+        if not force and current is not None and dataset_version(path) == current.version:
+            return None
+        data = PriceData.load(path)
+        _price_data = data
+    _get_prediction_cache().invalidate()
+    for callback in list(_reload_listeners):
+        callback(data, path)
+    return data
+
+
+def reload_price_data_async(path=None, force=False):
+    """Run reload_price_data in a background thread (skipped if one is already running)"""
+    if _reload_lock.locked():
+        return None
+    thread = threading.Thread(
+        target=reload_price_data, kwargs={"path": path, "force": force},
+        name="price-data-reload", daemon=True,
+    )
+    thread.start()
+    return thread
+
 
 # ---------- Functions ----------
 def get_districts():
-    """Return list of available districts"""
-    return sorted(df["district"].dropna().unique().tolist())
+    """Return the sorted tuple of available districts"""
+    return get_price_data().districts
 
-def get_price_info_fuzzy(district, locality):
+
+def get_locality_catalog():
+    """Return ((district, (locality, ...)), ...) sorted by district, for the predictor form"""
+    return get_price_data().locality_catalog
+
+
+def get_price_data_version():
+    """Version of the loaded dataset, e.g. for cache keys"""
+    return get_price_data().version
+
+
+def _resolve_estimate(data, district_key, locality):
     """
-    Predict average price per cent and total price for a given locality.
-    Uses fuzzy matching if locality is misspelled.
-    Returns: per_cent, total_price, fallback_flag, matched_locality
+    Uncached prediction for a normalized district.
+    Returns: estimate, fallback_flag, matched_locality
+    (matched_locality is None for exact matches; the caller echoes its input)
     """
+    model = data.model
+
     # Exact match first
-    subset = df[(df["district"].str.lower() == district.lower()) &
-                (df["locality"].str.lower() == locality.lower())]
-    if not subset.empty:
-        avg_per_cent = subset["price_per_cent_calc"].mean()
-        avg_total = subset["price_num"].mean()
-        return round(avg_per_cent, 2), round(avg_total, 2), False, locality  # exact match
+    estimate = model.locality(district_key, normalize(locality))
+    if estimate is not None:
+        return estimate, False, None  # exact match
 
     # Fuzzy match within district
-    localities_list = district_localities.get(district, [])
-    closest = get_close_matches(locality, localities_list, n=1, cutoff=0.6)
-    if closest:
-        matched_locality = closest[0]
-        subset = df[(df["district"].str.lower() == district.lower()) &
-                    (df["locality"] == matched_locality)]
-        avg_per_cent = subset["price_per_cent_calc"].mean()
-        avg_total = subset["price_num"].mean()
-        return round(avg_per_cent, 2), round(avg_total, 2), True, matched_locality  # fuzzy match
-
-    # Fallback to district average
-    subset = df[df["district"].str.lower() == district.lower()]
-    if subset.empty:
+    matcher = data.matchers.get(district_key)
+    matched_locality = matcher.best_match(locality) if matcher else None
+    if matched_locality:
+        return model.locality(district_key, normalize(matched_locality)), True, matched_locality  # fuzzy match
+
+    # Fallback to district estimate
+    estimate = model.district(district_key)
+    if estimate is None:
+        return None, None, None
+    return estimate, True, None  # district fallback
+
+
+def get_price_estimate(district, locality, area_sqft=None):
+    """
+    Robust valuation for a given locality, with its band.
+    Uses fuzzy matching if locality is misspelled. With area_sqft the total
+    price and its band come from the district's area regression.
+    Returns: estimate (valuation_model.Estimate, or None), fallback_flag, matched_locality
+    """
+    data = get_price_data()
+    cache = _get_prediction_cache()
+    key = (normalize(district), normalize(locality))
+
+    result = cache.get(key, data.version)
+    if result is None:
+        result = _resolve_estimate(data, key[0], locality)
+        cache.set(key, result, data.version)
+
+    estimate, fallback, matched_locality = result
+    if fallback is False:
+        matched_locality = locality
+    if estimate is not None and area_sqft:
+        # The match is cached per locality; scaling to the parcel is a few flops
+        estimate = data.model.for_area(key[0], estimate, area_sqft)
+    return estimate, fallback, matched_locality
+
+
+def get_price_info_fuzzy(district, locality, area_sqft=None):
+    """
+    Predict price per cent and total price for a given locality.
+    Uses fuzzy matching if locality is misspelled.
+    Returns: per_cent, total_price, fallback_flag, matched_locality
+    """
+    estimate, fallback, matched_locality = get_price_estimate(district, locality, area_sqft)
+    if estimate is None:
         return None, None, None, None
-    avg_per_cent = subset["price_per_cent_calc"].mean()
-    avg_total = subset["price_num"].mean()
-    return round(avg_per_cent, 2), round(avg_total, 2), True, None  # district fallback
+    return estimate.per_cent, estimate.total, fallback, matched_locality
+
+
+def get_price_info_batch(pairs, areas=None):
+    """
+    Price many (district, locality) pairs at once.
+    Exact matches are resolved with one merge against the model's locality
+    table, distinct misses are fuzzy-matched once each, and the rest fall
+    back to the district table. areas, if given, holds an area_sqft (or
+    None) per pair; those totals are scored against the district area
+    regressions in one matrix operation. Returns one dict per pair, in input
+    order, with the same values get_price_estimate would give:
+      district, locality, per_cent, per_cent_low, per_cent_high,
+      total_price, fallback, matched_locality
+    """
+    import numpy as np
+    import pandas as pd
+
+    data = get_price_data()
+    items = pd.DataFrame(list(pairs), columns=["district", "locality"], dtype=object)
+    if items.empty:
+        return []
+    items["district_key"] = items["district"].map(normalize)
+    items["locality_key"] = items["locality"].map(normalize)
+
+    # Exact matches
+    keys = pd.MultiIndex.from_frame(items[["district_key", "locality_key"]])
+    exact = keys.isin(data.model.locality_table.index)
+
+    # Fuzzy match each distinct miss once
+    misses = items.loc[~exact, ["district_key", "locality"]].drop_duplicates()
+    fuzzy = {}
+    for district_key, locality in zip(misses["district_key"], misses["locality"]):
+        matcher = data.matchers.get(district_key)
+        fuzzy[(district_key, locality)] = matcher.best_match(locality) if matcher else None
+    matched = pd.Series(
+        [fuzzy[key] for key in zip(items.loc[~exact, "district_key"], items.loc[~exact, "locality"])],
+        index=items.index[~exact], dtype=object,
+    )
+    items["matched_locality"] = items["locality"].where(exact, matched)
+    items["match_key"] = items["matched_locality"].map(normalize, na_action="ignore")
+
+    stats_columns = ["per_cent", "per_cent_low", "per_cent_high", "total"]
+    by_locality = items.join(
+        data.model.locality_table[stats_columns], on=["district_key", "match_key"]
+    )[stats_columns]
+    by_district = items.join(data.model.district_table[stats_columns], on="district_key")[stats_columns]
+    has_locality = by_locality["per_cent"].notna().to_numpy()
+    has_district = by_district["per_cent"].notna().to_numpy()
+    values = np.where(
+        has_locality[:, None], by_locality.to_numpy(dtype=float), by_district.to_numpy(dtype=float)
+    )
+
+    # Area-aware totals for every row that has an area
+    if areas is not None:
+        from .valuation_model import SQFT_PER_CENT
+
+        model = data.model
+        area = pd.to_numeric(pd.Series(list(areas), dtype=object), errors="coerce").to_numpy(dtype=float)
+        priced = (has_locality | has_district) & (area > 0)
+        if priced.any():
+            rows = model.district_table.index.get_indexer(items.loc[priced, "district_key"])
+            premium = model.premiums(rows, values[priced, 0])
+            values[priced, 3] = model.price_area(rows, area[priced] / SQFT_PER_CENT, premium)[0]
+
+    results = []
+    for row, (district, locality, matched_locality) in enumerate(
+        zip(items["district"], items["locality"], items["matched_locality"])
+    ):
+        if has_locality[row]:
+            fallback = not exact[row]
+        elif has_district[row]:
+            matched_locality, fallback = None, True
+        else:
+            results.append({
+                "district": district, "locality": locality, "per_cent": None, "per_cent_low": None,
+                "per_cent_high": None, "total_price": None, "fallback": None, "matched_locality": None,
+            })
+            continue
+        results.append({
+            "district": district,
+            "locality": locality,
+            "per_cent": float(values[row, 0]),
+            "per_cent_low": float(values[row, 1]),
+            "per_cent_high": float(values[row, 2]),
+            "total_price": float(values[row, 3]),
+            "fallback": bool(fallback),
+            "matched_locality": matched_locality,
+        })
+    return results
@@ -0,0 +1,213 @@
+"""
+Automatic valuation check on submitted ownership requests.
+
+A deed declared well below market value is a stamp-duty red flag, so every
+submitted request is compared with the price model's area-aware estimate
+for its district and village. The submit POST only writes a
+ValuationCheckTask row in its own transaction. A ValuationChecker then
+leases queued rows in batches and prices each batch with one
+get_price_info_batch call, outside any transaction, since pricing may wait
+on the valuation workers. A short transaction then stores the results on
+the requests, adds a reviewer note per request (a RequestStatusHistory row
+that keeps the status, which also goes to the ledger), and deletes the
+task rows. A checker that dies mid-batch leaves its rows to be leased
+again once LEASE_SECONDS have passed.
+
+A declared value below settings.LAND_VALUATION_FLAG_RATIO of the predicted
+value marks the request UNDER_VALUED for the reviewer.
+
+Each web process runs the checker on a background.BackgroundQueue thread,
+started on the first enqueue (settings.LAND_VALUATION_CHECK_THREAD).
+Alternatively run `manage.py check_valuations --watch` as a dedicated
+worker and turn the thread off.
+"""
+import threading
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from . import ledger_queue
+from .background import BackgroundQueue
+from .models import LandOwnershipChangeRequest, RequestStatusHistory, ValuationCheckTask
+from .valuation_service import get_valuation_service
+
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_FLAG_RATIO = 0.7
+LEASE_SECONDS = 5 * 60
+
+Flag = LandOwnershipChangeRequest.ValuationFlag
+
+
+def enqueue(requests):
+    """Queue requests for a valuation check (in the caller's transaction)"""
+    tasks = [ValuationCheckTask(request=r) for r in requests]
+    if tasks:
+        ValuationCheckTask.objects.bulk_create(tasks)
+        transaction.on_commit(get_checker().notify)
+    return len(tasks)
+
+
+def assess(declared, predicted, ratio):
+    """Flag for a declared value against the predicted one (None or <= 0 if unpriced)"""
+    if predicted is None or predicted <= 0:
+        return Flag.UNPRICED
+    if float(declared) < ratio * predicted:
+        return Flag.UNDER_VALUED
+    return Flag.OK
+
+
+def history_comment(flag, declared, predicted):
+    if flag == Flag.UNPRICED:
+        return "Valuation check: no market data for this village or district."
+    verdict = "under-valued, flagged for review" if flag == Flag.UNDER_VALUED else "within market range"
+    return (f"Valuation check: declared ₹{declared:,.0f} against a predicted ₹{predicted:,.0f} "
+            f"({float(declared) / predicted:.0%}); {verdict}.")
+
+
+class ValuationChecker(BackgroundQueue):
+    """Runs queued valuation checks in batches"""
+
+    thread_name = "valuation-checker"
+    thread_setting = "LAND_VALUATION_CHECK_THREAD"
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, ratio=DEFAULT_FLAG_RATIO, lease_seconds=LEASE_SECONDS):
+        super().__init__()
+        self.batch_size = max(1, int(batch_size))
+        self.ratio = ratio
+        self.lease = timedelta(seconds=lease_seconds)
+        self._counter_lock = threading.Lock()
+        self.batches = 0
+        self.checked = 0
+        self.flagged = 0
+        self.errors = 0
+        self.last_error = None
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            batch_size=getattr(settings, "LAND_VALUATION_CHECK_BATCH_SIZE", DEFAULT_BATCH_SIZE),
+            ratio=getattr(settings, "LAND_VALUATION_FLAG_RATIO", DEFAULT_FLAG_RATIO),
+        )
+
+    # ---------- Checking ----------
+    def claim(self):
+        """Lease up to batch_size of the oldest free tasks; returns (token, request ids)"""
+        now = timezone.now()
+        free = ValuationCheckTask.objects.filter(Q(claimed_until__isnull=True) | Q(claimed_until__lt=now))
+        ids = list(free.order_by("id").values_list("id", flat=True)[:self.batch_size])
+        if not ids:
+            return None, []
+        # Conditional on the lease still being free, so concurrent checkers split the rows
+        token = uuid.uuid4()
+        free.filter(id__in=ids).update(claimed_by=token, claimed_until=now + self.lease)
+        return token, list(ValuationCheckTask.objects.filter(claimed_by=token).values_list("request_id", flat=True))
+
+    def check_batch(self):
+        """
+        Check up to batch_size of the oldest queued requests. Returns how many
+        requests were checked (tasks of deleted requests complete uncounted),
+        or None when nothing was queued.
+        """
+        token, request_ids = self.claim()
+        if not request_ids:
+            return None
+        requests = list(LandOwnershipChangeRequest.objects.filter(request_id__in=request_ids).only(
+            "request_id", "status", "district", "village", "property_area_sqft", "property_value"
+        ))
+        # No transaction is open while pricing waits on the valuation workers
+        predictions = get_valuation_service().price_info_batch(
+            [(r.district, r.village) for r in requests],
+            [float(r.property_area_sqft) for r in requests],
+        )
+        with transaction.atomic():
+            checked, flagged = self.record(requests, predictions)
+            ValuationCheckTask.objects.filter(claimed_by=token).delete()
+        with self._counter_lock:
+            self.batches += 1
+            self.checked += checked
+            self.flagged += flagged
+        return checked
+
+    def record(self, requests, predictions):
+        """Store priced requests' results and reviewer notes; returns (updated, flagged) counts"""
+        now = timezone.now()
+        history = []
+        for ownership_request, prediction in zip(requests, predictions):
+            predicted = prediction["total_price"]
+            flag = assess(ownership_request.property_value, predicted, self.ratio)
+            ownership_request.valuation_flag = flag
+            ownership_request.predicted_value = Decimal(str(predicted)) if flag != Flag.UNPRICED else None
+            ownership_request.valuation_checked_at = now
+            # Same old and new status: a reviewer note, left out of the resident's views
+            history.append(RequestStatusHistory(
+                request=ownership_request,
+                old_status=ownership_request.status,
+                new_status=ownership_request.status,
+                comments=history_comment(flag, ownership_request.property_value, predicted),
+            ))
+        # Only the check's own columns: a concurrent transition keeps its status
+        updated = LandOwnershipChangeRequest.objects.bulk_update(
+            requests, ["valuation_flag", "predicted_value", "valuation_checked_at"]
+        )
+        RequestStatusHistory.objects.bulk_create(history)
+        # bulk_create sends no post_save, so queue the ledger entries here
+        ledger_queue.enqueue_history(history)
+        return updated, sum(r.valuation_flag == Flag.UNDER_VALUED for r in requests)
+
+    def process_all(self):
+        """Check everything queued and not leased elsewhere; returns how many requests were checked"""
+        done = 0
+        while True:
+            checked = self.check_batch()
+            if checked is None:
+                return done
+            done += checked
+
+    def queue_state(self):
+        """(depth, enqueued_at of the oldest row or None)"""
+        state = ValuationCheckTask.objects.aggregate(depth=Count("id"), oldest=Min("enqueued_at"))
+        return state["depth"], state["oldest"]
+
+    # ---------- Background thread ----------
+    def work(self):
+        self.process_all()
+        return None
+
+    def record_error(self, error):
+        with self._counter_lock:
+            self.errors += 1
+            self.last_error = repr(error)
+
+    def stats(self):
+        depth, oldest = self.queue_state()
+        with self._counter_lock:
+            return {
+                "batches": self.batches,
+                "checked": self.checked,
+                "flagged": self.flagged,
+                "errors": self.errors,
+                "last_error": self.last_error,
+                "queue_depth": depth,
+                "oldest_queued_ms": round((timezone.now() - oldest).total_seconds() * 1000, 1) if oldest else 0,
+                "batch_size_limit": self.batch_size,
+                "flag_ratio": self.ratio,
+                "thread_alive": self.thread_alive(),
+            }
+
+
+_checker = None
+_checker_lock = threading.Lock()
+
+
+def get_checker():
+    global _checker
+    if _checker is None:
+        with _checker_lock:
+            if _checker is None:
+                _checker = ValuationChecker.from_settings()
+    return _checker
@@ -0,0 +1,224 @@
+"""
+Robust valuation model, fitted once per dataset version.
+
+The scraped listings contain outliers (typos, bulk sales, mis-parsed
+units) that pull a plain mean around, so predictions are built from order
+statistics instead. For price per cent and total price, fit_model()
+computes per (district, locality) and per district:
+
+    median, trimmed mean, Q1, Q3, Tukey fences (Q1 - 1.5 IQR, Q3 + 1.5 IQR), count
+
+Most localities have only one or two listings, so each locality statistic
+is shrunk toward its district's:
+
+    w * locality + (1 - w) * district,    w = n / (n + k)
+
+with k = settings.LAND_VALUATION_SHRINKAGE. The point estimate is the
+shrunk median and the band the shrunk interquartile range. The fitted
+tables are small and kept next to dict views of them, so serving a
+prediction is one lookup.
+
+Total price depends on parcel size, so when an area is given the total
+comes from a per-district regression instead:
+
+    log(price) = a + b * log(cents) + log(locality premium)
+
+where the premium is the locality's price per cent relative to its
+district's. fit_area_regression() accumulates the sufficient statistics of
+every district in one pass over the frame and solves them in closed form;
+scoring any number of parcels is one row-wise product against the
+coefficient matrix.
+"""
+from collections import namedtuple
+
+from django.conf import settings
+
+DEFAULT_SHRINKAGE = 5.0
+DEFAULT_TRIM = 0.1
+FENCE = 1.5
+SQFT_PER_CENT = 435.6
+BAND_Z = 0.6745  # +/- this many sigmas covers the middle half, like the IQR band
+MIN_REGRESSION_SAMPLES = 3
+
+ESTIMATORS = ["median", "trimmed_mean", "q1", "q3", "lower_fence", "upper_fence", "count"]
+COLUMNS = {"per_cent": "price_per_cent_calc", "total": "price_num"}
+
+Estimate = namedtuple(
+    "Estimate",
+    ["per_cent", "per_cent_low", "per_cent_high", "total", "total_low", "total_high", "count", "weight"],
+)
+
+
+def robust_estimators(values, keys, trim=DEFAULT_TRIM):
+    """Table of ESTIMATORS for one numeric Series grouped by keys"""
+    import numpy as np
+    import pandas as pd
+
+    grouped = values.groupby(keys, sort=False)
+    table = pd.DataFrame({
+        "median": grouped.median(),
+        "q1": grouped.quantile(0.25),
+        "q3": grouped.quantile(0.75),
+        "count": grouped.count(),
+    })
+    iqr = table["q3"] - table["q1"]
+    table["lower_fence"] = table["q1"] - FENCE * iqr
+    table["upper_fence"] = table["q3"] + FENCE * iqr
+
+    # Trimmed mean: drop floor(trim * n) values from each end of every group
+    rank = grouped.rank(method="first").to_numpy()
+    size = grouped.transform("count").to_numpy()
+    cut = np.floor(trim * size)
+    keep = (rank > cut) & (rank <= size - cut)
+    kept_keys = [key[keep] for key in keys] if isinstance(keys, list) else keys[keep]
+    table["trimmed_mean"] = values[keep].groupby(kept_keys, sort=False).mean()
+    return table[ESTIMATORS]
+
+
+def fit_estimators(frame, keys, trim=DEFAULT_TRIM):
+    """ESTIMATORS for every column in COLUMNS; columns are (name, estimator)"""
+    import pandas as pd
+
+    return pd.concat(
+        {name: robust_estimators(frame[column], keys, trim) for name, column in COLUMNS.items()},
+        axis=1,
+    )
+
+
+def shrink(locality_fit, district_fit, strength):
+    """Blend each locality's estimators toward its district's, by sample count"""
+    district_rows = district_fit.reindex(locality_fit.index.get_level_values(0))
+    district_rows.index = locality_fit.index
+    count = locality_fit[("per_cent", "count")]
+    weight = count / (count + strength)
+    blended = locality_fit.mul(weight, axis=0) + district_rows.mul(1 - weight, axis=0)
+    return blended, count, weight
+
+
+def serving_table(fit, count, weight):
+    """The compact table predictions are served from: one row per key, Estimate columns"""
+    import pandas as pd
+
+    table = pd.DataFrame({
+        "per_cent": fit[("per_cent", "median")],
+        "per_cent_low": fit[("per_cent", "q1")],
+        "per_cent_high": fit[("per_cent", "q3")],
+        "total": fit[("total", "median")],
+        "total_low": fit[("total", "q1")],
+        "total_high": fit[("total", "q3")],
+        "count": count,
+        "weight": weight,
+    })
+    return table[list(Estimate._fields)].round(2)
+
+
+def fit_area_regression(frame, district_key, districts):
+    """
+    Per-district least squares of log(price_num) on log(cents).
+    Returns coefficients (len(districts) x 2: intercept, slope) and the
+    residual sigma per district. Districts with too few listings, or all of
+    one size, get slope 1 (price proportional to area).
+    """
+    import numpy as np
+    import pandas as pd
+
+    codes = pd.Index(districts).get_indexer(district_key)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = np.log(frame["cents"].to_numpy(dtype=float))
+        y = np.log(frame["price_num"].to_numpy(dtype=float))
+    ok = (codes >= 0) & np.isfinite(x) & np.isfinite(y)
+    x, y, codes = x[ok], y[ok], codes[ok]
+
+    # Sufficient statistics n, Sx, Sy, Sxx, Sxy, Syy of every district at once
+    sums = np.zeros((len(districts), 6))
+    np.add.at(sums, codes, np.column_stack([np.ones_like(x), x, y, x * x, x * y, y * y]))
+    n, sx, sy, sxx, sxy, syy = sums.T
+
+    spread = n * sxx - sx * sx
+    fitted = (n >= MIN_REGRESSION_SAMPLES) & (spread > 1e-9 * np.maximum(n * sxx, 1.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(fitted, (n * sxy - sx * sy) / spread, 1.0)
+        intercept = np.where(n > 0, (sy - slope * sx) / n, 0.0)
+        sse = syy + n * intercept ** 2 + slope ** 2 * sxx - 2 * intercept * sy - 2 * slope * sxy + 2 * intercept * slope * sx
+        sigma = np.sqrt(np.maximum(sse, 0.0) / np.maximum(n - 1 - fitted, 1))
+    return np.column_stack([intercept, slope]), sigma
+
+
+def area_totals(coefficients, sigma, cents, premium):
+    """Total price and band for parcels, given their districts' coefficient rows"""
+    import numpy as np
+
+    design = np.column_stack([np.ones_like(cents), np.log(cents)])
+    log_total = np.einsum("ij,ij->i", design, coefficients) + np.log(premium)
+    spread = BAND_Z * sigma
+    return (np.round(np.exp(log_total), 2), np.round(np.exp(log_total - spread), 2),
+            np.round(np.exp(log_total + spread), 2))
+
+
+def _estimates_by_key(table):
+    return {
+        key: Estimate(*(float(value) for value in row[:6]), int(row[6]), float(row[7]))
+        for key, row in zip(table.index, table.itertuples(index=False))
+    }
+
+
+class ValuationModel:
+    """Fitted estimators and serving tables for one dataset version"""
+
+    def __init__(self, locality_fit, district_fit, locality_table, district_table, strength,
+                 area_coefficients, area_sigma):
+        self.locality_fit = locality_fit
+        self.district_fit = district_fit
+        self.locality_table = locality_table
+        self.district_table = district_table
+        self.strength = strength
+        self.locality_estimates = _estimates_by_key(locality_table)
+        self.district_estimates = _estimates_by_key(district_table)
+        # Rows line up with district_table
+        self.area_coefficients = area_coefficients
+        self.area_sigma = area_sigma
+        self.district_rows = {key: row for row, key in enumerate(district_table.index)}
+
+    def locality(self, district_key, locality_key):
+        return self.locality_estimates.get((district_key, locality_key))
+
+    def district(self, district_key):
+        return self.district_estimates.get(district_key)
+
+    def premiums(self, district_rows, per_cent):
+        """Price per cent relative to the district's, for the rows' estimates"""
+        return per_cent / self.district_table["per_cent"].to_numpy()[district_rows]
+
+    def price_area(self, district_rows, cents, premium):
+        """Vectorized area_totals for arrays of district rows, parcel sizes and premiums"""
+        return area_totals(self.area_coefficients[district_rows], self.area_sigma[district_rows], cents, premium)
+
+    def for_area(self, district_key, estimate, area_sqft):
+        """estimate with its total and band priced for a parcel of area_sqft"""
+        import numpy as np
+
+        rows = np.array([self.district_rows[district_key]])
+        premium = self.premiums(rows, np.array([estimate.per_cent]))
+        total, low, high = self.price_area(rows, np.array([area_sqft / SQFT_PER_CENT]), premium)
+        return estimate._replace(total=float(total[0]), total_low=float(low[0]), total_high=float(high[0]))
+
+
+def fit_model(frame, district_key, locality_key, strength=None, trim=None):
+    """Fit the model on a cleaned price frame, given its normalized key Series"""
+    if strength is None:
+        strength = getattr(settings, "LAND_VALUATION_SHRINKAGE", DEFAULT_SHRINKAGE)
+    if trim is None:
+        trim = getattr(settings, "LAND_VALUATION_TRIM", DEFAULT_TRIM)
+    locality_fit = fit_estimators(frame, [district_key, locality_key], trim)
+    district_fit = fit_estimators(frame, district_key, trim)
+
+    blended, count, weight = shrink(locality_fit, district_fit, strength)
+    district_table = serving_table(district_fit, district_fit[("per_cent", "count")], 1.0)
+    return ValuationModel(
+        locality_fit,
+        district_fit,
+        serving_table(blended, count, weight),
+        district_table,
+        strength,
+        *fit_area_regression(frame, district_key, district_table.index),
+    )
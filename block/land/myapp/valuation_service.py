@@ -0,0 +1,269 @@
+"""
+Valuation in a pool of long-lived worker processes.
+
+Fuzzy locality matching is pure Python and holds the GIL, so under a
+threaded server concurrent predictions run one at a time. With
+settings.LAND_VALUATION_WORKERS > 0 they are sent instead to a
+ProcessPoolExecutor whose workers load the price dataset once at start-up
+and keep their own indexes, matchers and prediction cache. Workers never
+reload: when the web process reloads the dataset, a new pool is started on
+the new generation and swapped in once warm, while the old one finishes its
+jobs. Each job carries the dataset version the web process is serving, and
+a worker holding a different one refuses it (StaleWorker), so the job is
+computed in-process instead.
+
+Backpressure: at most LAND_VALUATION_MAX_PENDING jobs may be queued or
+running. Past that, or when a job takes longer than
+LAND_VALUATION_TIMEOUT seconds, or when the pool is broken, the valuation
+is computed in-process instead (LAND_VALUATION_FALLBACK), or
+ValuationUnavailable is raised when fallback is off.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from . import utils
+
+DEFAULT_MAX_PENDING = 256
+DEFAULT_TIMEOUT = 5.0
+WORKER_ENV = "LAND_VALUATION_WORKER"  # set inside worker processes
+
+
+class ValuationUnavailable(Exception):
+    """The pool is saturated, slow or broken and in-process fallback is off"""
+
+
+class StaleWorker(Exception):
+    """The worker holds a different dataset generation than the job asked for"""
+
+
+# ---------- Worker side ----------
+def _init_worker(path=None):
+    import django
+
+    os.environ[WORKER_ENV] = "1"  # so MyappConfig.ready() does not start a pool of its own
+    django.setup()
+    utils.reload_price_data(path, force=True)
+
+
+def _ensure_version(version):
+    if version is not None and utils.get_price_data_version() != version:
+        raise StaleWorker(version)
+
+
+def _estimate_one(version, district, locality, area_sqft):
+    _ensure_version(version)
+    return utils.get_price_estimate(district, locality, area_sqft)
+
+
+def _price_many(version, pairs, areas):
+    _ensure_version(version)
+    return utils.get_price_info_batch(pairs, areas)
+
+
+def _ping():
+    return utils.get_price_data_version()
+
+
+# ---------- Parent side ----------
+class ValuationService:
+    """Submits valuations to the worker pool, with bounded queueing and fallback"""
+
+    def __init__(self, workers, max_pending=DEFAULT_MAX_PENDING, timeout=DEFAULT_TIMEOUT, fallback=True):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.fallback = fallback
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._data_path = None  # where the web process last reloaded the dataset from
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._counter_lock = threading.Lock()
+        self.submitted = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.stale = 0
+        self.fallbacks = 0
+        self.recycles = 0
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            workers=getattr(settings, "LAND_VALUATION_WORKERS", 0) or 0,
+            max_pending=getattr(settings, "LAND_VALUATION_MAX_PENDING", DEFAULT_MAX_PENDING),
+            timeout=getattr(settings, "LAND_VALUATION_TIMEOUT", DEFAULT_TIMEOUT),
+            fallback=getattr(settings, "LAND_VALUATION_FALLBACK", True),
+        )
+
+    @property
+    def enabled(self):
+        return self.workers > 0
+
+    def start(self):
+        """Start the workers and wait until each has loaded the dataset"""
+        pool = self._get_pool()
+        for future in [pool.submit(_ping) for _ in range(self.workers)]:
+            future.result()
+        return self
+
+    def _new_pool(self):
+        # spawn: never fork a web process with live threads and DB connections
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self._data_path,),
+        )
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = self._new_pool()
+            return self._pool
+
+    def recycle(self, data=None, path=None):
+        """
+        Replace a running pool with one on the current dataset (a utils
+        reload listener). The new workers load it before the swap, so
+        requests keep using the old pool meanwhile; its queued jobs finish.
+        """
+        self._data_path = path
+        with self._pool_lock:
+            running = self._pool is not None
+        if not running:
+            return
+        pool = self._new_pool()
+        for future in [pool.submit(_ping) for _ in range(self.workers)]:
+            future.result()
+        with self._pool_lock:
+            old, self._pool = self._pool, pool
+        self._count("recycles")
+        if old is not None:
+            old.shutdown(wait=False)
+
+    def _discard_pool(self, pool):
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _count(self, name):
+        with self._counter_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _submit(self, fn, args):
+        """Queue fn(version, *args) on the pool; None when the queue is full"""
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            return None
+        pool = None
+        try:
+            pool = self._get_pool()
+            future = pool.submit(fn, utils.get_price_data_version(), *args)
+        except (BrokenProcessPool, RuntimeError):  # broken, or shut down under us
+            self._slots.release()
+            self._count("failures")
+            if pool is not None:
+                self._discard_pool(pool)
+            return None
+        future.add_done_callback(lambda _: self._slots.release())
+        self._count("submitted")
+        return future
+
+    def _collect(self, future, local, args):
+        """Result of a submitted job, or local(*args) if it could not run in the pool"""
+        if future is None:
+            return self._fall_back(local, args, "valuation queue is full")
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            self._count("timeouts")
+            return self._fall_back(local, args, "valuation timed out")
+        except BrokenProcessPool:
+            self._count("failures")
+            with self._pool_lock:
+                pool = self._pool
+            if pool is not None:
+                self._discard_pool(pool)
+            return self._fall_back(local, args, "valuation workers died")
+        except StaleWorker:
+            self._count("stale")
+            return self._fall_back(local, args, "valuation workers are on another dataset version")
+
+    def _fall_back(self, local, args, reason):
+        if not self.fallback:
+            raise ValuationUnavailable(reason)
+        self._count("fallbacks")
+        return local(*args)
+
+    def price_estimate(self, district, locality, area_sqft=None):
+        """Same result as utils.get_price_estimate"""
+        args = (district, locality, area_sqft)
+        if not self.enabled:
+            return utils.get_price_estimate(*args)
+        return self._collect(self._submit(_estimate_one, args), utils.get_price_estimate, args)
+
+    def price_info_batch(self, pairs, areas=None):
+        """Same result as utils.get_price_info_batch, split across the workers"""
+        pairs = list(pairs)
+        if not self.enabled:
+            return utils.get_price_info_batch(pairs, areas)
+        areas = list(areas) if areas is not None else None
+        size = max(1, -(-len(pairs) // self.workers))
+        chunks = [
+            (pairs[i:i + size], areas[i:i + size] if areas is not None else None)
+            for i in range(0, len(pairs), size)
+        ] or [([], None)]
+        futures = [self._submit(_price_many, chunk) for chunk in chunks]
+        return [
+            item
+            for future, chunk in zip(futures, chunks)
+            for item in self._collect(future, utils.get_price_info_batch, chunk)
+        ]
+
+    def stats(self):
+        with self._counter_lock:
+            return {
+                "workers": self.workers,
+                "running": self._pool is not None,
+                "max_pending": self.max_pending,
+                "timeout": self.timeout,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "failures": self.failures,
+                "stale": self.stale,
+                "fallbacks": self.fallbacks,
+                "recycles": self.recycles,
+            }
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def in_worker():
+    return os.environ.get(WORKER_ENV) == "1"
+
+
+def get_valuation_service():
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = ValuationService.from_settings()
+                utils.add_reload_listener(_service.recycle)
+    return _service
@@ -17,34 +17,79 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 from django.shortcuts import render
-from .utils import get_districts, get_price_info_fuzzy  # use fuzzy version
+from .utils import get_districts
+from .utils import get_prediction_cache_stats, get_locality_catalog, get_price_data_version
+from .valuation_service import ValuationUnavailable, get_valuation_service
+import json
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from django.contrib.admin.views.decorators import staff_member_required
 from django.shortcuts import  get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.utils import timezone
 from django.contrib import messages
 from .models import *
-
-def predict(request):
+from .pagination import keyset_page
+from django.db.models import Prefetch, Q
+from django.db import IntegrityError, transaction
+from .bulk_import import detect_format, import_requests, text_stream
+import csv
+import logging
+from django.core.paginator import Paginator
+from django.http import HttpResponseForbidden, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from . import dashboard, proofs, valuation_checks
+from .ledger_queue import get_scheduler
+
+logger = logging.getLogger(__name__)
+
+def parse_area(value):
+    """Optional area in sq.ft: a positive float, None if blank, False if invalid"""
+    if value in (None, ""):
+        return None
+    if isinstance(value, bool):
+        return False
+    try:
+        area = float(value)
+    except (TypeError, ValueError):
+        return False
+    return area if 0 < area < float("inf") else False
+
+
+def predict_context(method, data):
+    """Everything predictor.html needs; CPU-bound on a cache miss, no queries"""
     result = None
     warning = None
     error = None
 
-    if request.method == "POST":
-        district = request.POST.get("district")
-        locality = request.POST.get("locality")
+    if method == "POST":
+        district = data.get("district")
+        locality = data.get("locality")
+        area_sqft = parse_area(data.get("area_sqft"))
 
-        if district and locality:
+        if area_sqft is False:
+            error = "Area must be a positive number of sq.ft."
+        elif district and locality:
             # Use fuzzy matching prediction
-            per_cent, avg_total, fallback, matched_locality = get_price_info_fuzzy(district, locality)
+            estimate, fallback, matched_locality = get_valuation_service().price_estimate(
+                district, locality, area_sqft
+            )
 
-            if per_cent is None:
+            if estimate is None:
                 error = "❌ Could not predict price (district/locality not found)."
             else:
                 result = {
                     "district": district,
                     "locality": matched_locality or locality,
-                    "per_cent": f"₹{per_cent:,.0f}",   # changed name
-                    "total_price": f"₹{avg_total:,.0f}",
+                    "per_cent": f"₹{estimate.per_cent:,.0f}",   # changed name
+                    "per_cent_low": f"₹{estimate.per_cent_low:,.0f}",
+                    "per_cent_high": f"₹{estimate.per_cent_high:,.0f}",
+                    "total_price": f"₹{estimate.total:,.0f}",
+                    "total_low": f"₹{estimate.total_low:,.0f}",
+                    "total_high": f"₹{estimate.total_high:,.0f}",
+                    "samples": estimate.count,
+                    "area_sqft": area_sqft,
                 }
                 if fallback and matched_locality:
                     warning = f"⚠️ Locality not found. Showing closest match: '{matched_locality}'"
@@ -53,13 +98,98 @@ def predict(request):
         else:
             error = "Please select a district and enter a locality."
 
-    context = {
+    # The district/locality options are rendered from a fragment cache keyed by
+    # the dataset version; these are prebuilt immutable catalogs, not queries.
+    return {
         "districts": get_districts(),
+        "locality_catalog": get_locality_catalog(),
+        "catalog_version": get_price_data_version(),
         "result": result,
         "warning": warning,
         "error": error,
     }
-    return render(request, "predictor.html", context)
+
+
+def predict(request):
+    return render(request, "predictor.html", predict_context(request.method, request.POST))
+
+BATCH_VALUATION_MAX_ITEMS = 10000
+
+
+@csrf_exempt  # read-only JSON API for scripts; nothing is written
+@require_POST
+def batch_valuation(request):
+    """
+    Price many parcels in one call.
+    Body: {"items": [{"district": "...", "locality": "...", "area_sqft": 1200}, ...]}
+    area_sqft is optional; with it the total price is scored for the parcel.
+    Returns {"results": [...]} in the same order, with the same fallback
+    flags the predictor page uses.
+    """
+    try:
+        payload = json.loads(request.body or b"{}")
+        items = payload["items"]
+        pairs = [(item["district"], item["locality"]) for item in items]
+        areas = [parse_area(item.get("area_sqft")) for item in items]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse(
+            {"error": 'Expected JSON body {"items": [{"district": ..., "locality": ...}, ...]}.'},
+            status=400,
+        )
+    if len(pairs) > BATCH_VALUATION_MAX_ITEMS:
+        return JsonResponse(
+            {"error": f"At most {BATCH_VALUATION_MAX_ITEMS} items per request."}, status=400
+        )
+    if not all(isinstance(value, str) and value for pair in pairs for value in pair):
+        return JsonResponse({"error": "district and locality must be non-empty strings."}, status=400)
+    if any(area is False for area in areas):
+        return JsonResponse({"error": "area_sqft must be a positive number."}, status=400)
+
+    try:
+        results = get_valuation_service().price_info_batch(
+            pairs, areas if any(area is not None for area in areas) else None
+        )
+    except ValuationUnavailable as e:
+        return JsonResponse({"error": f"Valuation is busy ({e}); retry shortly."}, status=503)
+    return JsonResponse({"results": results})
+
+@staff_member_required
+def prediction_cache_stats(request):
+    """Prediction cache counters (hits, misses, evictions) and valuation pool counters"""
+    return JsonResponse({**get_prediction_cache_stats(), "valuation_service": get_valuation_service().stats()})
+
+def find_registration_conflict(email, adhar_no, phone_no, pan_number):
+    """
+    Which unique registration field is already taken, as a user-facing message.
+    One query (users left-joined to customers) instead of one .exists() per field.
+    """
+    taken = User.objects.filter(
+        Q(email__iexact=email) | Q(username=email) | Q(customer__email=email)
+        | Q(customer__adhar_no=adhar_no) | Q(customer__phone_no=phone_no)
+        | Q(customer__pan_number=pan_number)
+    ).values_list('email', 'username', 'customer__adhar_no', 'customer__phone_no', 'customer__pan_number')[:4]
+
+    fields = set()
+    for user_email, username, user_adhar, user_phone, user_pan in taken:
+        if (user_email or '').lower() == email.lower() or username == email:
+            fields.add('email')
+        if user_adhar == adhar_no:
+            fields.add('adhar_no')
+        if user_phone == phone_no:
+            fields.add('phone_no')
+        if user_pan == pan_number:
+            fields.add('pan_number')
+
+    if 'email' in fields:
+        return "An account with this email already exists."
+    if 'adhar_no' in fields:
+        return "This Aadhar number is already registered."
+    if 'phone_no' in fields:
+        return "This phone number is already registered."
+    if 'pan_number' in fields:
+        return "This PAN number is already registered."
+    return None
+
 
 def customer_register(request):
     if request.method == 'POST':
@@ -90,52 +220,58 @@ def customer_register(request):
             messages.error(request, "PAN number must be exactly 10 characters.")
         elif len(pincode) != 6 or not pincode.isdigit():
             messages.error(request, "PIN code must be exactly 6 digits.")
-        elif User.objects.filter(email=email).exists():
+        elif User.objects.filter(email__iexact=email).exists():
+            # auth_user.email has no unique constraint, so an admin-created
+            # user with another username would not make the INSERT fail
             messages.error(request, "An account with this email already exists.")
-        elif Customer.objects.filter(adhar_no=adhar_no).exists():
-            messages.error(request, "This Aadhar number is already registered.")
-        elif Customer.objects.filter(phone_no=phone_no).exists():
-            messages.error(request, "This phone number is already registered.")
         else:
-            try:
-                # Split full name
-                name_parts = full_name.strip().split()
-                first_name = name_parts[0]
-                last_name = " ".join(name_parts[1:]) if len(name_parts) > 1 else ''
-
-                # Create User
-                user = User.objects.create_user(
-                    username=email,  # using email as username
-                    email=email,
-                    password=password,
-                    first_name=first_name,
-                    last_name=last_name
-                )
-
-                # Assign Resident group
-                assign_group(user, "Resident")
-
-                # Create Customer linked to User
-                Customer.objects.create(
-                    user=user,
-                    adhar_no=adhar_no,
-                    phone_no=phone_no,
-                    date_of_birth=date_of_birth,
-                    pan_number=pan_number.upper(),
-                    address=address,
-                    city=city,
-                    state=state,
-                    pincode=pincode,
-                    email=email
-                )
+            # Split full name
+            name_parts = full_name.strip().split()
+            first_name = name_parts[0]
+            last_name = " ".join(name_parts[1:]) if len(name_parts) > 1 else ''
+
+            user = User(
+                username=User.normalize_username(email),  # using email as username
+                email=User.objects.normalize_email(email),
+                first_name=first_name,
+                last_name=last_name,
+            )
+            # Hash before opening the transaction so PBKDF2 doesn't hold it open
+            user.password = make_password(password)
 
+            try:
+                # Uniqueness is enforced by the DB constraints: three INSERTs, one transaction
+                with transaction.atomic():
+                    user.save()
+                    add_new_user_to_group(user, "Resident")
+                    Customer.objects.create(
+                        user=user,
+                        adhar_no=adhar_no,
+                        phone_no=phone_no,
+                        date_of_birth=date_of_birth,
+                        pan_number=pan_number.upper(),
+                        address=address,
+                        city=city,
+                        state=state,
+                        pincode=pincode,
+                        email=email
+                    )
+            except IntegrityError:
+                conflict = find_registration_conflict(email, adhar_no, phone_no, pan_number.upper())
+                if conflict is None:
+                    # Not a duplicate (e.g. a stale cached group id): retry cleanly next time
+                    clear_group_id_cache()
+                    messages.error(request, "An error occurred while creating your account.")
+                    logger.exception("Registration failed for %s", email)
+                else:
+                    messages.error(request, conflict)
+            except Exception:
+                messages.error(request, "An error occurred while creating your account.")
+                logger.exception("Registration failed for %s", email)
+            else:
                 messages.success(request, f"🎉 Welcome {full_name}! Your account has been created successfully.")
                 return redirect('customer_login')
 
-            except Exception as e:
-                messages.error(request, "An error occurred while creating your account.")
-                print(f"Registration error: {e}")
-
     return render(request, 'customer_register.html')
 
 
@@ -173,41 +309,23 @@ def customer_logout(request):
 
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from datetime import datetime, timedelta
+
+def dashboard_context(user, summary):
+    return {
+        'name': user.get_full_name() or user.username or 'John Doe',
+        'owned_properties_count': summary['approved'],
+        'active_transactions_count': summary['active'],
+        'certificates_count': summary['approved'],
+        'requests_count': summary['total'],
+        'status_counts': summary['by_status'],
+        'recent_activities': summary['activities'],
+    }
+
 
 @login_required
 def resident_dashboard(request):
-    # Static data for demonstration (no database needed)
-    context = {
-        'name': request.user.get_full_name() or request.user.username or 'John Doe',
-        'owned_properties_count': 3,
-        'active_transactions_count': 2,
-        'certificates_count': 5,
-        'verified_docs_count': 8,
-        'recent_activities': [
-            {
-                'action': 'Certificate Downloaded',
-                'description': 'Land Certificate #LC2025001 downloaded successfully',
-                'timestamp': datetime.now() - timedelta(hours=2)
-            },
-            {
-                'action': 'Document Uploaded',
-                'description': 'Sale deed documents uploaded for Transaction #TX2025003',
-                'timestamp': datetime.now() - timedelta(hours=5)
-            },
-            {
-                'action': 'Transaction Approved',
-                'description': 'Land transfer transaction completed and verified on blockchain',
-                'timestamp': datetime.now() - timedelta(days=1)
-            },
-            {
-                'action': 'Property Valuation',
-                'description': 'AI valuation completed for Parcel #PR2025007',
-                'timestamp': datetime.now() - timedelta(days=2)
-            }
-        ]
-    }
-    return render(request, 'login_dashboard.html', context)
+    summary = dashboard.get_summary(request.user.pk)
+    return render(request, 'login_dashboard.html', dashboard_context(request.user, summary))
 
 # Placeholder views for the URLs (return simple pages)
 def view_properties(request):
@@ -240,9 +358,44 @@ def customer_logout(request):
     logout(request)
     return redirect('login')  # Adjust to your login URL name
 
+ADMIN_USERS_PAGE_SIZE = 50
+USER_EXPORT_CHUNK_SIZE = 2000
+USER_EXPORT_COLUMNS = ("id", "username", "email", "first_name", "last_name", "is_staff", "date_joined")
+
+
+class Echo:
+    """File-like object whose write() just returns the value, for streaming csv.writer output"""
+    def write(self, value):
+        return value
+
+
+def export_users_csv(users):
+    """Stream users as CSV in constant memory (server-side chunks, no model instances)"""
+    writer = csv.writer(Echo())
+    rows = users.values_list(*USER_EXPORT_COLUMNS).iterator(chunk_size=USER_EXPORT_CHUNK_SIZE)
+
+    def stream():
+        yield writer.writerow(USER_EXPORT_COLUMNS)
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(stream(), content_type="text/csv")
+    response["Content-Disposition"] = 'attachment; filename="users.csv"'
+    return response
+
+
 @login_required
 def admin_dashboard(request):
-    users = User.objects.all().order_by("-date_joined")
+    users = User.objects.order_by("-date_joined", "-id")
+
+    query = request.GET.get("q", "").strip()
+    if query:
+        users = users.filter(Q(username__icontains=query) | Q(email__icontains=query))
+
+    if request.GET.get("export") == "csv":
+        if not request.user.is_superuser:
+            return HttpResponseForbidden("Only admins can export users.")
+        return export_users_csv(users)
 
     if request.method == "POST":   # Handle new user creation manually
         username = request.POST.get("username")
@@ -266,7 +419,9 @@ def admin_dashboard(request):
             messages.success(request, f"User {username} created successfully!")
             return redirect("admin_dashboard")
 
-    return render(request, "admin_dashboard.html", {"users": users})
+    paginator = Paginator(users.only("id", "username", "email", "date_joined"), ADMIN_USERS_PAGE_SIZE)
+    page = paginator.get_page(request.GET.get("page"))
+    return render(request, "admin_dashboard.html", {"users": page, "query": query})
 
 def admin_login(request):
     if request.method == "POST":
@@ -308,49 +463,233 @@ def register_land_ownership_change(request):
         previous_owner_name = request.POST.get('previous_owner_name')
         new_owner_name = request.POST.get('new_owner_name')
 
-        # Create request
-        ownership_request = LandOwnershipChangeRequest.objects.create(
-            applicant=request.user,
-            survey_number=survey_number,
-            village=village,
-            district=district,
-            property_area_sqft=property_area_sqft,
-            property_value=property_value,
-            deed_type=deed_type,
-            previous_owner_name=previous_owner_name,
-            new_owner_name=new_owner_name,
-            status=LandOwnershipChangeRequest.Status.SUBMITTED
-        )
-
-        # Save history
-        RequestStatusHistory.objects.create(
-            request=ownership_request,
-            old_status="draft",
-            new_status="submitted",
-            changed_by=request.user,
-            comments="Request submitted by applicant."
-        )
+        with transaction.atomic():
+            # Create request
+            ownership_request = LandOwnershipChangeRequest.objects.create(
+                applicant=request.user,
+                survey_number=survey_number,
+                village=village,
+                district=district,
+                property_area_sqft=property_area_sqft,
+                property_value=property_value,
+                deed_type=deed_type,
+                previous_owner_name=previous_owner_name,
+                new_owner_name=new_owner_name,
+                status=LandOwnershipChangeRequest.Status.SUBMITTED,
+                valuation_flag=LandOwnershipChangeRequest.ValuationFlag.PENDING,
+            )
+
+            # Save history
+            RequestStatusHistory.objects.create(
+                request=ownership_request,
+                old_status="draft",
+                new_status="submitted",
+                changed_by=request.user,
+                comments="Request submitted by applicant."
+            )
+
+            # Compared with the market value in the background, after commit
+            valuation_checks.enqueue([ownership_request])
 
         messages.success(request, "Ownership change request submitted successfully.")
-        return redirect('my_requests')
 
-    return render(request, 'register_request.html')
+    # The form is a modal on the my_requests page
+    return redirect('my_requests')
+
+
+MY_REQUESTS_PAGE_SIZE = 25
+# Columns my_request.html actually renders (plus the keyset sort key)
+MY_REQUESTS_COLUMNS = ('request_id', 'survey_number', 'village', 'deed_type', 'status', 'created_at')
+
+
+IMPORT_MAX_REPORTED_ERRORS = 1000
+
+
+@login_required
+@require_POST
+def import_land_requests(request):
+    """
+    Upload a CSV/JSON-lines file of requests (field "file"). Sub-registrars and
+    admins only. Responds with row counts and per-row errors as JSON.
+    """
+    if not (request.user.is_superuser or SubRegistrar.objects.filter(user=request.user).exists()):
+        return JsonResponse({"error": "Only sub-registrars can import requests."}, status=403)
+    upload = request.FILES.get("file")
+    if upload is None:
+        return JsonResponse({"error": 'Attach the file as "file".'}, status=400)
+
+    fmt = request.POST.get("format") or detect_format(upload.name)
+    try:
+        result = import_requests(
+            text_stream(upload.file), fmt, changed_by=request.user, source=upload.name
+        )
+    except (ValueError, UnicodeDecodeError) as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse(result.as_dict(max_errors=IMPORT_MAX_REPORTED_ERRORS))
+
+
+def my_requests_queryset(user, status):
+    """(queryset, status) for my_requests; status is None unless it is a valid filter"""
+    requests = LandOwnershipChangeRequest.objects.filter(applicant=user).only(*MY_REQUESTS_COLUMNS)
+    if status in LandOwnershipChangeRequest.Status.values:
+        return requests.filter(status=status), status
+    return requests, None
+
+
+def my_requests_context(request, page, next_cursor, status):
+    return {
+        'requests': page,
+        'next_cursor': next_cursor,
+        'is_first_page': not request.GET.get('cursor'),
+        'status': status,
+        'status_choices': LandOwnershipChangeRequest.Status.choices,
+    }
 
 
 @login_required
 def my_requests(request):
-    #requests = LandOwnershipChangeRequest.objects.filter(applicant=request.user).order_by('-created_at')
-    return render(request, 'my_request.html', {'requests': []})
+    requests, status = my_requests_queryset(request.user, request.GET.get('status'))
+    page, next_cursor = keyset_page(
+        requests, request.GET.get('cursor'), MY_REQUESTS_PAGE_SIZE, pk_field='request_id'
+    )
+    return render(request, 'my_request.html', my_requests_context(request, page, next_cursor, status))
+
+
+def request_detail_queryset():
+    # Two queries regardless of history length: the request with its applicant and
+    # sub-registrar joined, then every history row with changed_by joined.
+    return LandOwnershipChangeRequest.objects.select_related(
+        'applicant', 'assigned_sub_registrar__user'
+    ).prefetch_related(
+        # Reviewer notes (same-status rows) are not shown to the applicant
+        Prefetch('status_history', queryset=RequestStatusHistory.objects.status_changes().select_related('changed_by'))
+    )
 
 
 @login_required
 def request_detail(request, request_id):
-    ownership_request = get_object_or_404(LandOwnershipChangeRequest, request_id=request_id, applicant=request.user)
+    ownership_request = get_object_or_404(request_detail_queryset(), request_id=request_id, applicant=request.user)
     history = ownership_request.status_history.all()
     return render(request, 'request_detail.html', {
         'ownership_request': ownership_request,
         'history': history
     })
+
+
+REVIEWER_QUEUE_PAGE_SIZE = 25
+REVIEWER_QUEUE_COLUMNS = (
+    'request_id', 'survey_number', 'village', 'district', 'deed_type', 'property_value',
+    'status', 'version', 'submitted_at', 'assigned_sub_registrar', 'valuation_flag', 'predicted_value',
+)
+
+
+@login_required
+def reviewer_queue(request):
+    """A sub-registrar's assigned requests, oldest submission first"""
+    registrar = SubRegistrar.objects.filter(user=request.user).first()
+    if registrar is None:
+        return HttpResponseForbidden("Only sub-registrars have a review queue.")
+
+    Status = LandOwnershipChangeRequest.Status
+    status = request.GET.get('status')
+    if status not in LandOwnershipChangeRequest.OPEN_STATUSES:
+        status = Status.SUBMITTED
+    # Equality on (assigned_sub_registrar, status) + order by submitted_at: landreq_reviewer_queue_idx
+    requests = LandOwnershipChangeRequest.objects.filter(
+        assigned_sub_registrar=registrar, status=status
+    ).only(*REVIEWER_QUEUE_COLUMNS)
+    page, next_cursor = keyset_page(
+        requests, request.GET.get('cursor'), REVIEWER_QUEUE_PAGE_SIZE,
+        pk_field='request_id', sort_field='submitted_at', descending=False,
+    )
+    return render(request, 'reviewer_queue.html', {
+        'registrar': registrar,
+        'requests': page,
+        'next_cursor': next_cursor,
+        'is_first_page': not request.GET.get('cursor'),
+        'status': status,
+        'status_choices': [(value, label) for value, label in Status.choices
+                           if value in LandOwnershipChangeRequest.OPEN_STATUSES],
+    })
+
+
+@login_required
+@require_POST
+def transition_request(request, request_id):
+    """
+    Sub-registrar moves a request along the status graph. POST "status",
+    optional "comment" and "version" (the version the reviewer was shown).
+    A concurrent change answers 409 with the request's current state.
+    """
+    registrar = SubRegistrar.objects.filter(user=request.user).only('registrar_id').first()
+    if registrar is None and not request.user.is_superuser:
+        return JsonResponse({"error": "Only sub-registrars can review requests."}, status=403)
+    ownership_request = LandOwnershipChangeRequest.objects.filter(request_id=request_id).only(
+        'request_id', 'status', 'version', 'submitted_at', 'approved_at', 'assigned_sub_registrar'
+    ).first()
+    if ownership_request is None:
+        return JsonResponse({"error": "Request not found."}, status=404)
+    assigned = ownership_request.assigned_sub_registrar_id
+    if assigned and not request.user.is_superuser and assigned != registrar.registrar_id:
+        return JsonResponse({"error": "Request is assigned to another sub-registrar."}, status=403)
+
+    version = request.POST.get('version')
+    if version is not None:
+        try:
+            ownership_request.version = int(version)
+        except ValueError:
+            return JsonResponse({"error": "version must be an integer."}, status=400)
+    try:
+        ownership_request.transition(
+            request.POST.get('status', ''), by=request.user, comment=request.POST.get('comment', '')
+        )
+    except ValueError as e:  # InvalidTransition, or not a status at all
+        return JsonResponse({"error": str(e)}, status=400)
+    except TransitionConflict as e:
+        return JsonResponse({
+            "error": "The request was changed by someone else.",
+            "status": e.current_status,
+            "version": e.current_version,
+        }, status=409)
+    return JsonResponse({"status": ownership_request.status, "version": ownership_request.version})
+
+
+@login_required
+@require_GET
+def ledger_proof(request, request_id):
+    """Compact Merkle inclusion proof that the applicant's request was approved"""
+    owned = LandOwnershipChangeRequest.objects.filter(request_id=request_id)
+    if not request.user.is_staff:
+        owned = owned.filter(applicant=request.user)
+    if not owned.exists():
+        return JsonResponse({"error": "Request not found."}, status=404)
+    proof = proofs.build_proof(request_id)
+    if proof is None:
+        return JsonResponse({"error": "Request has no approval on the ledger."}, status=404)
+    return JsonResponse(proof)
+
+
+@staff_member_required
+def ledger_batcher_stats(request):
+    """Block sealing metrics: batch size, seal latency and queue depth"""
+    return JsonResponse(get_scheduler().stats())
+
+
+@staff_member_required
+def valuation_check_stats(request):
+    """Background valuation check counters and queue depth"""
+    return JsonResponse(valuation_checks.get_checker().stats())
+
+
+@require_GET
+def verify_ledger_proof(request):
+    """Public check of a proof token (e.g. scanned from a certificate QR code)"""
+    token = request.GET.get("proof", "").strip()
+    if not token:
+        return JsonResponse({"valid": False, "error": "Missing proof parameter."}, status=400)
+    return JsonResponse(proofs.verify_proof(token))
+
+
 def register_subregistrar(request):
     if request.method == "POST":
         username = request.POST.get("username")